@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+中文姓名识别基准测试
+逐步增大停用词和名字词典的规模，测量每个文件名的识别耗时，并估算耗时随词典规模增长的幂次（接近0表示不随词典增长）；
+同时在带有年份、表格名称等上下文的合成文件名上，比较识别器与原来取第一段2~4个汉字的正则的准确率
+用法: python benchmarks/bench_chinese_names.py [--sizes 100 1000 10000 50000] [--count 100000]
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from name_extractor import ChineseNameRecognizer, CHINESE_NAME_PATTERN, DEFAULT_STOP_WORDS
+from rosters import random_name, SURNAMES, GIVEN_CHARS
+from bench_fuzzy_match import fit_exponent
+
+PREFIXES = ["", "2023年度", "2024年", "第3季度", "扫描件", "入职"]
+SUFFIXES = ["", "考核表", "的体检报告", "简历", "身份证复印件", "签字版"]
+# 生成词典词条用的汉字（会再去掉合成姓名用到的字，使词典只增加规模而不改变识别结果）
+FILLER_CHARS = "甲乙丙丁戊己庚辛壬癸子丑寅卯辰巳午未申酉戌亥天地玄黄宇宙洪荒日月盈昃辰宿列张寒来暑往秋收冬藏"
+
+
+def make_filenames(count, rng):
+    """生成 (文件名, 正确姓名) 列表，姓名前后加上常见的上下文"""
+    samples = []
+    for _ in range(count):
+        name = random_name(rng)
+        samples.append((f"{rng.choice(PREFIXES)}{name}{rng.choice(SUFFIXES)}{rng.randrange(100)}.pdf", name))
+    return samples
+
+
+def make_words(count, rng, exclude):
+    """生成 count 个互不相同的2~4字词条，不与 exclude 中的字重叠"""
+    chars = [char for char in FILLER_CHARS if char not in exclude]
+    words = set()
+    while len(words) < count:
+        words.add(''.join(rng.choice(chars) for _ in range(rng.randint(2, 4))))
+    return sorted(words)
+
+
+def legacy_recognize(filename):
+    """原来的实现：取第一段2~4个汉字"""
+    match = CHINESE_NAME_PATTERN.search(filename)
+    return match.group() if match else ''
+
+
+def main():
+    parser = argparse.ArgumentParser(description='中文姓名识别基准测试')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 1000, 10000, 50000],
+                        help='停用词和名字词典各自的词条数量')
+    parser.add_argument('--count', type=int, default=100000, help='文件名数量')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    samples = make_filenames(args.count, rng)
+    filenames = [filename for filename, _ in samples]
+    used = set(SURNAMES) | set(GIVEN_CHARS)
+
+    print(f"{'词典规模':>10} {'构建(秒)':>10} {'每个文件名(微秒)':>18} {'准确率':>8}")
+    points = []
+    for size in args.sizes:
+        stop_words = list(DEFAULT_STOP_WORDS) + make_words(size, rng, used)
+        given_names = make_words(size, rng, used)
+
+        start = time.perf_counter()
+        recognizer = ChineseNameRecognizer(stop_words=stop_words, given_names=given_names)
+        build_seconds = time.perf_counter() - start
+
+        recognize = recognizer.recognize
+        start = time.perf_counter()
+        results = [recognize(filename) for filename in filenames]
+        per_file = (time.perf_counter() - start) / len(filenames) * 1e6
+        points.append((size, per_file))
+
+        accuracy = sum(1 for result, (_, name) in zip(results, samples) if result == name) / len(samples)
+        print(f"{size:>10} {build_seconds:>10.3f} {per_file:>18.2f} {accuracy:>8.1%}")
+
+    if len(points) >= 2:
+        print(f"每个文件名耗时随词典规模增长的幂次: {fit_exponent(points):.3f}")
+
+    legacy_accuracy = sum(1 for filename, name in samples if legacy_recognize(filename) == name) / len(samples)
+    print(f"原实现（第一段2~4个汉字）准确率: {legacy_accuracy:.1%}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+文件名姓名提取基准测试
+比较原来逐个文件名重新编译过滤词正则的实现与预编译的 NameExtractor.extract_many 的吞吐量，
+并检查两者的提取结果是否一致
+用法: python benchmarks/bench_extract_names.py [--count 1000000] [--filters 5] [--extra-filters 1000]
+"""
+
+import os
+import re
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from name_extractor import NameExtractor, parse_filter_words
+from rosters import indexed_name, SCRIPT_CJK, SCRIPT_ROMAN
+
+FILTER_WORDS = ["report", "data", "info", "final", "scan", "copy", "v2", "draft", "签名", "扫描件"]
+EXTENSIONS = [".pdf", ".docx", ".xlsx", ".jpg", ".txt"]
+
+
+def make_filenames(count, rng):
+    """生成各种命名风格的文件名"""
+    filenames = []
+    for i in range(count):
+        style = rng.randrange(5)
+        if style == 0:
+            name = indexed_name(i, SCRIPT_CJK)
+            stem = f"{rng.choice(FILTER_WORDS)}_{name}_{rng.randrange(1000)}"
+        elif style == 1:
+            surname, given = indexed_name(i, SCRIPT_ROMAN).split(' ')
+            stem = f"{surname}_{given}_{rng.choice(FILTER_WORDS).capitalize()}"
+        elif style == 2:
+            surname, given = indexed_name(i, SCRIPT_ROMAN).split(' ')
+            stem = f"{surname.lower()}{given}{rng.choice(FILTER_WORDS).capitalize()}"
+        elif style == 3:
+            stem = f"{rng.choice(FILTER_WORDS)}-{indexed_name(i, SCRIPT_CJK)}-{rng.choice(FILTER_WORDS)}"
+        else:
+            stem = f"{rng.randrange(10 ** 6)}"
+        filenames.append(stem + rng.choice(EXTENSIONS))
+    return filenames
+
+
+def legacy_extract(filename, filter_text):
+    """原来的实现：每个文件名都重新拆分过滤词并逐个编译正则"""
+    filter_words = [word.strip() for word in filter_text.strip().split(',') if word.strip()] if filter_text.strip() else []
+    name_part = os.path.splitext(filename)[0]
+    for filter_word in filter_words:
+        pattern = re.compile(re.escape(filter_word), re.IGNORECASE)
+        name_part = pattern.sub('', name_part)
+    name_part = re.sub(r'[_\-]+', '_', name_part)
+    name_part = re.sub(r'^_+|_+$', '', name_part)
+    if not name_part:
+        return ""
+    if '_' in name_part:
+        parts = name_part.split('_')
+        for i, part in enumerate(parts):
+            if re.search(r'[\u4e00-\u9fff]+', part):
+                return part
+            elif re.match(r'^[A-Za-z]+$', part):
+                if i + 1 < len(parts) and re.match(r'^[A-Za-z]+$', parts[i+1]):
+                    return f"{part} {parts[i+1]}"
+                return part.capitalize()
+    camel_parts = re.findall(r'[A-Z][a-z]*|[a-z]+', name_part)
+    if len(camel_parts) >= 2:
+        return ' '.join(camel_parts).title()
+    chinese_name = re.search(r'[\u4e00-\u9fff]{2,4}', name_part)
+    if chinese_name:
+        return chinese_name.group()
+    english_parts = re.findall(r'[A-Za-z]+', name_part)
+    if english_parts:
+        if len(english_parts) >= 2:
+            return f"{english_parts[0].capitalize()} {english_parts[1].capitalize()}"
+        return english_parts[0].capitalize()
+    return ""
+
+
+def main():
+    parser = argparse.ArgumentParser(description='文件名姓名提取基准测试')
+    parser.add_argument('--count', type=int, default=1000000, help='文件名数量')
+    parser.add_argument('--filters', type=int, default=len(FILTER_WORDS), help='使用的过滤词数量')
+    parser.add_argument('--extra-filters', type=int, default=0,
+                        help='额外加入的随机过滤词数量（用于测试 Aho-Corasick 自动机）')
+    parser.add_argument('--legacy-sample', type=int, default=100000,
+                        help='原实现只对前若干个文件名计时（过滤词很多时原实现非常慢），按吞吐量比较')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    filenames = make_filenames(args.count, rng)
+    words = FILTER_WORDS[:args.filters] + [f"zz{i:05d}q" for i in range(args.extra_filters)]
+    filter_text = ','.join(words)
+
+    sample = filenames[:args.legacy_sample]
+    start = time.perf_counter()
+    legacy = [legacy_extract(filename, filter_text) for filename in sample]
+    legacy_rate = len(sample) / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    extractor = NameExtractor(parse_filter_words(filter_text))
+    current = list(extractor.extract_many(filenames))
+    current_rate = len(filenames) / (time.perf_counter() - start)
+
+    mismatches = sum(1 for a, b in zip(legacy, current) if a != b)
+    print(f"文件名数量: {args.count}，过滤词数量: {len(words)}")
+    print(f"原实现: {legacy_rate:,.0f} 个/秒（按前 {len(sample)} 个文件名计时）")
+    print(f"NameExtractor: {current_rate:,.0f} 个/秒")
+    print(f"加速比: {current_rate / legacy_rate:.1f}x，结果不一致: {mismatches}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+模糊匹配基准测试
+比较删除变体索引（FuzzyIndex）与逐对计算编辑距离的耗时，并估算随规模增长的幂次
+用法: python benchmarks/bench_fuzzy_match.py [--sizes 1000 2000 4000 ...]
+"""
+
+import os
+import sys
+import math
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from name_compare_engine import (FuzzyIndex, fuzzy_key, edit_distance, similarity,
+                                 DEFAULT_FUZZY_THRESHOLD, DEFAULT_FUZZY_MAX_DISTANCE)
+from rosters import random_name, add_typo
+
+
+def make_rosters(size, rng, typo_rate=0.1):
+    names1 = [random_name(rng) for _ in range(size)]
+    names2 = [add_typo(name, rng) if rng.random() < typo_rate else random_name(rng) for name in names1]
+    return names1, names2
+
+
+def indexed_match(names1, names2, threshold):
+    index = FuzzyIndex(names2)
+    return sum(1 for name in names1 if index.search(name, threshold) is not None)
+
+
+def naive_match(names1, names2, threshold):
+    keys2 = [fuzzy_key(name) for name in names2]
+    matched = 0
+    for name in names1:
+        key = fuzzy_key(name)
+        for other in keys2:
+            allowed = min(DEFAULT_FUZZY_MAX_DISTANCE, int((1 - threshold) * max(len(key), len(other)) + 1e-9))
+            distance = edit_distance(key, other, allowed)
+            if distance <= allowed and similarity(distance, len(key), len(other)) >= threshold:
+                matched += 1
+                break
+    return matched
+
+
+def fit_exponent(points):
+    """对 (规模, 耗时) 做对数线性拟合，返回幂次"""
+    xs = [math.log(size) for size, _ in points]
+    ys = [math.log(max(seconds, 1e-9)) for _, seconds in points]
+    mean_x = sum(xs) / len(xs)
+    mean_y = sum(ys) / len(ys)
+    numerator = sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys))
+    denominator = sum((x - mean_x) ** 2 for x in xs)
+    return numerator / denominator if denominator else float('nan')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='模糊匹配基准测试')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 2000, 4000, 8000, 16000, 32000])
+    parser.add_argument('--naive-limit', type=int, default=4000, help='逐对比较只运行到该规模')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_FUZZY_THRESHOLD)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    indexed_points = []
+    naive_points = []
+    print(f"{'规模':>8} {'索引(秒)':>10} {'逐对(秒)':>10} {'匹配数':>8}")
+    for size in args.sizes:
+        names1, names2 = make_rosters(size, random.Random(args.seed))
+
+        start = time.perf_counter()
+        matched = indexed_match(names1, names2, args.threshold)
+        indexed_seconds = time.perf_counter() - start
+        indexed_points.append((size, indexed_seconds))
+
+        naive_text = '-'
+        if size <= args.naive_limit:
+            start = time.perf_counter()
+            naive_matched = naive_match(names1, names2, args.threshold)
+            naive_seconds = time.perf_counter() - start
+            naive_points.append((size, naive_seconds))
+            naive_text = f'{naive_seconds:.3f}'
+            if naive_matched != matched:
+                print(f"警告: 规模 {size} 时索引匹配数 {matched} 与逐对匹配数 {naive_matched} 不一致")
+
+        print(f"{size:>8} {indexed_seconds:>10.3f} {naive_text:>10} {matched:>8}")
+
+    if len(indexed_points) >= 2:
+        print(f"索引匹配耗时增长幂次: {fit_exponent(indexed_points):.2f}")
+    if len(naive_points) >= 2:
+        print(f"逐对匹配耗时增长幂次: {fit_exponent(naive_points):.2f}")
+
+
+if __name__ == '__main__':
+    main()
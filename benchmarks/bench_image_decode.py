@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+大图快速解码基准测试
+生成一批大尺寸 JPEG（默认 6000x4000，约2400万像素），分别用完整解码和快速解码（draft + reduce）
+在单进程中调整到目标尺寸，输出每种方式的耗时和峰值内存，以及两种方式输出图片的像素差异
+用法: python benchmarks/bench_image_decode.py [--count 20] [--size 6000x4000] [--target 800x600]
+
+生成照片和每种方式都在单独的子进程中运行，峰值内存互不影响
+（Linux 上子进程的峰值内存从父进程继承，所以生成照片的内存也不能留在父进程中）
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import subprocess
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image, ImageChops, ImageStat
+from image_resize_engine import process_images
+from bench_image_resize import make_photos, parse_size
+from bench_name_compare import peak_rss_mb
+
+MODES = ('full', 'fast')
+
+
+def run_mode(args, mode):
+    """在当前进程中用一种方式处理全部图片，返回结果字典"""
+    width, height = parse_size(args.target)
+    paths = sorted(os.path.join(args.input_dir, name) for name in os.listdir(args.input_dir))
+    output_dir = os.path.join(args.output_root, mode)
+    os.mkdir(output_dir)
+    baseline_rss = peak_rss_mb()
+    errors = 0
+    start = time.perf_counter()
+    for _, _, error in process_images(paths, output_dir, width, height, args.quality, args.format, args.stretch,
+                                      workers=1, fast_decode=(mode == 'fast')):
+        if error is not None:
+            errors += 1
+    seconds = time.perf_counter() - start
+    return {
+        'mode': mode,
+        'seconds': round(seconds, 3),
+        'per_image_ms': round(seconds / len(paths) * 1000, 1),
+        'baseline_rss_mb': baseline_rss,
+        'peak_rss_mb': peak_rss_mb(),
+        'errors': errors,
+    }
+
+
+def run_isolated(argv, mode):
+    command = [sys.executable, os.path.abspath(__file__)] + argv + ['--single', mode]
+    output = subprocess.run(command, check=True, stdout=subprocess.PIPE).stdout
+    return json.loads(output)
+
+
+def output_difference(full_dir, fast_dir):
+    """两种方式输出图片的平均和最大逐像素差异（0~255）"""
+    means = []
+    largest = 0
+    for name in sorted(os.listdir(full_dir)):
+        with Image.open(os.path.join(full_dir, name)) as full, Image.open(os.path.join(fast_dir, name)) as fast:
+            diff = ImageChops.difference(full.convert('RGB'), fast.convert('RGB'))
+            means.append(sum(ImageStat.Stat(diff).mean) / 3)
+            largest = max(largest, max(high for _, high in diff.getextrema()))
+    return sum(means) / len(means), largest
+
+
+def main():
+    parser = argparse.ArgumentParser(description='大图快速解码基准测试')
+    parser.add_argument('--count', type=int, default=20, help='图片数量')
+    parser.add_argument('--size', default='6000x4000', help='合成照片的尺寸')
+    parser.add_argument('--target', default='800x600', help='调整后的尺寸')
+    parser.add_argument('--format', default='jpg', choices=['jpg', 'png'])
+    parser.add_argument('--quality', type=int, default=85)
+    parser.add_argument('--stretch', action='store_true', help='强制拉伸（默认保持比例并居中）')
+    parser.add_argument('--temp-dir', default=None, help='合成照片和输出图片的临时目录')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--single', choices=MODES, default=None, help=argparse.SUPPRESS)
+    parser.add_argument('--generate', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--input-dir', default=None, help=argparse.SUPPRESS)
+    parser.add_argument('--output-root', default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.single is not None:
+        json.dump(run_mode(args, args.single), sys.stdout)
+        return
+    if args.generate:
+        # 大图只用两种底图，控制生成时的内存
+        make_photos(args.input_dir, args.count, parse_size(args.size), args.seed, variants=2)
+        return
+
+    work_dir = tempfile.mkdtemp(prefix='bench_image_decode_', dir=args.temp_dir)
+    try:
+        input_dir = os.path.join(work_dir, 'input')
+        os.mkdir(input_dir)
+        start = time.perf_counter()
+        subprocess.run([sys.executable, os.path.abspath(__file__), '--generate', '--input-dir', input_dir,
+                        '--count', str(args.count), '--size', args.size, '--seed', str(args.seed)], check=True)
+        print(f"生成 {args.count} 张 {args.size} 的照片用时 {time.perf_counter() - start:.1f} 秒")
+
+        argv = ['--target', args.target, '--format', args.format, '--quality', str(args.quality),
+                '--input-dir', input_dir, '--output-root', work_dir]
+        if args.stretch:
+            argv.append('--stretch')
+
+        print(f"{'方式':>6} {'耗时(秒)':>10} {'每张(毫秒)':>12} {'峰值内存MB':>12}")
+        results = {}
+        for mode in MODES:
+            result = results[mode] = run_isolated(argv, mode)
+            print(f"{mode:>6} {result['seconds']:>10.2f} {result['per_image_ms']:>12.1f} "
+                  f"{str(result['peak_rss_mb']):>12}")
+            if result['errors']:
+                print(f"警告: {result['errors']} 个文件处理出错")
+
+        speedup = results['full']['seconds'] / results['fast']['seconds'] if results['fast']['seconds'] else float('nan')
+        print(f"快速解码加速比: {speedup:.2f}")
+        mean, largest = output_difference(os.path.join(work_dir, 'full'), os.path.join(work_dir, 'fast'))
+        print(f"输出图片的像素差异: 平均 {mean:.2f}，最大 {largest}（0~255）")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+图片批量调整基准测试
+生成一批合成照片（带噪声的渐变，JPEG 压缩后大小接近真实照片），用不同的进程数处理同一批图片，
+输出每种进程数的耗时、每秒处理的图片数、相对单进程的加速比和并行效率（加速比/进程数）
+用法: python benchmarks/bench_image_resize.py [--count 2000] [--workers 1 2 4 8] [--size 2048x1536]
+"""
+
+import os
+import sys
+import time
+import shutil
+import random
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image, ImageChops
+from image_resize_engine import process_images, DEFAULT_WORKERS
+
+
+def parse_size(text):
+    width, _, height = text.lower().partition('x')
+    return int(width), int(height)
+
+
+def make_photos(directory, count, size, seed, variants=8):
+    """
+    生成 count 张合成照片，返回路径列表（variants 种底图轮流加不同的噪声，生成比逐张随机快得多；
+    照片很大时减少 variants 以控制生成时的内存）
+    """
+    rng = random.Random(seed)
+    gradient = Image.linear_gradient('L').resize(size)
+    bases = []
+    for _ in range(variants):
+        color = Image.new('RGB', size, tuple(rng.randrange(256) for _ in range(3)))
+        bases.append(Image.merge('RGB', [ImageChops.add(band, gradient, scale=2.0) for band in color.split()]))
+    noises = [Image.merge('RGB', [Image.effect_noise(size, rng.uniform(10, 40)) for _ in range(3)])
+              for _ in range(variants)]
+
+    paths = []
+    for index in range(count):
+        photo = ImageChops.blend(bases[index % len(bases)], noises[(index // len(bases)) % len(noises)], 0.3)
+        path = os.path.join(directory, f"photo_{index:06d}.jpg")
+        photo.save(path, 'JPEG', quality=90)
+        paths.append(path)
+    return paths
+
+
+def run(paths, output_dir, args, workers):
+    """处理整批图片，返回 (耗时, 出错的文件数)"""
+    width, height = parse_size(args.target)
+    errors = 0
+    start = time.perf_counter()
+    for _, _, error in process_images(paths, output_dir, width, height, args.quality, args.format,
+                                      args.stretch, workers):
+        if error is not None:
+            errors += 1
+    return time.perf_counter() - start, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description='图片批量调整基准测试')
+    parser.add_argument('--count', type=int, default=2000, help='图片数量')
+    parser.add_argument('--size', default='2048x1536', help='合成照片的尺寸')
+    parser.add_argument('--target', default='800x600', help='调整后的尺寸')
+    parser.add_argument('--workers', type=int, nargs='+', default=None,
+                        help='要测试的进程数（默认 1 2 4 ... 到CPU核数）')
+    parser.add_argument('--format', default='jpg', choices=['jpg', 'png'])
+    parser.add_argument('--quality', type=int, default=85)
+    parser.add_argument('--stretch', action='store_true', help='强制拉伸（默认保持比例并居中）')
+    parser.add_argument('--temp-dir', default=None, help='合成照片和输出图片的临时目录')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    workers_list = args.workers
+    if not workers_list:
+        workers_list = [1]
+        while workers_list[-1] * 2 < DEFAULT_WORKERS:
+            workers_list.append(workers_list[-1] * 2)
+        if workers_list[-1] != DEFAULT_WORKERS:
+            workers_list.append(DEFAULT_WORKERS)
+
+    work_dir = tempfile.mkdtemp(prefix='bench_image_resize_', dir=args.temp_dir)
+    try:
+        input_dir = os.path.join(work_dir, 'input')
+        os.mkdir(input_dir)
+        start = time.perf_counter()
+        paths = make_photos(input_dir, args.count, parse_size(args.size), args.seed)
+        print(f"生成 {len(paths)} 张 {args.size} 的照片用时 {time.perf_counter() - start:.1f} 秒（CPU核数 {DEFAULT_WORKERS}）")
+
+        print(f"{'进程数':>6} {'耗时(秒)':>10} {'图片/秒':>10} {'加速比':>8} {'效率':>8}")
+        baseline = None
+        for workers in workers_list:
+            output_dir = os.path.join(work_dir, f'output_{workers}')
+            os.mkdir(output_dir)
+            seconds, errors = run(paths, output_dir, args, workers)
+            baseline = baseline or seconds
+            speedup = baseline / seconds
+            print(f"{workers:>6} {seconds:>10.2f} {len(paths) / seconds:>10.1f} {speedup:>8.2f} {speedup / workers:>8.0%}")
+            if errors:
+                print(f"警告: {errors} 个文件处理出错")
+            shutil.rmtree(output_dir, ignore_errors=True)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+姓名比较引擎基准测试
+生成指定规模的合成名单文件，分别计时 读取、规范化、比较、结果整理 四个阶段并记录峰值内存，
+结果以 JSON 输出，可用 --compare 对比两次运行（如两个提交）的结果
+
+用法:
+    python benchmarks/bench_name_compare.py --sizes 10000 100000 1000000 --output before.json
+    python benchmarks/bench_name_compare.py --compare before.json after.json
+
+每个规模在单独的子进程中运行，峰值内存互不影响；读取以外的阶段会把输入重新读一遍，
+各阶段耗时为该遍总耗时减去前面阶段的耗时
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import subprocess
+
+try:
+    import resource
+except ImportError:
+    # Windows 上没有 resource 模块，不记录峰值内存
+    resource = None
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from name_compare_engine import (StreamingComparator, NameNormalizer, ResultStore, iter_names_from_path,
+                                 popcount, DEFAULT_MEMORY_LIMIT, DEFAULT_BUCKET_COUNT)
+from rosters import write_roster, SCRIPTS, SCRIPT_CJK
+
+STAGES = ('parse', 'normalize', 'diff', 'materialize')
+# 结果整理阶段每批加入 ResultStore 的数量（与界面的批大小一致）
+MATERIALIZE_CHUNK = 5000
+
+
+def peak_rss_mb():
+    """当前进程到目前为止的峰值常驻内存（MB）"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 上单位为 KB，macOS 上为字节
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def run_case(args, size):
+    """在当前进程中运行一个规模，返回结果字典"""
+    work_dir = tempfile.mkdtemp(prefix='bench_name_compare_', dir=args.temp_dir)
+    try:
+        start = time.perf_counter()
+        paths = [write_roster(os.path.join(work_dir, 'roster0.txt'), size, args.seed, args.script,
+                              duplicate_rate=args.duplicates)]
+        for column in range(1, args.columns):
+            # 重合的姓名取自第一份名单的编号范围，新姓名从各自的编号段开始
+            paths.append(write_roster(os.path.join(work_dir, f'roster{column}.txt'), size, args.seed + column,
+                                      args.script, args.overlap, args.duplicates, base_size=size,
+                                      fresh_start=size * column))
+        generate_seconds = time.perf_counter() - start
+        steps = [step for step in args.normalize.split(',') if step]
+
+        stages = {}
+
+        # 读取：逐行读取所有文件
+        start = time.perf_counter()
+        lines = sum(1 for path in paths for _ in iter_names_from_path(path, 'utf-8'))
+        parse_seconds = time.perf_counter() - start
+        stages['parse'] = {'seconds': parse_seconds, 'peak_rss_mb': peak_rss_mb()}
+
+        # 规范化：读取并计算比较键（每次使用新的缓存，避免命中上一阶段的结果）
+        start = time.perf_counter()
+        if steps:
+            normalizer = NameNormalizer(steps)
+            for path in paths:
+                for _ in normalizer.iter_keyed(iter_names_from_path(path, 'utf-8')):
+                    pass
+        normalize_total = time.perf_counter() - start
+        stages['normalize'] = {'seconds': max(normalize_total - parse_seconds, 0.0) if steps else 0.0,
+                               'peak_rss_mb': peak_rss_mb()}
+
+        # 比较：读取、规范化并合并成员位掩码，收集只出现在一列中的姓名
+        normalizer = NameNormalizer(steps) if steps else None
+        comparator = StreamingComparator(args.memory_limit, args.buckets, args.temp_dir, normalizer=normalizer)
+        names = []
+        masks = []
+        start = time.perf_counter()
+        for name, mask in comparator.membership([iter_names_from_path(path, 'utf-8') for path in paths]):
+            if popcount(mask) == 1:
+                names.append(name)
+                masks.append(mask)
+        diff_total = time.perf_counter() - start
+        stages['diff'] = {'seconds': max(diff_total - (normalize_total if steps else parse_seconds), 0.0),
+                          'peak_rss_mb': peak_rss_mb()}
+
+        # 结果整理：按界面的方式分批加入 ResultStore 并排序
+        start = time.perf_counter()
+        store = ResultStore()
+        for offset in range(0, len(names), MATERIALIZE_CHUNK):
+            store.append_unsorted(names[offset:offset + MATERIALIZE_CHUNK], masks[offset:offset + MATERIALIZE_CHUNK])
+        store.refresh()
+        stages['materialize'] = {'seconds': time.perf_counter() - start, 'peak_rss_mb': peak_rss_mb()}
+
+        for stage in stages.values():
+            stage['seconds'] = round(stage['seconds'], 4)
+        return {
+            'size': size,
+            'lines': lines,
+            'results': len(names),
+            'generate_seconds': round(generate_seconds, 3),
+            'stages': stages,
+        }
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def run_isolated(argv, size):
+    """在子进程中运行一个规模，使每个规模的峰值内存单独统计"""
+    command = [sys.executable, os.path.abspath(__file__)] + argv + ['--single', str(size)]
+    output = subprocess.run(command, check=True, stdout=subprocess.PIPE).stdout
+    return json.loads(output)
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=os.path.dirname(os.path.abspath(__file__)),
+                              check=True, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                              universal_newlines=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare_reports(old_path, new_path):
+    """逐个规模、逐个阶段对比两份结果，打印耗时比值（新/旧）"""
+    with open(old_path, 'r', encoding='utf-8') as f:
+        old = {case['size']: case for case in json.load(f)['cases']}
+    with open(new_path, 'r', encoding='utf-8') as f:
+        new = {case['size']: case for case in json.load(f)['cases']}
+
+    print(f"{'规模':>10} {'阶段':>12} {'旧(秒)':>10} {'新(秒)':>10} {'比值':>8} {'旧内存MB':>10} {'新内存MB':>10}")
+    for size in sorted(set(old) & set(new)):
+        for stage in STAGES:
+            before = old[size]['stages'][stage]
+            after = new[size]['stages'][stage]
+            ratio = after['seconds'] / before['seconds'] if before['seconds'] else float('nan')
+            print(f"{size:>10} {stage:>12} {before['seconds']:>10.3f} {after['seconds']:>10.3f} {ratio:>8.2f} "
+                  f"{str(before['peak_rss_mb']):>10} {str(after['peak_rss_mb']):>10}")
+    missing = sorted(set(old) ^ set(new))
+    if missing:
+        print(f"只在一份结果中出现的规模: {missing}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='姓名比较引擎基准测试')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000, 1000000],
+                        help='每份名单的行数（可到 50000000，需要相应的磁盘空间和时间）')
+    parser.add_argument('--columns', type=int, default=2, help='名单份数')
+    parser.add_argument('--script', choices=SCRIPTS, default=SCRIPT_CJK, help='中文姓名或拼音姓名')
+    parser.add_argument('--overlap', type=float, default=0.9, help='其他名单与第一份名单的重合率')
+    parser.add_argument('--duplicates', type=float, default=0.01, help='名单内的重复率')
+    parser.add_argument('--normalize', default='width,space,case', help='逗号分隔的规范化步骤，留空表示不规范化')
+    parser.add_argument('--memory-limit', type=int, default=DEFAULT_MEMORY_LIMIT)
+    parser.add_argument('--buckets', type=int, default=DEFAULT_BUCKET_COUNT)
+    parser.add_argument('--temp-dir', default=None, help='名单文件和溢写桶文件的临时目录')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', default=None, help='把 JSON 结果写入该文件（默认输出到标准输出）')
+    parser.add_argument('--compare', nargs=2, metavar=('OLD', 'NEW'), help='对比两份 JSON 结果')
+    parser.add_argument('--single', type=int, default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.compare:
+        compare_reports(*args.compare)
+        return
+    if args.columns < 2:
+        parser.error('至少需要两份名单')
+
+    if args.single is not None:
+        json.dump(run_case(args, args.single), sys.stdout)
+        return
+
+    # 子进程使用相同的参数（去掉输出文件）
+    argv = []
+    for option in ('columns', 'script', 'overlap', 'duplicates', 'normalize', 'memory_limit', 'buckets', 'seed'):
+        argv += ['--' + option.replace('_', '-'), str(getattr(args, option))]
+    if args.temp_dir:
+        argv += ['--temp-dir', args.temp_dir]
+
+    cases = []
+    for size in args.sizes:
+        case = run_isolated(argv, size)
+        cases.append(case)
+        timings = ' '.join(f"{stage}={case['stages'][stage]['seconds']:.3f}s" for stage in STAGES)
+        print(f"规模 {size}: {timings} 峰值内存={case['stages']['materialize']['peak_rss_mb']}MB",
+              file=sys.stderr)
+
+    report = {
+        'revision': git_revision(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'parameters': {option: getattr(args, option) for option in
+                       ('columns', 'script', 'overlap', 'duplicates', 'normalize', 'memory_limit', 'buckets', 'seed')},
+        'cases': cases,
+    }
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    else:
+        json.dump(report, sys.stdout, ensure_ascii=False, indent=2)
+        sys.stdout.write('\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+基准测试共用的合成名单生成器
+可生成中文或拼音姓名，按比例控制两份名单的重合率和名单内的重复率，逐行产出不占用整份名单的内存
+"""
+
+import random
+
+
+SURNAMES = "王李张刘陈杨黄赵吴周徐孙马朱胡郭何高林罗郑梁谢宋唐许韩冯邓曹彭曾肖田董袁潘于蒋蔡余杜叶程苏魏吕丁任沈姚卢姜崔钟谭陆汪范金石廖贾夏韦付方白邹孟熊秦邱江尹薛闫段雷侯龙史陶黎贺顾毛郝龚邵万钱严覃武戴莫孔向汤"
+GIVEN_CHARS = "伟芳娜敏静丽强磊军洋勇艳杰娟涛明超秀霞平刚桂英华玉萍红建文辉力兰斌宇浩凯健俊帆帅旭宁龙林欣佳怡晨阳雪梅琳婷颖慧鹏飞峰志忠海波云春燕丹雷晶莉新国庆东亮成荣"
+
+ROMAN_SURNAMES = ("Wang", "Li", "Zhang", "Liu", "Chen", "Yang", "Huang", "Zhao", "Wu", "Zhou", "Xu", "Sun",
+                  "Ma", "Zhu", "Hu", "Guo", "He", "Gao", "Lin", "Luo", "Zheng", "Liang", "Xie", "Song",
+                  "Tang", "Han", "Feng", "Deng", "Cao", "Peng", "Zeng", "Xiao", "Tian", "Dong", "Yuan", "Pan")
+ROMAN_SYLLABLES = ("wei", "fang", "na", "min", "jing", "li", "qiang", "lei", "jun", "yang", "yong", "yan",
+                   "jie", "juan", "tao", "ming", "chao", "xiu", "xia", "ping", "gang", "gui", "ying", "hua",
+                   "yu", "hong", "jian", "wen", "hui", "lan", "bin", "hao", "kai", "jun", "fan", "xu",
+                   "ning", "long", "xin", "jia", "yi", "chen", "xue", "mei", "lin", "ting", "peng", "fei")
+
+SCRIPT_CJK = 'cjk'
+SCRIPT_ROMAN = 'roman'
+SCRIPTS = (SCRIPT_CJK, SCRIPT_ROMAN)
+
+
+def random_name(rng):
+    """生成一个随机的中文姓名（姓 + 1~2个字）"""
+    return rng.choice(SURNAMES) + ''.join(rng.choice(GIVEN_CHARS) for _ in range(rng.randint(1, 2)))
+
+
+def add_typo(name, rng):
+    """把姓名中的一个字替换为其他字，模拟错别字"""
+    i = rng.randrange(1, len(name))
+    return name[:i] + rng.choice(GIVEN_CHARS) + name[i + 1:]
+
+
+def indexed_name(index, script=SCRIPT_CJK):
+    """
+    把整数编号一一映射为姓名，不同编号一定得到不同姓名
+    名字部分按编号的各位“数字”取字，编号越大名字越长
+    """
+    if script == SCRIPT_ROMAN:
+        surnames, chars, joiner = ROMAN_SURNAMES, ROMAN_SYLLABLES, ''
+    else:
+        surnames, chars, joiner = SURNAMES, GIVEN_CHARS, ''
+    surname = surnames[index % len(surnames)]
+    index //= len(surnames)
+    given = [chars[index % len(chars)]]
+    index //= len(chars)
+    while index:
+        index -= 1
+        given.append(chars[index % len(chars)])
+        index //= len(chars)
+    given = joiner.join(given)
+    if script == SCRIPT_ROMAN:
+        return f'{surname} {given.capitalize()}'
+    return surname + given
+
+
+def iter_roster(size, seed, script=SCRIPT_CJK, overlap=0.0, duplicate_rate=0.0, base_size=0, fresh_start=None):
+    """
+    逐行产出一份名单
+
+    名单中约 overlap 比例的姓名取自编号 [0, base_size) 的“基准名单”（即与基准名单重合），
+    其余姓名从编号 fresh_start（默认为 base_size）开始依次取新编号；
+    另有约 duplicate_rate 比例的行重复本名单中已出现过的非重合姓名
+    """
+    rng = random.Random(seed)
+    first = base_size if fresh_start is None else fresh_start
+    fresh = first
+    for _ in range(size):
+        if fresh > first and rng.random() < duplicate_rate:
+            # 重复一个已经产出过的新姓名：编号落在 [first, fresh) 内，无需保存已产出的名单
+            index = rng.randrange(first, fresh)
+        elif base_size and rng.random() < overlap:
+            index = rng.randrange(base_size)
+        else:
+            index = fresh
+            fresh += 1
+        yield indexed_name(index, script)
+
+
+def write_roster(path, size, seed, script=SCRIPT_CJK, overlap=0.0, duplicate_rate=0.0, base_size=0,
+                 fresh_start=None):
+    """把名单写入文本文件（每行一个姓名）"""
+    with open(path, 'w', encoding='utf-8') as f:
+        for name in iter_roster(size, seed, script, overlap, duplicate_rate, base_size, fresh_start):
+            f.write(name + '\n')
+    return path
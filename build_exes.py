@@ -2,22 +2,47 @@
 # -*- coding: utf-8 -*-
 
 """
-编译脚本，将所有Python文件编译为单独的exe文件
+编译脚本，将所有可以直接运行的Python文件编译为单独的exe文件
+没有 __main__ 入口的库模块（如 image_resize_engine.py）不单独编译，由引用它们的程序打包进去；
+命令行工具编译为控制台程序，其他的图形界面程序不显示控制台窗口
 """
 
 import os
+import re
 import subprocess
 import sys
 from pathlib import Path
 
+# 命令行工具（输出到控制台、从标准输入读取），编译时不加 --windowed
+CONSOLE_SCRIPTS = ("name_extractor.py", "name_compare_engine.py")
+MAIN_PATTERN = re.compile(r"^if __name__ == ['\"]__main__['\"]:", re.MULTILINE)
 
-def compile_python_to_exe(script_path, output_dir="dist"):
+
+def is_entry_script(script_path):
+    """
+    判断脚本是否有 __main__ 入口（没有入口的是库模块，不需要单独编译）
+    
+    Args:
+        script_path (str): Python脚本路径
+    
+    Returns:
+        bool: 是否可以直接运行
+    """
+    try:
+        source = Path(script_path).read_text(encoding="utf-8")
+    except (OSError, UnicodeDecodeError):
+        return False
+    return MAIN_PATTERN.search(source) is not None
+
+
+def compile_python_to_exe(script_path, output_dir="dist", windowed=True):
     """
     将单个Python脚本编译为exe文件
     
     Args:
         script_path (str): Python脚本路径
         output_dir (str): 输出目录
+        windowed (bool): 是否为图形界面程序（不显示控制台窗口）
     
     Returns:
         bool: 编译是否成功
@@ -30,12 +55,12 @@ def compile_python_to_exe(script_path, output_dir="dist"):
         
         # 构建PyInstaller命令
         # --onefile: 生成单个exe文件
-        # --windowed: 对于GUI应用，不显示控制台窗口
+        # --windowed: 对于GUI应用，不显示控制台窗口（命令行工具不加）
         # --name: 指定生成的exe文件名
-        cmd = [
-            "pyinstaller",
-            "--onefile",
-            "--windowed",
+        cmd = ["pyinstaller", "--onefile"]
+        if windowed:
+            cmd.append("--windowed")
+        cmd += [
             f"--name={script_name}",
             f"--distpath={output_dir}",
             script_path
@@ -90,7 +115,8 @@ def display_menu(python_files):
     print("\\n请选择要编译的文件:")
     print("0. 全部编译")
     for i, py_file in enumerate(python_files, 1):
-        print(f"{i}. {py_file}")
+        kind = "命令行" if Path(py_file).name in CONSOLE_SCRIPTS else "图形界面"
+        print(f"{i}. {py_file}（{kind}）")
     print("q. 退出")
 
 
@@ -122,7 +148,7 @@ def compile_selected_files(selected_files):
     """
     success_count = 0
     for py_file in selected_files:
-        if compile_python_to_exe(py_file):
+        if compile_python_to_exe(py_file, windowed=Path(py_file).name not in CONSOLE_SCRIPTS):
             success_count += 1
     
     # 清理临时文件
@@ -152,12 +178,12 @@ def main():
         print("pip install pyinstaller")
         sys.exit(1)
     
-    # 查找所有Python文件（除了当前脚本）
+    # 查找所有可以直接运行的Python文件（除了当前脚本和库模块）
     current_script = Path(__file__).name
     python_files = []
     
-    for py_file in Path(".").glob("*.py"):
-        if py_file.name != current_script:
+    for py_file in sorted(Path(".").glob("*.py")):
+        if py_file.name != current_script and is_entry_script(py_file):
             python_files.append(str(py_file))
     
     if not python_files:
@@ -1,16 +1,400 @@
 import sys
 import os
-import re
+import sqlite3
+import threading
+import multiprocessing
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
-                             QLabel, QTextEdit, QPushButton, QTableWidget, QTableWidgetItem,
-                             QSplitter, QGroupBox, QFileDialog, QMessageBox, QLineEdit)
-from PyQt5.QtCore import Qt
+                             QLabel, QListView, QPushButton, QTableView, QHeaderView,
+                             QSplitter, QGroupBox, QFileDialog, QMessageBox, QLineEdit, QCheckBox,
+                             QProgressBar, QSpinBox, QComboBox)
+from PyQt5.QtCore import (Qt, QAbstractListModel, QAbstractTableModel, QModelIndex, QVariant, QThread,
+                          QFileSystemWatcher, pyqtSignal)
 from PyQt5.QtGui import QClipboard
+from qt_table_utils import resize_columns_to_visible_rows
+from name_extractor import (NameExtractor, parse_filter_words, parse_glob_patterns, scan_directory,
+                            extract_chunks, extract_parallel, filter_signature, CachedLookup, ExtractionCache,
+                            ExtractionStore, FolderSnapshot, ExtractionResults, StageProfiler, iter_timed,
+                            DEFAULT_EXCLUDE_PATTERNS, EXTRACT_CHUNK_SIZE, PARALLEL_MIN_FILES)
+
+# 监视文件夹时默认的检查间隔（秒）
+DEFAULT_WATCH_INTERVAL = 5
+
+
+class FolderScanner(QThread):
+    """
+    后台扫描文件夹的线程，按批次发出找到的文件（相对路径），界面边扫描边显示
+    """
+    files_found = pyqtSignal(list)
+    # 参数：找到的文件总数、是否被取消
+    scan_finished = pyqtSignal(int, bool)
+    error_occurred = pyqtSignal(str)
+
+    def __init__(self, folder_path, include=(), exclude=DEFAULT_EXCLUDE_PATTERNS, recursive=True, profiler=None):
+        super().__init__()
+        self.folder_path = folder_path
+        self.include = include
+        self.exclude = exclude
+        self.recursive = recursive
+        # 不为 None 时记录扫描耗时（只在本线程中写入，扫描结束后由界面合并）
+        self.profiler = profiler
+        self._cancelled = False
+
+    def cancel(self):
+        self._cancelled = True
+
+    def is_cancelled(self):
+        return self._cancelled
+
+    def run(self):
+        total = 0
+        try:
+            batches = scan_directory(self.folder_path, self.include, self.exclude, self.recursive,
+                                     should_cancel=self.is_cancelled)
+            if self.profiler is not None:
+                batches = iter_timed(batches, self.profiler, 'scan')
+            for batch in batches:
+                total += len(batch)
+                self.files_found.emit(batch)
+        except OSError as e:
+            self.error_occurred.emit(str(e))
+        self.scan_finished.emit(total, self._cancelled)
+
+
+class ExtractWorker(QThread):
+    """
+    后台提取姓名的线程，文件名分块交给进程池并行处理，按原顺序分批发出结果
+    """
+    progress_updated = pyqtSignal(int)
+    # 参数：这一批的文件路径、姓名列表（无法提取时为空字符串）
+    results_ready = pyqtSignal(list, list)
+    # 参数：到目前为止缓存命中、未命中的文件名数量
+    cache_stats = pyqtSignal(int, int)
+    # 参数：是否被取消
+    extraction_finished = pyqtSignal(bool)
+    error_occurred = pyqtSignal(str)
+
+    def __init__(self, file_paths, filter_words, cache=None, use_store=False, profiler=None):
+        super().__init__()
+        # 与界面共用同一个文件列表（提取期间界面不会修改它），不复制
+        self.file_paths = file_paths
+        self.filter_words = filter_words
+        self.cache = cache
+        self.use_store = use_store
+        # 不为 None 时记录各阶段耗时（只在本线程中写入，提取结束后由界面合并）
+        self.profiler = profiler
+        self._cancelled = False
+
+    def cancel(self):
+        self._cancelled = True
+
+    def is_cancelled(self):
+        return self._cancelled
+
+    def run(self):
+        # SQLite 连接只能在创建它的线程中使用，所以磁盘缓存在工作线程中打开
+        store = None
+        if self.use_store:
+            try:
+                store = ExtractionStore()
+            except (OSError, sqlite3.Error):
+                store = None
+        lookup = CachedLookup(self.filter_words, self.cache, store)
+        try:
+            paths = self.file_paths
+            total = len(paths)
+            chunks = (paths[offset:offset + EXTRACT_CHUNK_SIZE] for offset in range(0, total, EXTRACT_CHUNK_SIZE))
+            done = 0
+            # 只从文件名本身提取姓名，不包括所在的子文件夹
+            for chunk, names in extract_chunks(chunks, self.filter_words, parallel=total >= PARALLEL_MIN_FILES,
+                                               should_cancel=self.is_cancelled, lookup=lookup,
+                                               key=os.path.basename, profiler=self.profiler):
+                done += len(chunk)
+                self.cache_stats.emit(lookup.hits, lookup.misses)
+                self.results_ready.emit(chunk, names)
+                self.progress_updated.emit(int(done * 100 / total))
+        except Exception as e:
+            self.error_occurred.emit(str(e))
+        finally:
+            if store is not None:
+                store.close()
+        self.extraction_finished.emit(self._cancelled)
+
+
+class FolderWatcher(QThread):
+    """
+    监视文件夹的线程
+    按检查间隔（或收到根文件夹的变化通知时）比较文件夹快照，只提取新增和重命名的文件，按行发出变化
+    """
+    # 参数：删除的文件、重命名的 [(原路径, 新路径, 姓名)]、新增的 [(路径, 姓名)]
+    changes_ready = pyqtSignal(list, list, list)
+    error_occurred = pyqtSignal(str)
+
+    def __init__(self, folder_path, include, exclude, recursive, interval, filter_words, cache=None, use_store=False):
+        super().__init__()
+        self.snapshot = FolderSnapshot(folder_path, include, exclude, recursive)
+        self.interval = interval
+        self.filter_words = filter_words
+        self.cache = cache
+        self.use_store = use_store
+        self._cancelled = False
+        self._wake = threading.Event()
+
+    def trigger(self):
+        """立即检查一次（不等检查间隔）"""
+        self._wake.set()
+
+    def cancel(self):
+        self._cancelled = True
+        self._wake.set()
+
+    def is_cancelled(self):
+        return self._cancelled
+
+    def _extract(self, paths, lookup):
+        """按顺序逐块产出 (起始位置, 姓名列表)，只从文件名本身提取"""
+        return extract_parallel([os.path.basename(path) for path in paths], self.filter_words,
+                                should_cancel=self.is_cancelled, lookup=lookup)
+
+    def run(self):
+        # SQLite 连接只能在创建它的线程中使用，所以磁盘缓存在工作线程中打开
+        store = None
+        if self.use_store:
+            try:
+                store = ExtractionStore()
+            except (OSError, sqlite3.Error):
+                store = None
+        lookup = CachedLookup(self.filter_words, self.cache, store)
+        try:
+            while not self._cancelled:
+                self._wake.clear()
+                added, removed, renamed = self.snapshot.refresh(should_cancel=self.is_cancelled)
+                if self._cancelled:
+                    break
+
+                if removed or renamed:
+                    names = [name for _, chunk in self._extract([new for _, new in renamed], lookup) for name in chunk]
+                    self.changes_ready.emit(removed, [(old, new, name) for (old, new), name in zip(renamed, names)], [])
+                # 第一次检查时所有文件都算新增，分批发出使界面边提取边显示
+                for offset, names in self._extract(added, lookup):
+                    self.changes_ready.emit([], [], list(zip(added[offset:offset + len(names)], names)))
+
+                self._wake.wait(self.interval)
+        except OSError as e:
+            self.error_occurred.emit(str(e))
+        finally:
+            if store is not None:
+                store.close()
+
+
+class FileListModel(QAbstractListModel):
+    """
+    文件列表的模型
+    直接显示界面和提取线程共用的路径列表，不拼接成文本；视图只绘制可见的行，数百万个文件也能立即显示
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.paths = []
+        self._count = 0  # 视图已知的行数，路径列表在外部增删后由 sync() 通知视图
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._count
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or role != Qt.DisplayRole:
+            return QVariant()
+        return self.paths[index.row()]
+
+    def set_paths(self, paths):
+        """显示另一个路径列表（共用，不复制）"""
+        self.beginResetModel()
+        self.paths = paths
+        self._count = len(paths)
+        self.endResetModel()
+
+    def sync(self, changed=False):
+        """
+        路径列表在外部追加或删除后通知视图；changed 为 True 时已有的行也可能被修改（如重命名）
+        """
+        count = len(self.paths)
+        if changed and min(count, self._count):
+            self.dataChanged.emit(self.index(0), self.index(min(count, self._count) - 1))
+        if count > self._count:
+            self.beginInsertRows(QModelIndex(), self._count, count - 1)
+            self._count = count
+            self.endInsertRows()
+        elif count < self._count:
+            self.beginRemoveRows(QModelIndex(), count, self._count - 1)
+            self._count = count
+            self.endRemoveRows()
+
+
+class ExtractionResultModel(QAbstractTableModel):
+    """
+    提取结果的表格模型
+    数据保存在 ExtractionResults 的平行列表中，只有视图实际绘制的行才会生成单元格文本；
+    按姓名筛选时只显示倒排索引中该姓名对应的行
+    """
+    HEADERS = ["文件名", "提取的姓名", "状态"]
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.store = ExtractionResults()
+        # 筛选的姓名（空字符串表示未找到姓名的文件），None 表示显示全部
+        self.filter_name = None
+        self._rows = None  # 筛选时显示的结果行号
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self._rows) if self._rows is not None else len(self.store)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or role != Qt.DisplayRole:
+            return QVariant()
+        row, column = index.row(), index.column()
+        if self._rows is not None:
+            row = self._rows[row]
+        if column == 0:
+            return self.store.path_at(row)
+        name = self.store.name_at(row)
+        if column == 1:
+            return name if name else "未找到姓名"
+        return "成功" if name else "失败"
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return QVariant()
+        if orientation == Qt.Horizontal:
+            return self.HEADERS[section]
+        return section + 1
+
+    def set_filter_name(self, name):
+        """只显示提取出该姓名的文件；None 显示全部，空字符串显示未找到姓名的文件"""
+        self.beginResetModel()
+        self.filter_name = name
+        self._rows = self.store.rows_for(name) if name is not None else None
+        self.endResetModel()
+
+    def append_results(self, paths, names):
+        """追加一批结果到末尾"""
+        if not paths:
+            return
+        if self.filter_name is not None:
+            self.beginResetModel()
+            self.store.extend(paths, names)
+            self._rows = self.store.rows_for(self.filter_name)
+            self.endResetModel()
+            return
+        first = len(self.store)
+        self.beginInsertRows(QModelIndex(), first, first + len(paths) - 1)
+        self.store.extend(paths, names)
+        self.endInsertRows()
+
+    def rename(self, old_path, new_path, name):
+        if self.filter_name is not None:
+            # 姓名可能改变，筛选的行需要重新取出
+            self.beginResetModel()
+            self.store.rename(old_path, new_path, name)
+            self._rows = self.store.rows_for(self.filter_name)
+            self.endResetModel()
+            return
+        row = self.store.rename(old_path, new_path, name)
+        self.dataChanged.emit(self.index(row, 0), self.index(row, len(self.HEADERS) - 1))
+
+    def remove(self, path):
+        """
+        删除一个文件的结果行（最后一行移入空位）
+        对视图来说是最后一行消失、被删除的行显示原最后一行的内容，所以先通知删除最后一行，再通知该行内容变化
+        """
+        if self.filter_name is not None:
+            self.beginResetModel()
+            self.store.remove(path)
+            self._rows = self.store.rows_for(self.filter_name)
+            self.endResetModel()
+            return
+        row = self.store.row_of(path)
+        if row is None:
+            return
+        last = len(self.store) - 1
+        self.beginRemoveRows(QModelIndex(), last, last)
+        self.store.remove(path)
+        self.endRemoveRows()
+        if row != last:
+            self.dataChanged.emit(self.index(row, 0), self.index(row, len(self.HEADERS) - 1))
+
+    def clear(self):
+        self.beginResetModel()
+        self.store.clear()
+        if self.filter_name is not None:
+            self._rows = []
+        self.endResetModel()
+
+
+class NameGroupModel(QAbstractTableModel):
+    """
+    按姓名汇总的表格模型：每个姓名对应的文件数量，数据来自结果存储的倒排索引
+    """
+    HEADERS = ["姓名", "文件数"]
+
+    def __init__(self, store, parent=None):
+        super().__init__(parent)
+        self.store = store
+        self.min_count = 1  # 为2时只显示出现在多个文件中的姓名
+        self._counts = []
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._counts)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or role != Qt.DisplayRole:
+            return QVariant()
+        name, count = self._counts[index.row()]
+        return name if index.column() == 0 else count
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return QVariant()
+        if orientation == Qt.Horizontal:
+            return self.HEADERS[section]
+        return section + 1
+
+    def name_at(self, row):
+        return self._counts[row][0]
+
+    def refresh(self, store=None, min_count=None):
+        """重新汇总（store 为更换后的结果存储）"""
+        self.beginResetModel()
+        if store is not None:
+            self.store = store
+        if min_count is not None:
+            self.min_count = min_count
+        self._counts = self.store.name_counts(self.min_count)
+        self.endResetModel()
 
 
 class FileNameNameExtractorApp(QMainWindow):
     def __init__(self):
         super().__init__()
+        self.scanner = None
+        self.extract_worker = None
+        self.folder_watcher = None
+        self.fs_watcher = None
+        # 每组过滤词在多次提取之间共用一个内存缓存
+        self.extraction_caches = {}
+        self.cache_hits = 0
+        self.cache_misses = 0
+        # 扫描到的文件（相对于所选文件夹的路径）
+        self.file_paths = []
+        # 性能分析：最近一次扫描的记录，以及当前显示的报告（扫描加提取）
+        self.scan_profiler = None
+        self.profiler = None
         self.initUI()
 
     def initUI(self):
@@ -49,23 +433,94 @@ class FileNameNameExtractorApp(QMainWindow):
         filter_layout.addWidget(self.filter_words_input)
         input_layout.addLayout(filter_layout)
 
+        # 扫描范围：包含/排除的文件名通配符，是否包含子文件夹
+        scan_layout = QVBoxLayout()
+        scan_layout.addWidget(QLabel("包含的文件 (通配符，用逗号分隔，留空表示全部):"))
+        self.include_input = QLineEdit()
+        self.include_input.setPlaceholderText("例如: *.pdf,*.docx")
+        scan_layout.addWidget(self.include_input)
+        scan_layout.addWidget(QLabel("排除的文件或文件夹 (通配符，用逗号分隔):"))
+        self.exclude_input = QLineEdit(','.join(DEFAULT_EXCLUDE_PATTERNS))
+        scan_layout.addWidget(self.exclude_input)
+        self.recursive_checkbox = QCheckBox("包含子文件夹")
+        self.recursive_checkbox.setChecked(True)
+        scan_layout.addWidget(self.recursive_checkbox)
+        disk_cache_layout = QHBoxLayout()
+        self.disk_cache_checkbox = QCheckBox("把提取结果缓存到磁盘（再次提取时跳过未变化的文件名）")
+        self.disk_cache_checkbox.setToolTip("每天重复提取同一批归档文件夹时使用，缓存过大时自动清理")
+        disk_cache_layout.addWidget(self.disk_cache_checkbox)
+        self.clear_disk_cache_btn = QPushButton("清空缓存")
+        self.clear_disk_cache_btn.clicked.connect(self.clear_disk_cache)
+        disk_cache_layout.addWidget(self.clear_disk_cache_btn)
+        disk_cache_layout.addStretch()
+        scan_layout.addLayout(disk_cache_layout)
+        watch_layout = QHBoxLayout()
+        self.watch_checkbox = QCheckBox("监视文件夹（自动处理新增、删除和重命名的文件）")
+        self.watch_checkbox.toggled.connect(self.set_watch_mode)
+        self.watch_interval_spinbox = QSpinBox()
+        self.watch_interval_spinbox.setRange(1, 3600)
+        self.watch_interval_spinbox.setValue(DEFAULT_WATCH_INTERVAL)
+        watch_layout.addWidget(self.watch_checkbox)
+        watch_layout.addWidget(QLabel("检查间隔(秒):"))
+        watch_layout.addWidget(self.watch_interval_spinbox)
+        watch_layout.addStretch()
+        scan_layout.addLayout(watch_layout)
+        self.profile_checkbox = QCheckBox("性能分析（记录各阶段耗时和提取姓名所用的规则）")
+        scan_layout.addWidget(self.profile_checkbox)
+        input_layout.addLayout(scan_layout)
+
         # 文件列表显示
         file_list_layout = QVBoxLayout()
         file_list_layout.addWidget(QLabel("文件列表:"))
-        self.file_list_text = QTextEdit()
-        self.file_list_text.setReadOnly(True)
-        file_list_layout.addWidget(self.file_list_text)
+        self.file_list_model = FileListModel(self)
+        self.file_list_view = QListView()
+        self.file_list_view.setModel(self.file_list_model)
+        # 所有行高度相同，视图不需要逐行计算布局
+        self.file_list_view.setUniformItemSizes(True)
+        file_list_layout.addWidget(self.file_list_view)
         input_layout.addLayout(file_list_layout)
 
         # 右侧结果区域
         result_group = QGroupBox("提取结果")
         result_layout = QVBoxLayout(result_group)
 
-        # 结果表格
-        self.result_table = QTableWidget()
-        self.result_table.setColumnCount(3)
-        self.result_table.setHorizontalHeaderLabels(["文件名", "提取的姓名", "状态"])
-        result_layout.addWidget(self.result_table)
+        # 结果表格（数据保存在模型中，只绘制可见的行）
+        self.result_model = ExtractionResultModel(self)
+        self.result_view = QTableView()
+        self.result_view.setModel(self.result_model)
+        self.result_view.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        result_layout.addWidget(self.result_view)
+
+        # 按姓名查找对应的文件，或只显示未找到姓名的文件
+        lookup_layout = QHBoxLayout()
+        lookup_layout.addWidget(QLabel("查找姓名:"))
+        self.name_lookup_input = QLineEdit()
+        self.name_lookup_input.setPlaceholderText("输入姓名，只显示提取出该姓名的文件")
+        self.name_lookup_input.textChanged.connect(self.update_result_filter)
+        lookup_layout.addWidget(self.name_lookup_input)
+        self.unmatched_checkbox = QCheckBox("只显示未找到姓名的文件")
+        self.unmatched_checkbox.toggled.connect(self.update_result_filter)
+        lookup_layout.addWidget(self.unmatched_checkbox)
+        result_layout.addLayout(lookup_layout)
+
+        # 按姓名汇总：每个姓名的文件数量，点击姓名查看对应的文件
+        group_layout = QHBoxLayout()
+        group_layout.addWidget(QLabel("姓名汇总:"))
+        self.group_combo = QComboBox()
+        self.group_combo.addItem("全部姓名", 1)
+        self.group_combo.addItem("重复的姓名（出现在多个文件中）", 2)
+        self.group_combo.currentIndexChanged.connect(self.refresh_name_groups)
+        group_layout.addWidget(self.group_combo)
+        group_layout.addStretch()
+        result_layout.addLayout(group_layout)
+        self.group_model = NameGroupModel(self.result_model.store, self)
+        self.group_view = QTableView()
+        self.group_view.setModel(self.group_model)
+        self.group_view.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.group_view.clicked.connect(self.show_group_files)
+        result_layout.addWidget(self.group_view)
+        self.group_summary_label = QLabel("")
+        result_layout.addWidget(self.group_summary_label)
 
         # 添加到分隔器
         splitter.addWidget(input_group)
@@ -76,16 +531,39 @@ class FileNameNameExtractorApp(QMainWindow):
         self.extract_btn = QPushButton("提取姓名")
         self.extract_btn.clicked.connect(self.extract_names)
         self.extract_btn.setEnabled(False)
+        self.cancel_btn = QPushButton("取消")
+        self.cancel_btn.clicked.connect(self.cancel_extraction)
+        self.cancel_btn.setEnabled(False)
         self.copy_btn = QPushButton("复制所有姓名")
         self.copy_btn.clicked.connect(self.copy_all_names)
         self.copy_btn.setEnabled(False)
+        self.export_btn = QPushButton("导出结果")
+        self.export_btn.clicked.connect(self.export_results)
+        self.export_btn.setEnabled(False)
+        self.export_profile_btn = QPushButton("导出性能分析")
+        self.export_profile_btn.clicked.connect(self.export_profile)
+        self.export_profile_btn.setEnabled(False)
         self.clear_btn = QPushButton("清空")
         self.clear_btn.clicked.connect(self.clear_all)
         button_layout.addWidget(self.extract_btn)
+        button_layout.addWidget(self.cancel_btn)
         button_layout.addWidget(self.copy_btn)
+        button_layout.addWidget(self.export_btn)
+        button_layout.addWidget(self.export_profile_btn)
         button_layout.addWidget(self.clear_btn)
         main_layout.addLayout(button_layout)
 
+        # 进度条
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setValue(0)
+        main_layout.addWidget(self.progress_bar)
+
+        # 性能分析摘要（开启性能分析后显示）
+        self.profile_label = QLabel("")
+        self.profile_label.setTextInteractionFlags(Qt.TextSelectableByMouse)
+        self.profile_label.setVisible(False)
+        main_layout.addWidget(self.profile_label)
+
         # 状态栏
         self.statusBar().showMessage('请选择文件夹')
 
@@ -93,25 +571,72 @@ class FileNameNameExtractorApp(QMainWindow):
         folder_path = QFileDialog.getExistingDirectory(self, "选择文件夹")
         if folder_path:
             self.folder_path_label.setText(folder_path)
-            self.load_file_list(folder_path)
-            self.extract_btn.setEnabled(True)
-            self.statusBar().showMessage(f'已选择文件夹: {folder_path}')
+            if self.watch_checkbox.isChecked():
+                self.start_watch(folder_path)
+            else:
+                self.load_file_list(folder_path)
 
     def load_file_list(self, folder_path):
-        try:
-            # 获取文件夹中的所有文件（不包括子文件夹中的文件和其他脚本）
-            files = []
-            for f in os.listdir(folder_path):
-                file_path = os.path.join(folder_path, f)
-                # 只添加文件，不添加目录和其他Python脚本
-                if os.path.isfile(file_path) and not f.endswith('.py'):
-                    files.append(f)
-
-            # 显示文件列表
-            self.file_list_text.setPlainText('\n'.join(files))
-            self.statusBar().showMessage(f'找到 {len(files)} 个文件')
-        except Exception as e:
-            QMessageBox.critical(self, "错误", f"读取文件夹时出错: {str(e)}")
+        """
+        在后台线程中扫描文件夹，找到的文件分批显示
+        """
+        self.stop_scanner()
+        self.stop_extraction()
+        self.stop_watch()
+        self.set_file_paths([])
+        self.clear_results()
+
+        self.scan_profiler = StageProfiler() if self.profile_checkbox.isChecked() else None
+        self.scanner = FolderScanner(folder_path,
+                                     parse_glob_patterns(self.include_input.text()),
+                                     parse_glob_patterns(self.exclude_input.text()),
+                                     self.recursive_checkbox.isChecked(),
+                                     StageProfiler() if self.scan_profiler is not None else None)
+        self.scanner.files_found.connect(self.on_files_found)
+        self.scanner.scan_finished.connect(self.on_scan_finished)
+        self.scanner.error_occurred.connect(self.on_scan_error)
+        self.extract_btn.setEnabled(False)
+        self.statusBar().showMessage('正在扫描文件夹...')
+        self.scanner.start()
+
+    def stop_scanner(self):
+        """取消正在进行的扫描并等待线程结束"""
+        if self.scanner is not None:
+            for signal in (self.scanner.files_found, self.scanner.scan_finished, self.scanner.error_occurred):
+                signal.disconnect()
+            self.scanner.cancel()
+            self.scanner.wait()
+            self.scanner = None
+
+    def on_files_found(self, batch):
+        if self.scan_profiler is not None:
+            start = self.scan_profiler.clock()
+        self.file_paths.extend(batch)
+        self.file_list_model.sync()
+        if self.scan_profiler is not None:
+            self.scan_profiler.lap('file_list', start)
+        self.statusBar().showMessage(f'正在扫描文件夹... 已找到 {len(self.file_paths)} 个文件')
+
+    def set_file_paths(self, paths):
+        """更换文件列表，文件列表视图与提取线程都直接使用这个列表"""
+        self.file_paths = paths
+        self.file_list_model.set_paths(paths)
+
+    def on_scan_finished(self, total, cancelled):
+        if self.scan_profiler is not None and self.scanner is not None:
+            # 结束信号发出后线程随即退出，等待它结束再读取扫描线程的记录
+            self.scanner.wait()
+            self.scan_profiler.merge(self.scanner.profiler)
+            self.show_profile(self.scan_profiler)
+        self.scanner = None
+        self.extract_btn.setEnabled(True)
+        if cancelled:
+            self.statusBar().showMessage(f'扫描已取消，找到 {total} 个文件')
+        else:
+            self.statusBar().showMessage(f'找到 {total} 个文件')
+
+    def on_scan_error(self, message):
+        QMessageBox.critical(self, "错误", f"读取文件夹时出错: {message}")
 
     def extract_names(self):
         folder_path = self.folder_path_label.text()
@@ -121,15 +646,13 @@ class FileNameNameExtractorApp(QMainWindow):
 
         try:
             # 获取文件列表
-            file_names = self.file_list_text.toPlainText().strip().split('\n')
-            if not file_names or file_names == ['']:
+            file_names = self.file_paths
+            if not file_names:
                 QMessageBox.warning(self, "警告", "文件夹中没有文件！")
                 return
 
-            # 提取姓名并显示结果
+            # 提取姓名并显示结果（在后台线程中进行，完成后更新状态栏）
             self.extract_and_display_names(file_names)
-            
-            self.statusBar().showMessage(f'已完成从 {len(file_names)} 个文件名中提取姓名')
         except Exception as e:
             QMessageBox.critical(self, "错误", f"提取姓名时出错: {str(e)}")
 
@@ -137,123 +660,173 @@ class FileNameNameExtractorApp(QMainWindow):
         """
         获取过滤词列表
         """
-        filter_text = self.filter_words_input.text().strip()
-        if not filter_text:
-            return []
-        
         # 用逗号分隔过滤词，并清理空白字符
-        filter_words = [word.strip() for word in filter_text.split(',') if word.strip()]
-        return filter_words
+        return parse_filter_words(self.filter_words_input.text())
+
+    def create_extractor(self, profiler=None):
+        """
+        按当前的过滤词构建提取器，每次提取只构建一次
+        """
+        return NameExtractor(self.get_filter_words(), profiler=profiler)
 
     def extract_name_from_filename(self, filename):
         """
-        从文件名中提取姓名
-        支持多种格式，例如:
-        - Zhang_San_Report.docx -> Zhang San
-        - li_si_data.xlsx -> Li Si
-        - wangwu.txt -> Wang Wu
-        - Report_Zhao_Liu.pdf -> Zhao Liu
+        从文件名中提取姓名（单个文件名；批量提取请使用 create_extractor().extract_many）
+        开启性能分析时计入当前的报告
         """
-        # 获取过滤词
-        filter_words = self.get_filter_words()
-        
-        # 移除文件扩展名
-        name_part = os.path.splitext(filename)[0]
-        
-        # 移除过滤词
-        for filter_word in filter_words:
-            # 不区分大小写的过滤词移除
-            pattern = re.compile(re.escape(filter_word), re.IGNORECASE)
-            name_part = pattern.sub('', name_part)
-        
-        # 清理多余的下划线和连字符
-        name_part = re.sub(r'[_\-]+', '_', name_part)
-        name_part = re.sub(r'^_+|_+$', '', name_part)  # 移除开头和结尾的下划线
-        
-        # 如果过滤后没有内容，返回空
-        if not name_part:
-            return ""
-        
-        # 尝试多种分割方式提取姓名
-        # 1. 下划线分割
-        if '_' in name_part:
-            parts = name_part.split('_')
-            # 尝试找到可能是姓名的部分
-            for i, part in enumerate(parts):
-                # 如果部分包含中文字符，可能是中文姓名
-                if re.search(r'[\u4e00-\u9fff]+', part):
-                    return part
-                # 如果是英文，检查是否可能是英文姓名
-                elif re.match(r'^[A-Za-z]+$', part):
-                    # 如果下一个部分也是英文，可能是名和姓
-                    if i + 1 < len(parts) and re.match(r'^[A-Za-z]+$', parts[i+1]):
-                        return f"{part} {parts[i+1]}"
-                    # 单个英文部分
-                    return part.capitalize()
-        
-        # 2. 驼峰命名法 (如: zhangSanReport -> Zhang San)
-        camel_parts = re.findall(r'[A-Z][a-z]*|[a-z]+', name_part)
-        if len(camel_parts) >= 2:
-            # 如果是英文姓名，格式化为标准形式
-            name = ' '.join(camel_parts)
-            return name.title()
-        
-        # 3. 全中文或全英文文件名
-        # 中文姓名 (2-4个汉字)
-        chinese_name = re.search(r'[\u4e00-\u9fff]{2,4}', name_part)
-        if chinese_name:
-            return chinese_name.group()
-        
-        # 英文姓名 (尝试识别常见的英文名格式)
-        english_parts = re.findall(r'[A-Za-z]+', name_part)
-        if english_parts:
-            # 如果有2个或更多部分，可能是名和姓
-            if len(english_parts) >= 2:
-                return f"{english_parts[0].capitalize()} {english_parts[1].capitalize()}"
-            else:
-                return english_parts[0].capitalize()
-        
-        # 如果无法提取姓名，返回空字符串
-        return ""
+        profiler = self.profiler if self.profile_checkbox.isChecked() else None
+        return self.create_extractor(profiler).extract(filename)
 
     def extract_and_display_names(self, file_names):
+        """
+        启动后台提取线程，结果按文件列表的顺序分批加入表格
+        """
+        self.stop_extraction()
         # 清空表格
-        self.result_table.setRowCount(0)
-
-        # 添加结果到表格
-        row = 0
-        for filename in file_names:
-            extracted_name = self.extract_name_from_filename(filename)
-            
-            self.result_table.insertRow(row)
-            self.result_table.setItem(row, 0, QTableWidgetItem(filename))
-            
-            if extracted_name:
-                self.result_table.setItem(row, 1, QTableWidgetItem(extracted_name))
-                self.result_table.setItem(row, 2, QTableWidgetItem("成功"))
-            else:
-                self.result_table.setItem(row, 1, QTableWidgetItem("未找到姓名"))
-                self.result_table.setItem(row, 2, QTableWidgetItem("失败"))
-            row += 1
+        self.clear_results()
+        self.progress_bar.setValue(0)
+        self.extract_btn.setEnabled(False)
+        self.cancel_btn.setEnabled(True)
 
-        # 调整列宽
-        self.result_table.resizeColumnsToContents()
+        filter_words = self.get_filter_words()
+        cache = self.extraction_caches.setdefault(filter_signature(filter_words), ExtractionCache())
+        self.cache_hits = 0
+        self.cache_misses = 0
+        worker_profiler = None
+        if self.profile_checkbox.isChecked():
+            # 报告包括最近一次扫描和这次提取；开启分析时在当前进程中提取
+            self.profiler = StageProfiler()
+            if self.scan_profiler is not None:
+                self.profiler.merge(self.scan_profiler)
+            worker_profiler = StageProfiler()
+        else:
+            self.profiler = None
+        self.extract_worker = ExtractWorker(file_names, filter_words, cache, self.disk_cache_checkbox.isChecked(),
+                                            worker_profiler)
+        self.extract_worker.progress_updated.connect(self.progress_bar.setValue)
+        self.extract_worker.results_ready.connect(self.add_extraction_results)
+        self.extract_worker.cache_stats.connect(self.update_cache_stats)
+        self.extract_worker.error_occurred.connect(self.extraction_error)
+        self.extract_worker.extraction_finished.connect(self.extraction_finished)
+        self.statusBar().showMessage('正在提取姓名...')
+        self.extract_worker.start()
+
+    def add_extraction_results(self, paths, extracted_names):
+        profiler = self.profiler
+        if profiler is not None:
+            start = profiler.clock()
+        # 添加结果到表格（表格中显示相对路径）
+        first_batch = len(self.result_model.store) == 0
+        self.result_model.append_results(paths, extracted_names)
+
+        # 第一批结果到达时调整列宽
+        if first_batch:
+            resize_columns_to_visible_rows(self.result_view)
+        if profiler is not None:
+            profiler.lap('table', start)
         
-        # 启用复制按钮
+        # 启用复制和导出按钮
         self.copy_btn.setEnabled(True)
+        self.export_btn.setEnabled(True)
+        self.statusBar().showMessage(f'正在提取姓名... 已处理 {len(self.result_model.store)} 个文件，'
+                                     f'{self.cache_stats_text()}')
+
+    def clear_results(self):
+        self.result_model.clear()
+        self.copy_btn.setEnabled(False)
+        self.export_btn.setEnabled(False)
+        self.refresh_name_groups()
+
+    def update_result_filter(self):
+        """按查找的姓名（或未找到姓名）筛选结果表格，直接查倒排索引"""
+        name = self.name_lookup_input.text().strip()
+        if name:
+            self.result_model.set_filter_name(name)
+            self.statusBar().showMessage(f'提取出“{name}”的文件: {self.result_model.rowCount()} 个')
+        elif self.unmatched_checkbox.isChecked():
+            self.result_model.set_filter_name('')
+            self.statusBar().showMessage(f'未找到姓名的文件: {self.result_model.rowCount()} 个')
+        else:
+            self.result_model.set_filter_name(None)
+
+    def refresh_name_groups(self):
+        """重新汇总每个姓名的文件数量（提取结束或文件夹变化后调用）"""
+        store = self.result_model.store
+        self.group_model.refresh(store, self.group_combo.currentData())
+        duplicated = len(store.name_counts(2)) if self.group_combo.currentData() != 2 else self.group_model.rowCount()
+        self.group_summary_label.setText(f'共 {store.distinct_name_count()} 个不同姓名，'
+                                         f'{duplicated} 个姓名出现在多个文件中，'
+                                         f'{store.count_of("")} 个文件未找到姓名')
+
+    def show_group_files(self, index):
+        """点击汇总中的姓名时，在结果表格中只显示该姓名的文件"""
+        self.name_lookup_input.setText(self.group_model.name_at(index.row()))
+
+    def update_cache_stats(self, hits, misses):
+        self.cache_hits = hits
+        self.cache_misses = misses
+
+    def cache_stats_text(self):
+        return f'缓存命中 {self.cache_hits} 个，未命中 {self.cache_misses} 个'
+
+    def cancel_extraction(self):
+        if self.extract_worker is not None:
+            self.extract_worker.cancel()
+            self.cancel_btn.setEnabled(False)
+
+    def extraction_error(self, message):
+        QMessageBox.critical(self, "错误", f"提取姓名时出错: {message}")
+
+    def extraction_finished(self, cancelled):
+        if self.extract_worker is not None:
+            # 结束信号发出后线程随即退出，等待它结束再释放
+            self.extract_worker.wait()
+            if self.profiler is not None and self.extract_worker.profiler is not None:
+                self.profiler.merge(self.extract_worker.profiler)
+                self.show_profile(self.profiler)
+            self.extract_worker = None
+        self.extract_btn.setEnabled(True)
+        self.cancel_btn.setEnabled(False)
+        processed = len(self.result_model.store)
+        self.refresh_name_groups()
+        if cancelled:
+            self.statusBar().showMessage(f'已取消，已从 {processed} 个文件名中提取姓名（{self.cache_stats_text()}）')
+        else:
+            self.statusBar().showMessage(f'已完成从 {processed} 个文件名中提取姓名（{self.cache_stats_text()}）')
+
+    def clear_disk_cache(self):
+        """删除提取结果的磁盘缓存文件"""
+        if self.extract_worker is not None or self.folder_watcher is not None:
+            QMessageBox.warning(self, "警告", "请等待提取结束或停止监视后再清空缓存")
+            return
+        path = ExtractionStore.default_path()
+        try:
+            if os.path.exists(path):
+                os.remove(path)
+        except OSError as e:
+            QMessageBox.critical(self, "错误", f"清空缓存时出错: {str(e)}")
+            return
+        self.statusBar().showMessage('已清空提取结果缓存')
+
+    def stop_extraction(self):
+        """取消并等待正在运行的提取线程"""
+        if self.extract_worker is not None:
+            for signal in (self.extract_worker.progress_updated, self.extract_worker.results_ready,
+                           self.extract_worker.cache_stats, self.extract_worker.error_occurred,
+                           self.extract_worker.extraction_finished):
+                signal.disconnect()
+            self.extract_worker.cancel()
+            self.extract_worker.wait()
+            self.extract_worker = None
+            self.extract_btn.setEnabled(True)
+            self.cancel_btn.setEnabled(False)
 
     def copy_all_names(self):
         """
         一键复制所有提取出的姓名
         """
-        names = []
-        for row in range(self.result_table.rowCount()):
-            name_item = self.result_table.item(row, 1)
-            status_item = self.result_table.item(row, 2)
-            
-            # 只复制成功提取的姓名
-            if name_item and status_item and status_item.text() == "成功":
-                names.append(name_item.text())
+        # 只复制成功提取的姓名（直接从结果存储中读取）
+        names = self.result_model.store.found_names()
         
         if names:
             # 将姓名列表合并为一列（每行一个姓名）
@@ -267,16 +840,157 @@ class FileNameNameExtractorApp(QMainWindow):
         else:
             self.statusBar().showMessage('没有可复制的姓名')
 
+    def export_results(self):
+        """
+        把全部结果导出为 CSV 或 JSON Lines 文件
+        """
+        store = self.result_model.store
+        if not len(store):
+            self.statusBar().showMessage('没有可导出的结果')
+            return
+        path, _ = QFileDialog.getSaveFileName(self, "导出结果", "提取结果.csv",
+                                              "CSV 文件 (*.csv);;JSON Lines 文件 (*.jsonl)")
+        if not path:
+            return
+        try:
+            store.export(path)
+        except OSError as e:
+            QMessageBox.critical(self, "错误", f"导出结果时出错: {str(e)}")
+            return
+        self.statusBar().showMessage(f'已导出 {len(store)} 条结果到 {path}')
+
+    def show_profile(self, profiler):
+        """在窗口底部显示性能分析摘要"""
+        self.profiler = profiler
+        self.profile_label.setText("性能分析:\n" + "\n".join(profiler.summary_lines()))
+        self.profile_label.setVisible(True)
+        self.export_profile_btn.setEnabled(True)
+
+    def export_profile(self):
+        """把性能分析报告导出为 JSON 文件"""
+        if not self.profiler:
+            self.statusBar().showMessage('没有性能分析记录')
+            return
+        path, _ = QFileDialog.getSaveFileName(self, "导出性能分析", "性能分析.json", "JSON 文件 (*.json)")
+        if not path:
+            return
+        try:
+            self.profiler.export(path)
+        except OSError as e:
+            QMessageBox.critical(self, "错误", f"导出性能分析时出错: {str(e)}")
+            return
+        self.statusBar().showMessage(f'已导出性能分析到 {path}')
+
+    def set_watch_mode(self, enabled):
+        """
+        开启或关闭监视文件夹
+        开启时完整读取一次文件夹，之后只把新增、删除和重命名的文件应用到结果表格上
+        """
+        if enabled:
+            folder_path = self.folder_path_label.text()
+            if not os.path.isdir(folder_path) or folder_path == "未选择文件夹":
+                QMessageBox.warning(self, "警告", "请先选择有效的文件夹！")
+                self.watch_checkbox.setChecked(False)
+                return
+            self.start_watch(folder_path)
+        else:
+            self.stop_watch()
+            self.extract_btn.setEnabled(bool(self.file_paths))
+            self.statusBar().showMessage('已停止监视文件夹')
+
+    def start_watch(self, folder_path):
+        self.stop_scanner()
+        self.stop_extraction()
+        self.stop_watch()
+        self.clear_results()
+        # 监视时文件列表与结果表格的行一一对应，直接共用结果存储中的路径列表
+        self.set_file_paths(self.result_model.store.paths)
+        self.progress_bar.setValue(0)
+        self.extract_btn.setEnabled(False)
+
+        filter_words = self.get_filter_words()
+        cache = self.extraction_caches.setdefault(filter_signature(filter_words), ExtractionCache())
+        self.folder_watcher = FolderWatcher(folder_path,
+                                            parse_glob_patterns(self.include_input.text()),
+                                            parse_glob_patterns(self.exclude_input.text()),
+                                            self.recursive_checkbox.isChecked(),
+                                            self.watch_interval_spinbox.value(),
+                                            filter_words, cache, self.disk_cache_checkbox.isChecked())
+        self.folder_watcher.changes_ready.connect(self.apply_folder_changes)
+        self.folder_watcher.error_occurred.connect(self.watch_error)
+        # 根文件夹有变化时立即检查；子文件夹数量可能很多（受系统监视数量限制），只靠定时检查
+        self.fs_watcher = QFileSystemWatcher([folder_path])
+        self.fs_watcher.directoryChanged.connect(self.folder_watcher.trigger)
+        self.statusBar().showMessage(f'正在监视文件夹: {folder_path}')
+        self.folder_watcher.start()
+
+    def stop_watch(self):
+        """停止监视文件夹并等待线程结束"""
+        if self.fs_watcher is not None:
+            self.fs_watcher.directoryChanged.disconnect()
+            self.fs_watcher = None
+        if self.folder_watcher is not None:
+            for signal in (self.folder_watcher.changes_ready, self.folder_watcher.error_occurred):
+                signal.disconnect()
+            self.folder_watcher.cancel()
+            self.folder_watcher.wait()
+            self.folder_watcher = None
+
+    def apply_folder_changes(self, removed, renamed, added):
+        """把文件夹的变化按行应用到结果表格，不重新提取其他文件"""
+        model = self.result_model
+        for path in removed:
+            model.remove(path)
+
+        for old_path, new_path, extracted_name in renamed:
+            model.rename(old_path, new_path, extracted_name)
+
+        if added:
+            first_batch = len(model.store) == 0
+            model.append_results([path for path, _ in added], [name for _, name in added])
+            if first_batch:
+                resize_columns_to_visible_rows(self.result_view)
+
+        # 文件列表与结果共用路径列表，只需通知视图
+        self.file_list_model.sync(changed=bool(removed or renamed))
+        self.refresh_name_groups()
+
+        self.copy_btn.setEnabled(bool(self.file_paths))
+        self.export_btn.setEnabled(bool(self.file_paths))
+        self.statusBar().showMessage(f'正在监视文件夹: 共 {len(self.file_paths)} 个文件，'
+                                     f'新增 {len(added)} 个，删除 {len(removed)} 个，重命名 {len(renamed)} 个')
+
+    def watch_error(self, message):
+        self.watch_checkbox.setChecked(False)
+        QMessageBox.critical(self, "错误", f"监视文件夹时出错: {message}")
+
     def clear_all(self):
+        self.watch_checkbox.setChecked(False)
+        self.stop_scanner()
+        self.stop_extraction()
+        self.set_file_paths([])
         self.folder_path_label.setText("未选择文件夹")
         self.filter_words_input.clear()
-        self.file_list_text.clear()
-        self.result_table.setRowCount(0)
+        self.clear_results()
+        self.scan_profiler = None
+        self.profiler = None
+        self.profile_label.clear()
+        self.profile_label.setVisible(False)
+        self.export_profile_btn.setEnabled(False)
         self.extract_btn.setEnabled(False)
+        self.progress_bar.setValue(0)
         self.statusBar().showMessage('已清空')
 
+    def closeEvent(self, event):
+        self.stop_watch()
+        self.stop_scanner()
+        self.stop_extraction()
+        super().closeEvent(event)
+
 
 def main():
+    # 打包为 exe 后，进程池的子进程需要在这里接管，而不是重新启动整个程序
+    multiprocessing.freeze_support()
     app = QApplication(sys.argv)
     window = FileNameNameExtractorApp()
     window.show()
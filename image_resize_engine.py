@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+图片批量调整引擎（不依赖Qt）
+每张图片的解码、缩放和编码是独立的纯计算，受 GIL 限制多线程无法加速，
+所以按文件分给进程池并行处理，按完成的先后逐个产出结果，单个文件出错不影响其他文件；
+快速解码模式下大图在解码时就缩小到略大于目标尺寸，不再按原始分辨率完整解码；
+增量处理时在输出目录中保存清单（源文件的大小、修改时间、内容哈希和处理参数 -> 输出文件），
+再次处理同一批图片时跳过没有变化的文件
+"""
+
+import os
+import json
+import math
+import hashlib
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+from PIL import Image
+
+
+# 默认的处理进程数
+DEFAULT_WORKERS = os.cpu_count() or 1
+JPEG_FORMATS = ('jpg', 'jpeg')
+# Image.reduce 能正确合并像素的模式（调色板、1位和16位灰度等模式不支持或合并索引值没有意义，不缩小）
+REDUCE_MODES = ('L', 'LA', 'RGB', 'RGBA', 'RGBX', 'CMYK', 'YCbCr', 'I', 'F')
+
+# 增量处理清单的文件名（保存在输出目录中）和格式版本，处理逻辑变化导致输出不同时递增版本使旧清单失效
+MANIFEST_NAME = '.image_resizer_manifest.json'
+MANIFEST_VERSION = 1
+# 每记录这么多个文件保存一次清单，处理中途退出时已完成的文件下次不必重做
+MANIFEST_SAVE_INTERVAL = 200
+# 计算内容哈希时每次读取的字节数
+HASH_BLOCK_SIZE = 1 << 20
+
+
+def output_path_for(image_path, output_dir, format_ext):
+    """输出文件路径：输出目录下同名（换成输出格式扩展名）的文件"""
+    return Path(output_dir) / f"{Path(image_path).stem}.{format_ext}"
+
+
+def fitted_size(size, width, height):
+    """保持纵横比缩小到不超过 width x height 时的尺寸（向上取整），不需要缩小时返回原尺寸"""
+    ratio = min(width / size[0], height / size[1])
+    if ratio >= 1:
+        return size
+    return max(1, math.ceil(size[0] * ratio)), max(1, math.ceil(size[1] * ratio))
+
+
+def decode_scaled(img, size):
+    """
+    按不小于 size 的最小 2 的幂次缩小图片：JPEG 在解码时按 1/2、1/4、1/8 缩小（DCT 域缩放，draft），
+    其他格式（或超过 1/8 的部分）解码后用 reduce 按整数倍合并像素，之后的高质量缩放只需处理很少的像素。
+    draft 只在图片加载前有效，必须在 convert 等会加载图片的操作之前调用；
+    不在 REDUCE_MODES 中的模式只做 draft（对非 JPEG 不起作用），留给最后的缩放处理
+    """
+    img.draft(None, size)
+    if img.mode not in REDUCE_MODES:
+        return img
+    factor = min(img.width // size[0], img.height // size[1])
+    power = 1
+    while power * 2 <= factor:
+        power *= 2
+    if power > 1:
+        img = img.reduce(power)
+    return img
+
+
+def process_image(image_path, output_dir, width, height, quality, format_ext, force_stretch, fast_decode=False):
+    """
+    调整一张图片并保存到输出目录，返回输出文件路径；出错时抛出异常
+    先写入临时文件再替换，多个输入文件同名时不会同时写同一个输出文件。
+    fast_decode 为 True 时先用 decode_scaled 缩小到略大于目标尺寸，再做最后的高质量缩放；
+    快速解码失败时按普通方式重新处理，不把这个文件当作出错
+    """
+    if fast_decode:
+        try:
+            return _process_image(image_path, output_dir, width, height, quality, format_ext, force_stretch, True)
+        except Exception:
+            pass
+    return _process_image(image_path, output_dir, width, height, quality, format_ext, force_stretch, False)
+
+
+def _process_image(image_path, output_dir, width, height, quality, format_ext, force_stretch, fast_decode):
+    fmt = format_ext.lower()
+    with Image.open(image_path) as img:
+        if fast_decode:
+            img = decode_scaled(img, (width, height) if force_stretch else fitted_size(img.size, width, height))
+
+        # 转换为RGB模式（某些格式如PNG有透明通道）
+        if fmt in JPEG_FORMATS:
+            img = img.convert('RGB')
+
+        # 调整图片大小
+        if force_stretch:
+            # 强制拉伸到指定尺寸
+            resized_img = img.resize((width, height), Image.LANCZOS)
+        else:
+            # 保持纵横比并填充到指定尺寸
+            img.thumbnail((width, height), Image.LANCZOS)
+            resized_img = Image.new('RGB', (width, height), (255, 255, 255))
+            x = (width - img.width) // 2
+            y = (height - img.height) // 2
+            resized_img.paste(img, (x, y))
+
+    output_path = output_path_for(image_path, output_dir, format_ext)
+    temp_path = output_path.with_name(f"{output_path.name}.{os.getpid()}.tmp")
+    try:
+        # 保存图片（临时文件的扩展名无法推断格式，所以明确指定）
+        if fmt in JPEG_FORMATS:
+            resized_img.save(str(temp_path), 'JPEG', quality=quality)
+        elif fmt == 'png':
+            resized_img.save(str(temp_path), 'PNG', compress_level=int((100 - quality) / 10))
+        else:
+            resized_img.save(str(temp_path), Image.registered_extensions().get('.' + fmt))
+        os.replace(str(temp_path), str(output_path))
+    except BaseException:
+        if temp_path.exists():
+            temp_path.unlink()
+        raise
+    return str(output_path)
+
+
+def resize_params(width, height, quality, format_ext, force_stretch, fast_decode=False):
+    """处理参数（写入清单，参数不同的输出不能复用）"""
+    return {
+        'width': width,
+        'height': height,
+        'quality': quality,
+        'format': format_ext.lower(),
+        'stretch': bool(force_stretch),
+        'fast_decode': bool(fast_decode),
+    }
+
+
+def file_digest(path):
+    """文件内容的 SHA-256"""
+    sha = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b''):
+            sha.update(block)
+    return sha.hexdigest()
+
+
+def source_info(path):
+    """源文件的大小、修改时间和内容哈希（先取修改时间，处理期间文件被改动时下次会重新处理）"""
+    stat = os.stat(path)
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha256': file_digest(path)}
+
+
+class ResizeManifest:
+    """
+    增量处理清单：源文件（绝对路径） -> 大小、修改时间、内容哈希、处理参数和输出文件名
+    大小和修改时间都没变时直接跳过，不读取文件；只有修改时间变了（如复制或触碰过）时比较内容哈希
+    """
+
+    def __init__(self, output_dir):
+        self.output_dir = output_dir
+        self.path = os.path.join(output_dir, MANIFEST_NAME)
+        self.entries = {}
+        self._unsaved = 0
+
+    @classmethod
+    def load(cls, output_dir):
+        """读取输出目录中的清单，没有清单、清单损坏或版本不同时从空清单开始"""
+        manifest = cls(output_dir)
+        try:
+            with open(manifest.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return manifest
+        if isinstance(data, dict) and data.get('version') == MANIFEST_VERSION:
+            manifest.entries = data.get('files', {})
+        return manifest
+
+    @staticmethod
+    def key(image_path):
+        return os.path.normcase(os.path.abspath(image_path))
+
+    def is_current(self, image_path, params):
+        """上次用相同参数处理过、源文件没有变化且输出文件还在时返回 True"""
+        entry = self.entries.get(self.key(image_path))
+        if entry is None or entry['params'] != params:
+            return False
+        if not os.path.exists(os.path.join(self.output_dir, entry['output'])):
+            return False
+        try:
+            stat = os.stat(image_path)
+            if stat.st_size != entry['size']:
+                return False
+            if stat.st_mtime_ns == entry['mtime_ns']:
+                return True
+            # 修改时间变了但大小相同，内容也相同时同样跳过，并记下新的修改时间
+            if file_digest(image_path) != entry['sha256']:
+                return False
+        except OSError:
+            # 读取不了的文件交给处理过程报告错误
+            return False
+        entry['mtime_ns'] = stat.st_mtime_ns
+        self._changed()
+        return True
+
+    def plan(self, image_files, params):
+        """把文件分为 (需要处理的, 可以跳过的) 两个列表"""
+        pending = []
+        skipped = []
+        for image_path in image_files:
+            (skipped if self.is_current(image_path, params) else pending).append(image_path)
+        return pending, skipped
+
+    def record(self, image_path, source, params, output_path):
+        """记录一个处理成功的文件（source 为 source_info 的结果）"""
+        entry = dict(source)
+        entry['params'] = params
+        entry['output'] = os.path.basename(output_path)
+        self.entries[self.key(image_path)] = entry
+        self._changed()
+
+    def _changed(self):
+        self._unsaved += 1
+        if self._unsaved >= MANIFEST_SAVE_INTERVAL:
+            self.save()
+
+    def save(self):
+        """先写临时文件再替换，写到一半中断时不会留下损坏的清单"""
+        temp_path = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump({'version': MANIFEST_VERSION, 'files': self.entries}, f, ensure_ascii=False)
+            os.replace(temp_path, self.path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        self._unsaved = 0
+
+
+def _process_task(image_path, options, with_source=False):
+    """
+    进程池任务：返回 (图片路径, 输出路径, 错误信息, 源文件信息)，异常在子进程中转为文字（有的异常无法跨进程传递）
+    with_source 为 True 时同时计算源文件的 source_info（增量处理时写入清单），否则源文件信息为 None
+    """
+    try:
+        source = source_info(image_path) if with_source else None
+        return image_path, process_image(image_path, *options), None, source
+    except Exception as e:
+        return image_path, None, str(e), None
+
+
+def process_images(image_files, output_dir, width, height, quality, format_ext, force_stretch,
+                   workers=None, should_cancel=None, fast_decode=False, manifest=None):
+    """
+    批量调整图片，按完成的先后逐个产出 (图片路径, 输出路径, 错误信息)，成功时错误信息为 None
+
+    workers 为进程数（默认CPU核数），为1或只有一个文件时在当前进程中处理；
+    同时在途的任务数限制为进程数的两倍，image_files 可以是很长的列表而不会一次全部提交。
+    should_cancel 返回 True 时停止提交新任务并放弃未开始的任务；fast_decode 见 process_image。
+    manifest 为 ResizeManifest 时把处理成功的文件记入清单（哈希在子进程中计算），
+    跳过未变化的文件需要调用方先用 manifest.plan 筛选，保存清单也由调用方负责
+    """
+    for image_path, output_path, error, source in _process_all(
+            image_files, (output_dir, width, height, quality, format_ext, force_stretch, fast_decode),
+            workers, should_cancel, manifest is not None):
+        if manifest is not None and error is None:
+            manifest.record(image_path, source,
+                            resize_params(width, height, quality, format_ext, force_stretch, fast_decode),
+                            output_path)
+        yield image_path, output_path, error
+
+
+def _process_all(image_files, options, workers, should_cancel, with_source):
+    """按完成的先后逐个产出 _process_task 的结果"""
+    workers = workers or DEFAULT_WORKERS
+    if workers <= 1 or len(image_files) <= 1:
+        for image_path in image_files:
+            if should_cancel is not None and should_cancel():
+                return
+            yield _process_task(image_path, options, with_source)
+        return
+
+    pool = ProcessPoolExecutor(max_workers=min(workers, len(image_files)))
+    pending = set()
+    files = iter(image_files)
+    try:
+        while True:
+            # 补足在途的任务
+            while len(pending) < workers * 2 and not (should_cancel is not None and should_cancel()):
+                image_path = next(files, None)
+                if image_path is None:
+                    break
+                pending.add(pool.submit(_process_task, image_path, options, with_source))
+            if not pending:
+                return
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+    finally:
+        for future in pending:
+            future.cancel()
+        pool.shutdown(wait=True)
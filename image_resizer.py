@@ -4,27 +4,29 @@
 """
 图片批量调整工具
 支持批量设置图片为固定大小、压缩率、格式转换和强制拉伸
+图片分给多个进程并行处理（见 image_resize_engine），增量处理时跳过上次处理后没有变化的图片
 """
 
 import sys
 import os
-from pathlib import Path
+import multiprocessing
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QWidget, QLabel, QPushButton, QFileDialog,
     QSpinBox, QComboBox, QCheckBox, QTextEdit, QVBoxLayout, QHBoxLayout,
     QGroupBox, QProgressBar, QMessageBox, QLineEdit, QGridLayout
 )
 from PyQt5.QtCore import Qt, QThread, pyqtSignal
-from PIL import Image
+from image_resize_engine import process_images, resize_params, ResizeManifest, DEFAULT_WORKERS
 
 
 class ImageProcessor(QThread):
-    """图片处理线程类"""
+    """图片处理线程类，图片分给进程池并行处理，每完成一个文件更新一次进度和日志"""
     progress_updated = pyqtSignal(int)  # 进度更新信号
     log_message = pyqtSignal(str)       # 日志消息信号
     processing_finished = pyqtSignal()  # 处理完成信号
 
-    def __init__(self, image_files, output_dir, width, height, quality, format_ext, force_stretch):
+    def __init__(self, image_files, output_dir, width, height, quality, format_ext, force_stretch,
+                 workers=DEFAULT_WORKERS, fast_decode=False, incremental=False):
         super().__init__()
         self.image_files = image_files
         self.output_dir = output_dir
@@ -33,50 +35,47 @@ class ImageProcessor(QThread):
         self.quality = quality
         self.format_ext = format_ext
         self.force_stretch = force_stretch
+        self.workers = workers
+        self.fast_decode = fast_decode
+        self.incremental = incremental
 
     def run(self):
         """执行图片处理任务"""
         total_files = len(self.image_files)
-        for i, image_path in enumerate(self.image_files):
-            try:
-                # 更新进度
-                progress = int((i / total_files) * 100)
-                self.progress_updated.emit(progress)
-                
-                # 打开图片
-                with Image.open(image_path) as img:
-                    # 转换为RGB模式（某些格式如PNG有透明通道）
-                    if self.format_ext.lower() in ['jpg', 'jpeg']:
-                        img = img.convert('RGB')
-                    
-                    # 调整图片大小
-                    if self.force_stretch:
-                        # 强制拉伸到指定尺寸
-                        resized_img = img.resize((self.width, self.height), Image.LANCZOS)
-                    else:
-                        # 保持纵横比并填充到指定尺寸
-                        img.thumbnail((self.width, self.height), Image.LANCZOS)
-                        resized_img = Image.new('RGB', (self.width, self.height), (255, 255, 255))
-                        x = (self.width - img.width) // 2
-                        y = (self.height - img.height) // 2
-                        resized_img.paste(img, (x, y))
-                    
-                    # 构造输出文件路径
-                    output_filename = f"{Path(image_path).stem}.{self.format_ext}"
-                    output_path = Path(self.output_dir) / output_filename
-                    
-                    # 保存图片
-                    if self.format_ext.lower() in ['jpg', 'jpeg']:
-                        resized_img.save(str(output_path), 'JPEG', quality=self.quality)
-                    elif self.format_ext.lower() == 'png':
-                        resized_img.save(str(output_path), 'PNG', compress_level=int((100-self.quality)/10))
-                    else:
-                        resized_img.save(str(output_path))
-                    
+        self.progress_updated.emit(0)
+        manifest = None
+        try:
+            image_files = self.image_files
+            done = 0
+            if self.incremental:
+                # 跳过上次用相同参数处理过、之后没有变化的图片
+                manifest = ResizeManifest.load(self.output_dir)
+                params = resize_params(self.width, self.height, self.quality, self.format_ext,
+                                       self.force_stretch, self.fast_decode)
+                image_files, skipped = manifest.plan(image_files, params)
+                done = len(skipped)
+                if skipped:
+                    self.log_message.emit(f"跳过 {len(skipped)} 个未变化的文件")
+                    self.progress_updated.emit(int(done * 100 / total_files))
+            results = process_images(image_files, self.output_dir, self.width, self.height, self.quality,
+                                     self.format_ext, self.force_stretch, self.workers,
+                                     fast_decode=self.fast_decode, manifest=manifest)
+            for image_path, _, error in results:
+                done += 1
+                if error is None:
                     self.log_message.emit(f"已处理: {image_path}")
-            
-            except Exception as e:
-                self.log_message.emit(f"处理 {image_path} 时出错: {str(e)}")
+                else:
+                    self.log_message.emit(f"处理 {image_path} 时出错: {error}")
+                self.progress_updated.emit(int(done * 100 / total_files))
+        except Exception as e:
+            # 进程池本身出错（如子进程异常退出）
+            self.log_message.emit(f"处理图片时出错: {str(e)}")
+        finally:
+            if manifest is not None:
+                try:
+                    manifest.save()
+                except OSError as e:
+                    self.log_message.emit(f"保存增量处理清单时出错: {str(e)}")
         
         # 完成处理
         self.progress_updated.emit(100)
@@ -168,6 +167,21 @@ class ImageResizerApp(QMainWindow):
         self.stretch_checkbox.setChecked(True)
         output_layout.addWidget(self.stretch_checkbox, 4, 0, 1, 3)
         
+        # 快速解码选项（大尺寸 JPEG 解码时直接缩小）
+        self.fast_decode_checkbox = QCheckBox("快速解码大图（JPEG 在解码时直接缩小，速度更快、内存更少，画质略有差异）")
+        output_layout.addWidget(self.fast_decode_checkbox, 6, 0, 1, 3)
+        
+        # 增量处理选项（清单保存在输出目录中）
+        self.incremental_checkbox = QCheckBox("增量处理（跳过上次用相同设置处理后没有变化的图片）")
+        output_layout.addWidget(self.incremental_checkbox, 7, 0, 1, 3)
+        
+        # 并行处理的进程数
+        self.workers_spinbox = QSpinBox()
+        self.workers_spinbox.setRange(1, max(64, DEFAULT_WORKERS))
+        self.workers_spinbox.setValue(DEFAULT_WORKERS)
+        output_layout.addWidget(QLabel("并行进程数:"), 5, 0)
+        output_layout.addWidget(self.workers_spinbox, 5, 1, 1, 2)
+        
         output_group.setLayout(output_layout)
         main_layout.addWidget(output_group)
         
@@ -240,6 +254,9 @@ class ImageResizerApp(QMainWindow):
         self.format_combo.setEnabled(False)
         self.quality_spinbox.setEnabled(False)
         self.stretch_checkbox.setEnabled(False)
+        self.workers_spinbox.setEnabled(False)
+        self.fast_decode_checkbox.setEnabled(False)
+        self.incremental_checkbox.setEnabled(False)
         
         # 创建并启动处理线程
         self.processor = ImageProcessor(
@@ -249,7 +266,10 @@ class ImageResizerApp(QMainWindow):
             self.height_spinbox.value(),
             self.quality_spinbox.value(),
             self.format_combo.currentText(),
-            self.stretch_checkbox.isChecked()
+            self.stretch_checkbox.isChecked(),
+            self.workers_spinbox.value(),
+            self.fast_decode_checkbox.isChecked(),
+            self.incremental_checkbox.isChecked()
         )
         
         # 连接信号
@@ -280,6 +300,9 @@ class ImageResizerApp(QMainWindow):
         self.format_combo.setEnabled(True)
         self.quality_spinbox.setEnabled(True)
         self.stretch_checkbox.setEnabled(True)
+        self.workers_spinbox.setEnabled(True)
+        self.fast_decode_checkbox.setEnabled(True)
+        self.incremental_checkbox.setEnabled(True)
         
         # 更新状态
         self.statusBar().showMessage("处理完成")
@@ -288,6 +311,8 @@ class ImageResizerApp(QMainWindow):
 
 def main():
     """主函数"""
+    # 打包为exe后子进程需要它才能正常启动
+    multiprocessing.freeze_support()
     app = QApplication(sys.argv)
     window = ImageResizerApp()
     window.show()
@@ -1,13 +1,388 @@
+import os
 import sys
+import time
+import sqlite3
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
-                             QLabel, QTextEdit, QPushButton, QTableWidget, QTableWidgetItem, 
-                             QSplitter, QGroupBox, QMessageBox)
-from PyQt5.QtCore import Qt
+                             QLabel, QTextEdit, QPushButton, QTableView, QHeaderView,
+                             QSplitter, QGroupBox, QMessageBox, QLineEdit, QProgressBar,
+                             QCheckBox, QDoubleSpinBox, QComboBox, QFileDialog, QInputDialog)
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex, QVariant, QThread, QTimer, pyqtSignal
+from qt_table_utils import resize_columns_to_visible_rows
+from name_compare_engine import (StreamingComparator, IncrementalComparator, ResultStore,
+                                 ComparisonCancelled, NameNormalizer, KeyCache, KeyStore,
+                                 NameFileSource, ReferenceIndex, iter_names_from_text, iter_names_from_lines,
+                                 fuzzy_compare, available_normalize_steps, column_bit, column_label,
+                                 mask_label, popcount, counts_mask, counts_differ, openpyxl, DEFAULT_FUZZY_THRESHOLD, NORMALIZE_STEPS,
+                                 CSV_EXTENSIONS, XLSX_EXTENSIONS, EXPENSIVE_NORMALIZE_STEPS)
+
+
+class CompareWorker(QThread):
+    """
+    姓名比较线程类
+    在后台执行比较，按批次把结果发回界面，并支持中途取消
+
+    精确比较时一个姓名是否显示取决于它在所有列中的出现情况，后面的列随时可能出现同一个姓名，
+    所以读完所有输入之前没有可以确定的结果，不发送中间结果（读取阶段只更新进度，占总进度的90%）；
+    读完之后在内存中汇总的结果、或溢写到桶文件时逐桶合并的结果，按批次边产出边发送。
+    模糊比较在读完两列后逐个查询第一列的姓名，查询期间按批次发送。
+    需要边输入边看到结果时使用实时比较（IncrementalComparator），只重新计算改动的姓名
+    """
+    progress_updated = pyqtSignal(int)                    # 进度更新信号
+    results_ready = pyqtSignal(list, list, list, list, list)  # 一批结果信号（姓名, 成员位掩码, 近似姓名, 相似度, 按行展开的各列次数）
+    comparison_finished = pyqtSignal(bool)                # 比较结束信号（是否被取消）
+    error_occurred = pyqtSignal(str)                      # 出错信号
+
+    # 每批最多发送的姓名数量，以及两批之间的最长间隔（秒）
+    CHUNK_SIZE = 5000
+    CHUNK_INTERVAL = 0.1
+    # 读取输入时每隔多少行更新一次进度
+    PROGRESS_INTERVAL = 8192
+    
+    # 结果筛选方式
+    MODE_EXACTLY_ONE = 'exactly_one'  # 只出现在一列中
+    MODE_NOT_IN_ALL = 'not_in_all'    # 至少缺席一列
+    MODE_COUNTS = 'counts'            # 保留重复，各列出现次数不同或列内有重复
+
+    def __init__(self, inputs, mode=MODE_EXACTLY_ONE, fuzzy_threshold=None, normalize_steps=(),
+                 key_cache=None, reference_columns=(), use_key_store=False):
+        super().__init__()
+        self.inputs = inputs  # 每列为一段文本或一个 NameFileSource（直接从文件读取）
+        self.mode = mode
+        self.fuzzy_threshold = fuzzy_threshold  # 为 None 时只做精确比较（模糊匹配只支持两列）
+        self.normalize_steps = list(normalize_steps)
+        self.key_cache = key_cache
+        # 是否把代价较高的规范化结果（繁简、拼音）缓存到磁盘
+        self.use_key_store = use_key_store and any(step in EXPENSIVE_NORMALIZE_STEPS for step in self.normalize_steps)
+        # 固定为参考名单的列：只在成员位掩码比较中通过磁盘索引查询，不再整列读取
+        if fuzzy_threshold is None and mode != self.MODE_COUNTS:
+            self.reference_columns = [column for column in reference_columns
+                                      if isinstance(inputs[column], NameFileSource)]
+        else:
+            self.reference_columns = []
+        self._cancelled = False
+        self._lines_read = 0
+        self._total_lines = max(sum(source.estimate_count() if isinstance(source, NameFileSource)
+                                    else source.count('\n') + 1
+                                    for column, source in enumerate(inputs)
+                                    if column not in self.reference_columns), 1)
+
+    @classmethod
+    def keep_predicate(cls, mode, column_count):
+        """
+        返回按筛选方式判断成员位掩码是否应显示的函数
+        """
+        if mode == cls.MODE_EXACTLY_ONE:
+            return lambda mask: popcount(mask) == 1
+        full_mask = (1 << column_count) - 1
+        return lambda mask: mask != full_mask
+
+    def cancel(self):
+        """请求取消比较"""
+        self._cancelled = True
+
+    def is_cancelled(self):
+        return self._cancelled
+
+    def run(self):
+        """执行比较任务"""
+        # SQLite 连接只能在创建它的线程中使用，所以磁盘缓存在工作线程中打开
+        normalizer = None
+        key_store = None
+        if self.normalize_steps:
+            if self.use_key_store:
+                try:
+                    key_store = KeyStore()
+                except (OSError, sqlite3.Error):
+                    key_store = None
+            normalizer = NameNormalizer(self.normalize_steps, self.key_cache, key_store)
+        
+        sources = [self._counted(iter(source) if isinstance(source, NameFileSource) else iter_names_from_text(source))
+                   for source in self.inputs]
+        references = {}
+        try:
+            for column in self.reference_columns:
+                references[column] = ReferenceIndex.open(self.inputs[column], normalizer,
+                                                         should_cancel=self.is_cancelled)
+                sources[column] = None
+        except ComparisonCancelled:
+            self._close_all(references, key_store)
+            self.comparison_finished.emit(True)
+            return
+        except Exception as e:
+            self._close_all(references, key_store)
+            self.error_occurred.emit(f"建立参考名单索引失败: {str(e)}")
+            self.comparison_finished.emit(False)
+            return
+        
+        if self.fuzzy_threshold is None and self.mode == self.MODE_COUNTS:
+            # 所有列只读一遍，每个姓名得到各列的出现次数
+            comparator = StreamingComparator(should_cancel=self.is_cancelled, normalizer=normalizer)
+            results = ((name, counts_mask(counts), '', 0.0, counts)
+                       for name, counts in comparator.multiset(sources) if counts_differ(counts))
+        elif self.fuzzy_threshold is None:
+            # 所有列只读一遍，每个姓名得到一个成员位掩码
+            comparator = StreamingComparator(should_cancel=self.is_cancelled, normalizer=normalizer)
+            keep = self.keep_predicate(self.mode, len(self.inputs))
+            if references:
+                memberships = comparator.probe_membership(sources, references)
+            else:
+                memberships = comparator.membership(sources)
+            results = ((name, mask, '', 0.0, ()) for name, mask in memberships if keep(mask))
+        else:
+            results = ((name, column_bit(column), match, score, ()) for name, column, match, score in
+                       fuzzy_compare(sources[0], sources[1], self.fuzzy_threshold,
+                                     should_cancel=self.is_cancelled, normalizer=normalizer))
+        
+        pending = ([], [], [], [], [])
+        last_emit = time.monotonic()
+        try:
+            for name, mask, match, score, counts in results:
+                names, masks, matches, scores, flat_counts = pending
+                names.append(name)
+                masks.append(mask)
+                matches.append(match)
+                scores.append(score)
+                flat_counts.extend(counts)
+                now = time.monotonic()
+                if len(names) >= self.CHUNK_SIZE or now - last_emit >= self.CHUNK_INTERVAL:
+                    if self._cancelled:
+                        raise ComparisonCancelled()
+                    self.results_ready.emit(*pending)
+                    pending = ([], [], [], [], [])
+                    last_emit = now
+            if pending[0]:
+                self.results_ready.emit(*pending)
+        except ComparisonCancelled:
+            self.comparison_finished.emit(True)
+            return
+        except Exception as e:
+            self.error_occurred.emit(str(e))
+        finally:
+            results.close()
+            self._close_all(references, key_store)
+        
+        self.progress_updated.emit(100)
+        self.comparison_finished.emit(False)
+
+    @staticmethod
+    def _close_all(references, key_store):
+        for reference in references.values():
+            reference.close()
+        if key_store is not None:
+            key_store.close()
+
+    def _counted(self, names):
+        """
+        包装输入迭代器以统计读取进度（读取阶段占总进度的90%）
+        """
+        for name in names:
+            self._lines_read += 1
+            if self._lines_read % self.PROGRESS_INTERVAL == 0:
+                self.progress_updated.emit(min(90, self._lines_read * 90 // self._total_lines))
+            yield name
+
+
+class LiveLoadWorker(QThread):
+    """
+    实时比较的文件读取线程
+    开启实时比较时在后台把导入的文件读入计数表，读取期间界面不访问该计数表
+    """
+    progress_updated = pyqtSignal(int)    # 进度更新信号
+    load_finished = pyqtSignal(bool)      # 读取结束信号（是否被取消或出错）
+    error_occurred = pyqtSignal(str)      # 出错信号
+
+    # 读取时每隔多少个姓名检查一次取消并更新进度
+    PROGRESS_INTERVAL = 8192
+
+    def __init__(self, comparator, files):
+        super().__init__()
+        self.comparator = comparator  # IncrementalComparator
+        self.files = files            # [(列号, NameFileSource)]
+        self._cancelled = False
+        self._names_read = 0
+        self._total_names = max(sum(source.estimate_count() for _, source in files), 1)
+
+    def cancel(self):
+        self._cancelled = True
+
+    def run(self):
+        try:
+            for column, source in self.files:
+                self.comparator.load(column, self._checked(source))
+        except ComparisonCancelled:
+            self.load_finished.emit(True)
+            return
+        except Exception as e:
+            self.error_occurred.emit(str(e))
+            self.load_finished.emit(True)
+            return
+        self.progress_updated.emit(100)
+        self.load_finished.emit(False)
+
+    def _checked(self, names):
+        for name in names:
+            self._names_read += 1
+            if self._names_read % self.PROGRESS_INTERVAL == 0:
+                if self._cancelled:
+                    raise ComparisonCancelled()
+                self.progress_updated.emit(min(99, self._names_read * 100 // self._total_names))
+            yield name
+
+
+class NameResultModel(QAbstractTableModel):
+    """
+    比较结果的表格模型
+    数据保存在 ResultStore 的列式数组中，只有视图实际绘制的行才会生成单元格文本
+    """
+    HEADERS = ["姓名", "来源列", "状态", "近似姓名", "相似度", "出现次数"]
+    SORT_KEYS = [ResultStore.SORT_BY_NAME, ResultStore.SORT_BY_SOURCE, ResultStore.SORT_BY_STATUS,
+                 ResultStore.SORT_BY_MATCH, ResultStore.SORT_BY_SCORE, ResultStore.SORT_BY_COUNT]
+    STATUS_LABELS = {
+        ResultStore.STATUS_UNIQUE: "唯一",
+        ResultStore.STATUS_MISSING: "部分缺失",
+        ResultStore.STATUS_COUNTS_DIFFER: "次数不同",
+        ResultStore.STATUS_DUPLICATED: "列内重复",
+        ResultStore.STATUS_FUZZY: "近似",
+    }
+    # 一批变化超过这么多行时，整体重新排序比逐行二分插入更快
+    INCREMENTAL_LIMIT = 2000
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.store = ResultStore()
+        self._mask_labels = {}  # 成员位掩码 -> 来源列文本，不同的掩码只格式化一次
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.store)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or role != Qt.DisplayRole:
+            return QVariant()
+        row, column = index.row(), index.column()
+        if column == 0:
+            return self.store.name_at(row)
+        if column == 1:
+            mask = self.store.mask_at(row)
+            label = self._mask_labels.get(mask)
+            if label is None:
+                label = self._mask_labels[mask] = mask_label(mask)
+            return label
+        if column == 5:
+            counts = self.store.counts_at(row)
+            return '/'.join(map(str, counts)) if counts else ""
+        if column == 2:
+            return self.STATUS_LABELS[self.store.status_at(row)]
+        match = self.store.match_at(row)
+        if column == 3:
+            return match
+        return f"{self.store.score_at(row):.2f}" if match else ""
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return QVariant()
+        if orientation == Qt.Horizontal:
+            return self.HEADERS[section]
+        return section + 1
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        sort_key = self.SORT_KEYS[column]
+        self.layoutAboutToBeChanged.emit()
+        self.store.sort(sort_key, order == Qt.DescendingOrder)
+        self.layoutChanged.emit()
+
+    def append_results(self, names, masks, matches=None, scores=None, counts=None):
+        """
+        追加一批结果到末尾（暂不排序）
+        """
+        count = self.store.count_visible(names)
+        first = len(self.store)
+        if count:
+            self.beginInsertRows(QModelIndex(), first, first + count - 1)
+        self.store.append_unsorted(names, masks, matches, scores, counts)
+        if count:
+            self.endInsertRows()
+
+    def finish_results(self):
+        """
+        所有结果到齐后按当前排序方式整理
+        """
+        self.layoutAboutToBeChanged.emit()
+        self.store.refresh()
+        self.layoutChanged.emit()
+
+    def apply_changes(self, removed, updated):
+        """
+        实时比较时应用一批增量变化
+        removed 为要删除的姓名，updated 为要新增或更新的 (姓名, 成员位掩码, 各列次数或 None)
+
+        变化不多时逐行移出视图、更新后二分插入到当前排序中的位置，只通知受影响的行；
+        变化很多或视图尚未排序时整体重新排序
+        """
+        store = self.store
+        if not store.view_sorted or len(removed) + len(updated) > self.INCREMENTAL_LIMIT:
+            self.beginResetModel()
+            for name in removed:
+                store.remove(name)
+            for name, mask, counts in updated:
+                store.upsert(name, mask, counts=counts)
+            store.refresh()
+            self.endResetModel()
+            return
+        for name in removed:
+            self._take_row(name)
+            store.remove(name)
+        for name, mask, counts in updated:
+            self._take_row(name)
+            store.upsert(name, mask, counts=counts)
+            row = store.insert_position(name)
+            if row is not None:
+                self.beginInsertRows(QModelIndex(), row, row)
+                store.insert_row(row, name)
+                self.endInsertRows()
+
+    def _take_row(self, name):
+        row = self.store.find_row(name)
+        if row is not None:
+            self.beginRemoveRows(QModelIndex(), row, row)
+            self.store.take_row(row)
+            self.endRemoveRows()
+
+    def set_filter(self, text):
+        self.beginResetModel()
+        self.store.set_filter(text)
+        self.endResetModel()
+
+    def clear(self):
+        self.beginResetModel()
+        self.store.clear()
+        self.endResetModel()
 
 
 class NameComparatorApp(QMainWindow):
+    # 最多支持的输入列数
+    MAX_COLUMNS = 20
+    # 从文件导入时文本框中最多预览的姓名数量
+    PREVIEW_LINES = 200
+    # 实时比较时合并多次编辑后再刷新结果表格的间隔（毫秒）
+    LIVE_REFRESH_INTERVAL = 150
+    
     def __init__(self):
         super().__init__()
+        self.worker = None
+        self.key_caches = {}  # 规范化规则签名 -> 内存中的规范化键缓存，多次比较之间复用
+        # 实时比较状态：每列的姓名计数表、每列当前的行快照、结果中显示的 比较键 -> 姓名
+        self.live_comparator = None
+        self.live_loader = None  # 正在后台读取导入文件的 LiveLoadWorker
+        self.live_lines = []
+        self.live_shown = {}
+        self.live_pending = set()
+        self.live_timer = QTimer(self)
+        self.live_timer.setSingleShot(True)
+        self.live_timer.setInterval(self.LIVE_REFRESH_INTERVAL)
+        self.live_timer.timeout.connect(self.flush_live_changes)
         self.initUI()
     
     def initUI(self):
@@ -27,105 +402,519 @@ class NameComparatorApp(QMainWindow):
         
         # 左侧输入区域
         input_group = QGroupBox("输入姓名列表")
-        input_layout = QHBoxLayout(input_group)
-        
-        # 第一列输入
-        col1_layout = QVBoxLayout()
-        col1_layout.addWidget(QLabel("第一列姓名:"))
-        self.col1_text = QTextEdit()
-        self.col1_text.setPlaceholderText("每行输入一个姓名...")
-        col1_layout.addWidget(self.col1_text)
-        input_layout.addLayout(col1_layout)
-        
-        # 第二列输入
-        col2_layout = QVBoxLayout()
-        col2_layout.addWidget(QLabel("第二列姓名:"))
-        self.col2_text = QTextEdit()
-        self.col2_text.setPlaceholderText("每行输入一个姓名...")
-        col2_layout.addWidget(self.col2_text)
-        input_layout.addLayout(col2_layout)
+        input_group_layout = QVBoxLayout(input_group)
+        self.input_layout = QHBoxLayout()
+        input_group_layout.addLayout(self.input_layout)
+        
+        # 添加/删除列按钮
+        column_button_layout = QHBoxLayout()
+        self.add_column_btn = QPushButton("添加列")
+        self.add_column_btn.clicked.connect(self.add_column)
+        self.remove_column_btn = QPushButton("删除最后一列")
+        self.remove_column_btn.clicked.connect(self.remove_column)
+        column_button_layout.addWidget(self.add_column_btn)
+        column_button_layout.addWidget(self.remove_column_btn)
+        column_button_layout.addStretch()
+        input_group_layout.addLayout(column_button_layout)
+        
+        # 默认两列输入
+        self.col_texts = []
+        self.column_widgets = []
+        self.column_labels = []
+        self.column_release_btns = []
+        self.column_pin_btns = []
+        self.column_sources = []  # 每列导入的文件（NameFileSource），未导入时为 None
+        self.add_column()
+        self.add_column()
+        self.col1_text, self.col2_text = self.col_texts
         
         # 右侧结果区域
         result_group = QGroupBox("比较结果")
         result_layout = QVBoxLayout(result_group)
         
-        # 结果表格
-        self.result_table = QTableWidget()
-        self.result_table.setColumnCount(3)
-        self.result_table.setHorizontalHeaderLabels(["唯一姓名", "来源列", "状态"])
-        result_layout.addWidget(self.result_table)
+        # 结果筛选
+        self.filter_input = QLineEdit()
+        self.filter_input.setPlaceholderText("筛选姓名...")
+        self.filter_input.textChanged.connect(self.filter_results)
+        result_layout.addWidget(self.filter_input)
+        
+        # 结果表格（只为可见行生成单元格）
+        self.result_model = NameResultModel(self)
+        self.result_view = QTableView()
+        self.result_view.setModel(self.result_model)
+        self.result_view.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.result_view.horizontalHeader().setSortIndicator(1, Qt.AscendingOrder)
+        self.result_view.setSortingEnabled(True)
+        result_layout.addWidget(self.result_view)
         
         # 添加到分隔器
         splitter.addWidget(input_group)
         splitter.addWidget(result_group)
         
+        # 规范化选项
+        normalize_layout = QHBoxLayout()
+        normalize_layout.addWidget(QLabel("比较时忽略:"))
+        self.normalize_checkboxes = {}
+        available_steps = available_normalize_steps()
+        for step, (_, label) in NORMALIZE_STEPS.items():
+            checkbox = QCheckBox(label)
+            checkbox.setChecked(step in ('width', 'space', 'case'))
+            if step not in available_steps:
+                checkbox.setEnabled(False)
+                checkbox.setToolTip("需要先安装 pypinyin")
+            checkbox.toggled.connect(self.restart_live_compare)
+            self.normalize_checkboxes[step] = checkbox
+            normalize_layout.addWidget(checkbox)
+        normalize_layout.addStretch()
+        self.key_store_checkbox = QCheckBox("把繁简、拼音规范化结果缓存到磁盘")
+        self.key_store_checkbox.setToolTip("反复与同一份大名单比较时可以跳过拼音等转换，缓存过大时自动清理")
+        normalize_layout.addWidget(self.key_store_checkbox)
+        self.clear_key_store_btn = QPushButton("清空缓存")
+        self.clear_key_store_btn.clicked.connect(self.clear_key_store)
+        normalize_layout.addWidget(self.clear_key_store_btn)
+        main_layout.addLayout(normalize_layout)
+        
+        # 结果筛选方式
+        mode_layout = QHBoxLayout()
+        mode_layout.addWidget(QLabel("显示:"))
+        self.mode_combo = QComboBox()
+        self.mode_combo.addItem("只出现在一列中的姓名", CompareWorker.MODE_EXACTLY_ONE)
+        self.mode_combo.addItem("未出现在所有列中的姓名", CompareWorker.MODE_NOT_IN_ALL)
+        self.mode_combo.addItem("出现次数不同或有重复的姓名", CompareWorker.MODE_COUNTS)
+        self.mode_combo.currentIndexChanged.connect(self.restart_live_compare)
+        mode_layout.addWidget(self.mode_combo)
+        self.live_checkbox = QCheckBox("实时比较（编辑时只处理改动的行）")
+        self.live_checkbox.toggled.connect(self.set_live_mode)
+        mode_layout.addWidget(self.live_checkbox)
+        mode_layout.addStretch()
+        main_layout.addLayout(mode_layout)
+        
+        # 模糊匹配选项
+        fuzzy_layout = QHBoxLayout()
+        self.fuzzy_checkbox = QCheckBox("模糊匹配（容忍错别字、空格和姓名顺序差异）")
+        self.fuzzy_threshold_spinbox = QDoubleSpinBox()
+        self.fuzzy_threshold_spinbox.setRange(0.3, 1.0)
+        self.fuzzy_threshold_spinbox.setSingleStep(0.05)
+        self.fuzzy_threshold_spinbox.setValue(DEFAULT_FUZZY_THRESHOLD)
+        fuzzy_layout.addWidget(self.fuzzy_checkbox)
+        fuzzy_layout.addWidget(QLabel("相似度阈值:"))
+        fuzzy_layout.addWidget(self.fuzzy_threshold_spinbox)
+        fuzzy_layout.addStretch()
+        main_layout.addLayout(fuzzy_layout)
+        
         # 按钮区域
         button_layout = QHBoxLayout()
         self.compare_btn = QPushButton("比较姓名")
         self.compare_btn.clicked.connect(self.compare_names)
+        self.cancel_btn = QPushButton("取消")
+        self.cancel_btn.clicked.connect(self.cancel_compare)
+        self.cancel_btn.setEnabled(False)
         self.clear_btn = QPushButton("清空")
         self.clear_btn.clicked.connect(self.clear_all)
         button_layout.addWidget(self.compare_btn)
+        button_layout.addWidget(self.cancel_btn)
         button_layout.addWidget(self.clear_btn)
         main_layout.addLayout(button_layout)
         
+        # 进度条
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setValue(0)
+        main_layout.addWidget(self.progress_bar)
+        
         # 状态栏
         self.statusBar().showMessage('就绪')
     
+    def add_column(self):
+        """添加一列姓名输入"""
+        index = len(self.col_texts)
+        if index >= self.MAX_COLUMNS:
+            return
+        container = QWidget()
+        layout = QVBoxLayout(container)
+        layout.setContentsMargins(0, 0, 0, 0)
+        label = QLabel(f"{column_label(index)}姓名:")
+        layout.addWidget(label)
+        text_edit = QTextEdit()
+        text_edit.setPlaceholderText("每行输入一个姓名...")
+        text_edit.document().contentsChange.connect(
+            lambda position, removed, added, column=index: self.on_contents_change(column, position, added))
+        layout.addWidget(text_edit)
+        file_layout = QHBoxLayout()
+        import_btn = QPushButton("从文件导入")
+        import_btn.clicked.connect(lambda checked=False, column=index: self.import_column_file(column))
+        release_btn = QPushButton("移除文件")
+        release_btn.setEnabled(False)
+        release_btn.clicked.connect(lambda checked=False, column=index: self.release_column_file(column))
+        pin_btn = QPushButton("固定为参考名单")
+        pin_btn.setCheckable(True)
+        pin_btn.setEnabled(False)
+        pin_btn.setToolTip("为导入的文件建立磁盘索引，之后的比较只查询索引而不再整列读取；\n"
+                           "只出现在参考名单中的姓名不会显示")
+        pin_btn.toggled.connect(lambda checked, column=index: self.pin_column(column, checked))
+        file_layout.addWidget(import_btn)
+        file_layout.addWidget(release_btn)
+        file_layout.addWidget(pin_btn)
+        layout.addLayout(file_layout)
+        self.input_layout.addWidget(container)
+        self.column_widgets.append(container)
+        self.column_labels.append(label)
+        self.column_release_btns.append(release_btn)
+        self.column_pin_btns.append(pin_btn)
+        self.column_sources.append(None)
+        self.col_texts.append(text_edit)
+        self.update_column_buttons()
+        self.restart_live_compare()
+    
+    def remove_column(self):
+        """删除最后一列（至少保留两列）"""
+        if len(self.col_texts) <= 2:
+            return
+        container = self.column_widgets.pop()
+        self.col_texts.pop()
+        self.column_labels.pop()
+        self.column_release_btns.pop()
+        self.column_pin_btns.pop()
+        self.column_sources.pop()
+        self.input_layout.removeWidget(container)
+        container.deleteLater()
+        self.update_column_buttons()
+        self.restart_live_compare()
+    
+    def update_column_buttons(self):
+        self.add_column_btn.setEnabled(len(self.col_texts) < self.MAX_COLUMNS)
+        self.remove_column_btn.setEnabled(len(self.col_texts) > 2)
+    
+    def import_column_file(self, column):
+        """
+        从文件导入一列姓名：比较时直接从文件流式读取，文本框中只显示开头部分作为预览
+        """
+        file_path, _ = QFileDialog.getOpenFileName(
+            self, "选择姓名文件", "",
+            "姓名文件 (*.txt *.csv *.tsv *.xlsx *.xlsm);;所有文件 (*)")
+        if not file_path:
+            return
+        extension = os.path.splitext(file_path)[1].lower()
+        if extension in XLSX_EXTENSIONS and openpyxl is None:
+            QMessageBox.warning(self, "警告", "读取 xlsx 文件需要先安装 openpyxl")
+            return
+        table_column = 0
+        if extension in CSV_EXTENSIONS + XLSX_EXTENSIONS:
+            value, ok = QInputDialog.getInt(self, "选择列", "姓名所在的列（从1开始）:", 1, 1, 1000)
+            if not ok:
+                return
+            table_column = value - 1
+        try:
+            source = NameFileSource(file_path, column=table_column)
+            preview = source.preview(self.PREVIEW_LINES)
+        except Exception as e:
+            QMessageBox.critical(self, "错误", f"读取文件时出错: {str(e)}")
+            return
+        
+        self.column_sources[column] = source
+        text_edit = self.col_texts[column]
+        text_edit.setPlainText('\n'.join(preview))
+        text_edit.setReadOnly(True)
+        self.column_labels[column].setText(f"{column_label(column)}姓名（文件: {source.display_name}）:")
+        self.column_release_btns[column].setEnabled(True)
+        self.column_pin_btns[column].setEnabled(True)
+        if len(preview) >= self.PREVIEW_LINES:
+            self.statusBar().showMessage(f'已导入 {source.display_name}，文本框中只显示前 {self.PREVIEW_LINES} 个姓名')
+        else:
+            self.statusBar().showMessage(f'已导入 {source.display_name}')
+        self.restart_live_compare()
+    
+    def release_column_file(self, column):
+        """移除导入的文件，恢复为手动输入"""
+        if self.column_sources[column] is None:
+            return
+        self.column_sources[column] = None
+        pin_btn = self.column_pin_btns[column]
+        pin_btn.setChecked(False)
+        pin_btn.setEnabled(False)
+        text_edit = self.col_texts[column]
+        text_edit.setReadOnly(False)
+        text_edit.clear()
+        self.column_labels[column].setText(f"{column_label(column)}姓名:")
+        self.column_release_btns[column].setEnabled(False)
+        self.restart_live_compare()
+    
+    def pin_column(self, column, pinned):
+        """把导入的文件固定为参考名单（索引在比较线程中按需建立，源文件变化后自动重建）"""
+        source = self.column_sources[column]
+        if source is None:
+            return
+        if pinned:
+            self.statusBar().showMessage(f'已将 {source.display_name} 固定为参考名单，下次比较时建立索引')
+        else:
+            self.statusBar().showMessage(f'已取消固定 {source.display_name}')
+    
+    def selected_normalize_steps(self):
+        return [step for step, checkbox in self.normalize_checkboxes.items()
+                if checkbox.isChecked() and checkbox.isEnabled()]
+    
+    def key_cache_for(self, steps):
+        """同一组规范化规则在多次比较之间共用一个内存缓存"""
+        if not steps:
+            return None
+        signature = NameNormalizer(steps).signature
+        return self.key_caches.setdefault(signature, KeyCache())
+    
+    def clear_key_store(self):
+        """删除规范化键的磁盘缓存文件"""
+        if self.worker is not None:
+            QMessageBox.warning(self, "警告", "请等待比较结束后再清空缓存")
+            return
+        path = KeyStore.default_path()
+        try:
+            if os.path.exists(path):
+                os.remove(path)
+        except OSError as e:
+            QMessageBox.critical(self, "错误", f"清空缓存时出错: {str(e)}")
+            return
+        self.statusBar().showMessage('已清空规范化缓存')
+    
     def compare_names(self):
-        # 获取两个文本框的内容并分割成列表
-        col1_text = self.col1_text.toPlainText().strip()
-        col2_text = self.col2_text.toPlainText().strip()
+        # 获取所有列的内容（导入了文件的列直接从文件读取）
+        inputs = [source if source is not None else text_edit.toPlainText().strip()
+                  for text_edit, source in zip(self.col_texts, self.column_sources)]
         
         # 处理空输入情况
-        if not col1_text and not col2_text:
+        if not any(inputs):
             QMessageBox.warning(self, "警告", "请至少在一列中输入姓名！")
             return
         
-        # 将文本分割为姓名列表
-        names1 = set(filter(None, [name.strip() for name in col1_text.split('\n')])) if col1_text else set()
-        names2 = set(filter(None, [name.strip() for name in col2_text.split('\n')])) if col2_text else set()
+        fuzzy_threshold = self.fuzzy_threshold_spinbox.value() if self.fuzzy_checkbox.isChecked() else None
+        if fuzzy_threshold is not None and len(inputs) != 2:
+            QMessageBox.warning(self, "警告", "模糊匹配只支持两列姓名！")
+            return
+        
+        reference_columns = [column for column, button in enumerate(self.column_pin_btns)
+                             if button.isChecked() and self.column_sources[column] is not None]
+        if reference_columns and len(reference_columns) == len(inputs):
+            QMessageBox.warning(self, "警告", "至少需要一列不是参考名单！")
+            return
         
-        # 找出不重复的姓名（只在其中一个列表中出现）
-        unique_names1 = names1 - names2  # 只在第一列出现
-        unique_names2 = names2 - names1  # 只在第二列出现
+        # 清空上一次的结果
+        self.result_model.clear()
+        self.progress_bar.setValue(0)
+        self.compare_btn.setEnabled(False)
+        self.cancel_btn.setEnabled(True)
+        
+        # 创建并启动比较线程，结果按批次显示
+        steps = self.selected_normalize_steps()
+        key_cache = self.key_cache_for(steps)
+        self.worker = CompareWorker(inputs, self.mode_combo.currentData(), fuzzy_threshold, steps, key_cache,
+                                    reference_columns, self.key_store_checkbox.isChecked())
+        self.worker.progress_updated.connect(self.progress_bar.setValue)
+        self.worker.results_ready.connect(self.add_results)
+        self.worker.error_occurred.connect(self.compare_error)
+        self.worker.comparison_finished.connect(self.compare_finished)
+        self.statusBar().showMessage('正在读取各列，读完后开始显示结果...')
+        self.worker.start()
+    
+    def add_results(self, names, masks, matches, scores, counts):
+        first_batch = self.result_model.rowCount() == 0
+        self.result_model.append_results(names, masks, matches, scores, counts)
+        self.statusBar().showMessage(f'正在比较... 已找到 {len(self.result_model.store.names)} 个姓名')
+        if first_batch:
+            resize_columns_to_visible_rows(self.result_view)
+    
+    def cancel_compare(self):
+        if self.worker is not None:
+            self.worker.cancel()
+            self.cancel_btn.setEnabled(False)
+    
+    def compare_error(self, message):
+        QMessageBox.critical(self, "错误", f"比较姓名时出错: {message}")
+    
+    def compare_finished(self, cancelled):
+        self.compare_btn.setEnabled(not self.live_checkbox.isChecked())
+        self.cancel_btn.setEnabled(False)
+        if self.worker is not None:
+            # 结束信号发出后线程随即退出，等待它结束再释放
+            self.worker.wait()
+            self.worker = None
         
-        # 显示结果
-        self.display_results(unique_names1, unique_names2)
+        # 结果到齐后在模型内排序
+        self.result_model.finish_results()
+        resize_columns_to_visible_rows(self.result_view)
         
         # 更新状态栏
-        total_unique = len(unique_names1) + len(unique_names2)
-        self.statusBar().showMessage(f'找到 {total_unique} 个不重复的姓名')
-    
-    def display_results(self, unique_names1, unique_names2):
-        # 清空表格
-        self.result_table.setRowCount(0)
-        
-        # 添加结果到表格
-        row = 0
-        # 添加只在第一列出现的姓名
-        for name in sorted(unique_names1):
-            self.result_table.insertRow(row)
-            self.result_table.setItem(row, 0, QTableWidgetItem(name))
-            self.result_table.setItem(row, 1, QTableWidgetItem("第一列"))
-            self.result_table.setItem(row, 2, QTableWidgetItem("唯一"))
-            row += 1
-        
-        # 添加只在第二列出现的姓名
-        for name in sorted(unique_names2):
-            self.result_table.insertRow(row)
-            self.result_table.setItem(row, 0, QTableWidgetItem(name))
-            self.result_table.setItem(row, 1, QTableWidgetItem("第二列"))
-            self.result_table.setItem(row, 2, QTableWidgetItem("唯一"))
-            row += 1
-        
-        # 调整列宽
-        self.result_table.resizeColumnsToContents()
+        total_unique = len(self.result_model.store.names)
+        if cancelled:
+            self.statusBar().showMessage(f'已取消，已找到 {total_unique} 个姓名')
+        elif len(self.col_texts) == 2:
+            self.statusBar().showMessage(f'找到 {total_unique} 个不重复的姓名')
+        else:
+            self.statusBar().showMessage(f'在 {len(self.col_texts)} 列中找到 {total_unique} 个符合条件的姓名')
+    
+    def set_live_mode(self, enabled):
+        """
+        开启或关闭实时比较
+        开启时完整读取一次所有列，之后每次编辑只把插入和删除的行应用到计数表上
+        """
+        self.compare_btn.setEnabled(not enabled)
+        self.fuzzy_checkbox.setEnabled(not enabled)
+        if enabled:
+            self.start_live_compare()
+        else:
+            self.stop_live_loader()
+            self.live_timer.stop()
+            self.live_comparator = None
+            self.live_lines = []
+            self.live_shown = {}
+            self.live_pending = set()
+            self.statusBar().showMessage('已关闭实时比较')
+    
+    def restart_live_compare(self):
+        """列数、筛选方式或规范化规则改变后重新建立实时比较的状态"""
+        if self.live_comparator is not None or self.live_loader is not None:
+            self.start_live_compare()
+    
+    def start_live_compare(self):
+        """
+        重新建立实时比较的状态：导入的文件在后台线程中读取，读完后再读取文本框中的各列
+        读取期间 live_comparator 为 None，文本框的编辑不需要记录
+        """
+        self.stop_worker()
+        self.stop_live_loader()
+        self.live_timer.stop()
+        steps = self.selected_normalize_steps()
+        normalizer = NameNormalizer(steps, self.key_cache_for(steps)) if steps else None
+        counting = self.mode_combo.currentData() == CompareWorker.MODE_COUNTS
+        comparator = IncrementalComparator(len(self.col_texts), normalizer, track_counts=counting)
+        self.live_comparator = None
+        self.live_lines = []
+        self.live_shown = {}
+        self.live_pending = set()
+        self.result_model.clear()
+        self.progress_bar.setValue(0)
+        
+        # 导入的文件不会被编辑，只需完整读取一次
+        files = [(column, source) for column, source in enumerate(self.column_sources) if source is not None]
+        if not files:
+            self.finish_live_load(comparator)
+            return
+        self.live_loader = LiveLoadWorker(comparator, files)
+        self.live_loader.progress_updated.connect(self.progress_bar.setValue)
+        self.live_loader.error_occurred.connect(self.compare_error)
+        self.live_loader.load_finished.connect(self.live_load_finished)
+        self.statusBar().showMessage('实时比较: 正在读取导入的文件...')
+        self.live_loader.start()
+    
+    def live_load_finished(self, failed):
+        loader = self.live_loader
+        loader.wait()
+        self.live_loader = None
+        if failed:
+            self.statusBar().showMessage('实时比较: 读取导入的文件失败')
+            return
+        self.finish_live_load(loader.comparator)
+    
+    def finish_live_load(self, comparator):
+        """导入的文件读取完成后，读取文本框中的各列并显示结果"""
+        self.live_lines = []
+        for column, text_edit in enumerate(self.col_texts):
+            if self.column_sources[column] is not None:
+                self.live_lines.append([])
+                continue
+            lines = text_edit.toPlainText().split('\n')
+            self.live_lines.append(lines)
+            comparator.load(column, iter_names_from_lines(lines))
+        self.live_comparator = comparator
+        self.live_pending = set(comparator.masks)
+        self.flush_live_changes()
+        resize_columns_to_visible_rows(self.result_view)
+    
+    def stop_live_loader(self):
+        """取消并等待正在读取导入文件的线程"""
+        if self.live_loader is not None:
+            for signal in (self.live_loader.progress_updated, self.live_loader.error_occurred,
+                           self.live_loader.load_finished):
+                signal.disconnect()
+            self.live_loader.cancel()
+            self.live_loader.wait()
+            self.live_loader = None
+    
+    def on_contents_change(self, column, position, added):
+        """
+        文本框内容改变时，根据改动范围找出被替换的行，只把这些行的差异应用到计数表上
+        """
+        if (self.live_comparator is None or column >= len(self.live_lines)
+                or self.column_sources[column] is not None):
+            return
+        document = self.col_texts[column].document()
+        lines = self.live_lines[column]
+        first = max(document.findBlock(position).blockNumber(), 0)
+        end = min(position + added, document.characterCount() - 1)
+        last = max(document.findBlock(end).blockNumber(), first)
+        # 改动范围之外的行数不变，由此推出快照中被替换的行数
+        replaced = len(lines) - document.blockCount() + (last - first + 1)
+        new_lines = [document.findBlockByNumber(number).text() for number in range(first, last + 1)]
+        old_lines = lines[first:first + replaced]
+        lines[first:first + replaced] = new_lines
+        changed = self.live_comparator.apply_edit(column, iter_names_from_lines(old_lines),
+                                                  iter_names_from_lines(new_lines))
+        if changed:
+            self.live_pending.update(changed)
+            self.live_timer.start()
+    
+    def flush_live_changes(self):
+        """把累积的变化一次性应用到结果表格"""
+        comparator = self.live_comparator
+        if comparator is None:
+            return
+        mode = self.mode_combo.currentData()
+        counting = mode == CompareWorker.MODE_COUNTS
+        keep = None if counting else CompareWorker.keep_predicate(mode, len(self.col_texts))
+        removed = []
+        updated = []
+        for key in self.live_pending:
+            shown = self.live_shown.pop(key, None)
+            mask = comparator.mask(key)
+            counts = comparator.counts_of(key) if counting else None
+            visible = bool(mask) and (counts_differ(counts) if counting else keep(mask))
+            name = comparator.name(key) if visible else None
+            if shown is not None and shown != name:
+                removed.append(shown)
+            if visible:
+                updated.append((name, mask, counts))
+                self.live_shown[key] = name
+        self.live_pending = set()
+        if removed or updated:
+            self.result_model.apply_changes(removed, updated)
+        self.statusBar().showMessage(f'实时比较: 找到 {len(self.result_model.store.names)} 个符合条件的姓名')
+    
+    def filter_results(self, text):
+        self.result_model.set_filter(text)
+        resize_columns_to_visible_rows(self.result_view)
+    
+    def stop_worker(self):
+        """取消并等待正在运行的比较线程"""
+        if self.worker is not None:
+            # 先断开信号，已在事件队列中的旧结果不会再填回刚清空的表格
+            for signal in (self.worker.progress_updated, self.worker.results_ready,
+                           self.worker.error_occurred, self.worker.comparison_finished):
+                signal.disconnect()
+            self.worker.cancel()
+            self.worker.wait()
+            self.worker = None
+            self.compare_btn.setEnabled(not self.live_checkbox.isChecked())
+            self.cancel_btn.setEnabled(False)
+    
+    def closeEvent(self, event):
+        self.stop_worker()
+        self.stop_live_loader()
+        super().closeEvent(event)
     
     def clear_all(self):
-        self.col1_text.clear()
-        self.col2_text.clear()
-        self.result_table.setRowCount(0)
+        self.stop_worker()
+        for column, text_edit in enumerate(self.col_texts):
+            self.release_column_file(column)
+            text_edit.clear()
+        self.filter_input.clear()
+        self.result_model.clear()
+        self.progress_bar.setValue(0)
         self.statusBar().showMessage('已清空')
 
 
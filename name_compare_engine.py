@@ -0,0 +1,1863 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+姓名比较引擎（不依赖Qt）
+以流的方式读取任意多份姓名列表，为每个姓名计算成员位掩码（或各列出现次数），
+不同姓名过多时按哈希分桶溢写到磁盘再逐桶合并，内存占用只与单个桶的大小有关，
+可用于千万行级别的多份名单核对
+"""
+
+import io
+import os
+import re
+import csv
+import sys
+import mmap
+import codecs
+import struct
+import bisect
+import shutil
+import argparse
+import tempfile
+import hashlib
+import unicodedata
+from array import array
+from collections import OrderedDict
+
+from sqlite_store import SignatureStore
+
+# 可选依赖：繁简转换和汉字转拼音
+try:
+    import opencc
+except ImportError:
+    opencc = None
+
+try:
+    from pypinyin import lazy_pinyin
+except ImportError:
+    lazy_pinyin = None
+
+# 可选依赖：读取 xlsx 文件和猜测文件编码
+try:
+    import openpyxl
+except ImportError:
+    openpyxl = None
+
+try:
+    import charset_normalizer
+except ImportError:
+    charset_normalizer = None
+
+try:
+    import chardet
+except ImportError:
+    chardet = None
+
+
+# 第一列、第二列在结果中的编号
+COLUMN_FIRST = 0
+COLUMN_SECOND = 1
+
+# 默认内存中最多保留的姓名数量，超过后改为分桶溢写
+DEFAULT_MEMORY_LIMIT = 1000000
+# 默认分桶数量
+DEFAULT_BUCKET_COUNT = 64
+# 单个桶仍然过大时最多再分几层
+MAX_PARTITION_DEPTH = 4
+# 每读取多少个姓名检查一次是否被取消
+CANCEL_CHECK_INTERVAL = 4096
+
+# 模糊匹配的默认相似度阈值和最大编辑距离
+DEFAULT_FUZZY_THRESHOLD = 0.6
+DEFAULT_FUZZY_MAX_DISTANCE = 2
+
+CJK_PATTERN = re.compile(r'[\u4e00-\u9fff]')
+# 汉字之间的空白（如“张 三”）
+CJK_SPACE_PATTERN = re.compile(r'(?<=[\u4e00-\u9fff])\s+(?=[\u4e00-\u9fff])')
+
+# 猜测文件编码时读取的字节数
+ENCODING_SAMPLE_SIZE = 65536
+# 常见的字节顺序标记及对应编码（UTF-32 必须排在 UTF-16 之前）
+ENCODING_BOMS = ((codecs.BOM_UTF8, 'utf-8-sig'),
+                 (codecs.BOM_UTF32_LE, 'utf-32'),
+                 (codecs.BOM_UTF32_BE, 'utf-32'),
+                 (codecs.BOM_UTF16_LE, 'utf-16'),
+                 (codecs.BOM_UTF16_BE, 'utf-16'))
+# 按表格方式读取的文件扩展名
+CSV_EXTENSIONS = ('.csv', '.tsv')
+XLSX_EXTENSIONS = ('.xlsx', '.xlsm')
+
+# 桶文件中比较键与原始姓名之间的分隔符
+BUCKET_SEPARATOR = '\x1f'
+# 桶文件每条记录占一行，字段中的反斜杠、换行和分隔符需要转义（表格单元格中可能有换行）
+BUCKET_ESCAPES = {'\\': '\\\\', '\n': '\\n', '\r': '\\r', BUCKET_SEPARATOR: '\\s'}
+BUCKET_UNESCAPES = {escaped: char for char, escaped in BUCKET_ESCAPES.items()}
+BUCKET_SPECIAL_PATTERN = re.compile('[\\\\\n\r\x1f]')
+BUCKET_ESCAPED_PATTERN = re.compile(r'\\[\\nrs]')
+
+# 缓存目录（规范化键缓存等）
+CACHE_DIR = os.path.join(os.path.expanduser('~'), '.name_comparator')
+# 参考名单索引文件的目录、格式标识和版本号
+REFERENCE_DIR = os.path.join(CACHE_DIR, 'reference')
+REFERENCE_MAGIC = b'NCREFIDX'
+REFERENCE_VERSION = 2
+# 文件头：标识, 版本号, 签名长度, 姓名数量, 源文件大小, 源文件修改时间(ns), 姓名数据长度
+REFERENCE_HEADER = struct.Struct('=8sIIQQqQ')
+# 建立索引时按哈希值最高几位分桶，各桶排序后顺序拼接即为整体有序
+REFERENCE_BUCKET_BITS = 6
+# 规范化规则的版本号，规则变化后旧的缓存自动失效
+NORMALIZER_VERSION = 1
+# 内存中最多缓存的规范化键数量
+DEFAULT_KEY_CACHE_SIZE = 200000
+# 磁盘缓存中最多保存的规范化键数量，超过后先删除其他规则的键，仍然超过时清空
+DEFAULT_KEY_STORE_LIMIT = 2000000
+# 代价较高、值得写入磁盘缓存的规范化步骤（全半角、空格、大小写重新计算比查询 SQLite 更快）
+EXPENSIVE_NORMALIZE_STEPS = ('script', 'pinyin')
+
+# 未安装 opencc 时使用的常见姓名用字繁简对照表
+_TRADITIONAL = ("張陳劉楊黃趙吳孫馬鄭謝韓馮鄧蕭葉蘇呂盧鍾譚陸範賈韋鄒閆龍賀顧龔萬錢嚴湯區鄺聶關歐陽羅許蔣"
+                "鄔魯饒溫華莊費賴閻樂齊鮑龐練單喬偉國軍紅麗豔傑濤慶東輝剛嬌靜勝寶鳳蘭雲鵬飛興義書誠愛廣"
+                "強傳寧賢維緒紀純綺鳴軒嶽峯麥曉瑩穎師員聖應達濱運銘鐵鋒錦鍵鎮長開閣雙鷹韻順頌顏")
+_SIMPLIFIED = ("张陈刘杨黄赵吴孙马郑谢韩冯邓萧叶苏吕卢钟谭陆范贾韦邹闫龙贺顾龚万钱严汤区邝聂关欧阳罗许蒋"
+               "邬鲁饶温华庄费赖阎乐齐鲍庞练单乔伟国军红丽艳杰涛庆东辉刚娇静胜宝凤兰云鹏飞兴义书诚爱广"
+               "强传宁贤维绪纪纯绮鸣轩岳峰麦晓莹颖师员圣应达滨运铭铁锋锦键镇长开阁双鹰韵顺颂颜")
+TRADITIONAL_TO_SIMPLIFIED = str.maketrans(_TRADITIONAL, _SIMPLIFIED)
+
+
+class ComparisonCancelled(Exception):
+    """比较被用户取消"""
+
+
+def iter_names_from_text(text):
+    """
+    从一段文本中逐行取出姓名（去除首尾空白，跳过空行）
+    逐行迭代，不会一次性生成整个行列表
+    """
+    for line in io.StringIO(text, newline='\n'):
+        name = line.strip()
+        if name:
+            yield name
+
+
+def iter_names_from_lines(lines):
+    """
+    从已拆分好的行中取出姓名（去除首尾空白，跳过空行）
+    """
+    for line in lines:
+        name = line.strip()
+        if name:
+            yield name
+
+
+def detect_encoding(file_path):
+    """
+    猜测文本文件的编码：先看字节顺序标记，再尝试 UTF-8，
+    然后交给 charset_normalizer/chardet（如已安装），最后按 GB18030 处理
+    """
+    with open(file_path, 'rb') as f:
+        sample = f.read(ENCODING_SAMPLE_SIZE)
+    for bom, encoding in ENCODING_BOMS:
+        if sample.startswith(bom):
+            return encoding
+    try:
+        # 样本末尾可能截断在多字节字符中间，用增量解码器忽略最后不完整的字符
+        codecs.getincrementaldecoder('utf-8')().decode(sample, final=False)
+        return 'utf-8'
+    except UnicodeDecodeError:
+        pass
+    if charset_normalizer is not None:
+        best = charset_normalizer.from_bytes(sample).best()
+        if best is not None:
+            return best.encoding
+    elif chardet is not None:
+        guess = chardet.detect(sample)
+        if guess.get('encoding') and guess.get('confidence', 0) >= 0.5:
+            return guess['encoding']
+    return 'gb18030'
+
+
+def iter_names_from_file(file_path, encoding=None):
+    """
+    从文本文件中逐行流式读取姓名，不会把整个文件读入内存
+    encoding 为 None 时自动猜测编码
+    """
+    if encoding is None:
+        encoding = detect_encoding(file_path)
+    with open(file_path, 'r', encoding=encoding, errors='replace') as f:
+        for line in f:
+            name = line.strip()
+            if name:
+                yield name
+
+
+def iter_names_from_csv(file_path, encoding=None, column=0):
+    """
+    从 CSV/TSV 文件的第 column 列流式读取姓名
+    """
+    if encoding is None:
+        encoding = detect_encoding(file_path)
+    delimiter = '\t' if file_path.lower().endswith('.tsv') else ','
+    with open(file_path, 'r', encoding=encoding, errors='replace', newline='') as f:
+        for row in csv.reader(f, delimiter=delimiter):
+            if column < len(row):
+                name = row[column].strip()
+                if name:
+                    yield name
+
+
+def iter_names_from_xlsx(file_path, column=0, sheet=None):
+    """
+    以只读模式逐行读取 xlsx 第一个（或指定）工作表第 column 列的姓名，不会加载整个工作簿
+    """
+    if openpyxl is None:
+        raise ValueError('读取 xlsx 文件需要先安装 openpyxl')
+    workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        worksheet = workbook[sheet] if sheet else workbook.worksheets[0]
+        for row in worksheet.iter_rows(min_col=column + 1, max_col=column + 1, values_only=True):
+            value = row[0] if row else None
+            if value is None:
+                continue
+            name = str(value).strip()
+            if name:
+                yield name
+    finally:
+        workbook.close()
+
+
+def iter_names_from_path(file_path, encoding=None, column=0):
+    """
+    按扩展名选择读取方式：xlsx 按工作表、csv/tsv 按列、其他按每行一个姓名
+    """
+    extension = os.path.splitext(file_path)[1].lower()
+    if extension in XLSX_EXTENSIONS:
+        return iter_names_from_xlsx(file_path, column)
+    if extension in CSV_EXTENSIONS:
+        return iter_names_from_csv(file_path, encoding, column)
+    return iter_names_from_file(file_path, encoding)
+
+
+class NameFileSource:
+    """
+    一份来自文件的姓名列表，每次迭代都重新从文件流式读取
+    """
+
+    def __init__(self, file_path, encoding=None, column=0):
+        self.file_path = file_path
+        self.column = column
+        extension = os.path.splitext(file_path)[1].lower()
+        if encoding is None and extension not in XLSX_EXTENSIONS:
+            encoding = detect_encoding(file_path)
+        self.encoding = encoding
+
+    @property
+    def display_name(self):
+        return os.path.basename(self.file_path)
+
+    def __iter__(self):
+        return iter_names_from_path(self.file_path, self.encoding, self.column)
+
+    def preview(self, limit):
+        """读取前 limit 个姓名用于界面预览"""
+        names = []
+        for name in self:
+            names.append(name)
+            if len(names) >= limit:
+                break
+        return names
+
+    def estimate_count(self):
+        """
+        估算姓名数量（用于显示进度），按文件开头样本的平均行长推算
+        """
+        size = os.path.getsize(self.file_path)
+        if self.encoding is None:
+            # xlsx 是压缩格式，只能粗略按每行约20字节估算
+            return max(size // 20, 1)
+        with open(self.file_path, 'rb') as f:
+            sample = f.read(ENCODING_SAMPLE_SIZE)
+        lines = sample.count(b'\n')
+        if lines == 0 or len(sample) >= size:
+            return max(lines, 1)
+        return max(size * lines // len(sample), 1)
+
+
+def stable_hash(name):
+    """
+    与进程无关的64位稳定哈希，用于分桶（Python内置hash每次启动都会变化）
+    """
+    return int.from_bytes(hashlib.blake2b(name.encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+def escape_field(text):
+    """转义桶文件记录中的一个字段，不含特殊字符时原样返回"""
+    if BUCKET_SPECIAL_PATTERN.search(text) is None:
+        return text
+    return BUCKET_SPECIAL_PATTERN.sub(lambda match: BUCKET_ESCAPES[match.group()], text)
+
+
+def unescape_field(text):
+    """escape_field 的逆操作"""
+    if '\\' not in text:
+        return text
+    return BUCKET_ESCAPED_PATTERN.sub(lambda match: BUCKET_UNESCAPES[match.group()], text)
+
+
+def normalize_width(name):
+    """全角字符转为半角（NFKC 兼容分解）"""
+    return unicodedata.normalize('NFKC', name)
+
+
+def normalize_space(name):
+    """合并连续空白，并去掉汉字之间的空白"""
+    return CJK_SPACE_PATTERN.sub('', ' '.join(name.split()))
+
+
+def normalize_case(name):
+    """忽略大小写"""
+    return name.casefold()
+
+
+_opencc_converter = None
+
+
+def normalize_script(name):
+    """繁体转简体：优先使用 opencc，未安装时使用内置的常见姓名用字对照表"""
+    global _opencc_converter
+    if opencc is not None:
+        if _opencc_converter is None:
+            _opencc_converter = opencc.OpenCC('t2s')
+        return _opencc_converter.convert(name)
+    return name.translate(TRADITIONAL_TO_SIMPLIFIED)
+
+
+def normalize_pinyin(name):
+    """汉字转为不带声调的拼音（需要安装 pypinyin）"""
+    return ' '.join(lazy_pinyin(name))
+
+
+# 规范化步骤：名称 -> (处理函数, 显示名称)，按此顺序执行
+NORMALIZE_STEPS = OrderedDict([
+    ('width', (normalize_width, '全半角')),
+    ('space', (normalize_space, '空格')),
+    ('script', (normalize_script, '繁简')),
+    ('pinyin', (normalize_pinyin, '拼音')),
+    ('case', (normalize_case, '大小写')),
+])
+
+
+def available_normalize_steps():
+    """
+    返回当前环境可用的规范化步骤名称（拼音需要安装 pypinyin）
+    """
+    return [step for step in NORMALIZE_STEPS if step != 'pinyin' or lazy_pinyin is not None]
+
+
+class KeyCache:
+    """
+    规范化键的内存 LRU 缓存
+    """
+
+    def __init__(self, capacity=DEFAULT_KEY_CACHE_SIZE):
+        self.capacity = capacity
+        self._data = OrderedDict()
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, name):
+        key = self._data.get(name)
+        if key is not None:
+            self._data.move_to_end(name)
+        return key
+
+    def put(self, name, key):
+        self._data[name] = key
+        self._data.move_to_end(name)
+        if len(self._data) > self.capacity:
+            self._data.popitem(last=False)
+
+
+class KeyStore(SignatureStore):
+    """
+    规范化键的磁盘缓存（SQLite），按规范化规则签名区分
+    重复与同一份总名单比较时，可以跳过代价较高的规范化步骤（如拼音转换）；
+    保存的键超过 max_entries 条时自动清理，也可以调用 clear() 手动清空
+    """
+
+    TABLE = 'name_keys'
+    KEY_COLUMN = 'name'
+    VALUE_COLUMN = 'key'
+
+    def __init__(self, path=None, max_entries=DEFAULT_KEY_STORE_LIMIT):
+        if path is None:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            path = self.default_path()
+        super().__init__(path, max_entries)
+
+    @staticmethod
+    def default_path():
+        return os.path.join(CACHE_DIR, 'name_keys.sqlite3')
+
+
+class NameNormalizer:
+    """
+    可组合的姓名规范化流程
+
+    steps 为 NORMALIZE_STEPS 中的步骤名称，每个姓名只计算一次比较键；
+    计算结果先查内存 LRU 缓存 cache，再查磁盘缓存 store，都未命中时才真正计算。
+    只有包含 EXPENSIVE_NORMALIZE_STEPS 中的步骤时才使用 store，其他步骤直接计算更快
+    """
+
+    # 批量处理时每批的姓名数量
+    BATCH_SIZE = 2000
+
+    def __init__(self, steps=('width', 'space', 'case'), cache=None, store=None):
+        unknown = [step for step in steps if step not in NORMALIZE_STEPS]
+        if unknown:
+            raise ValueError(f"未知的规范化步骤: {', '.join(unknown)}")
+        if 'pinyin' in steps and lazy_pinyin is None:
+            raise ValueError("拼音规范化需要先安装 pypinyin")
+        # 无论传入顺序如何，都按 NORMALIZE_STEPS 中的固定顺序执行
+        self.steps = [step for step in NORMALIZE_STEPS if step in steps]
+        self._functions = [NORMALIZE_STEPS[step][0] for step in self.steps]
+        self.signature = f"v{NORMALIZER_VERSION}:{','.join(self.steps)}"
+        self.cache = cache if cache is not None else KeyCache()
+        self.store = store if self.is_expensive else None
+
+    @property
+    def is_expensive(self):
+        """是否包含值得写入磁盘缓存的步骤"""
+        return any(step in EXPENSIVE_NORMALIZE_STEPS for step in self.steps)
+
+    def compute(self, name):
+        """
+        不经过缓存直接计算比较键
+        """
+        for function in self._functions:
+            name = function(name)
+        return name
+
+    def key(self, name):
+        key = self.cache.get(name)
+        if key is None:
+            key = self.compute(name)
+            self.cache.put(name, key)
+        return key
+
+    def iter_keyed(self, names):
+        """
+        批量计算比较键，逐个产出 (比较键, 原始姓名)
+        """
+        batch = []
+        for name in names:
+            batch.append(name)
+            if len(batch) >= self.BATCH_SIZE:
+                yield from self._key_batch(batch)
+                batch = []
+        if batch:
+            yield from self._key_batch(batch)
+
+    def _key_batch(self, names):
+        cache = self.cache
+        keys = {}
+        misses = []
+        for name in names:
+            key = cache.get(name)
+            if key is None:
+                misses.append(name)
+            else:
+                keys[name] = key
+
+        if misses:
+            missing = set(misses)
+            if self.store is not None:
+                stored = self.store.get_many(self.signature, missing)
+                keys.update(stored)
+                missing.difference_update(stored)
+            computed = {name: self.compute(name) for name in missing}
+            keys.update(computed)
+            if self.store is not None and computed:
+                self.store.put_many(self.signature, computed.items())
+            for name in misses:
+                cache.put(name, keys[name])
+
+        for name in names:
+            yield keys[name], name
+
+
+def column_bit(column):
+    """第 column 个输入在成员位掩码中对应的位"""
+    return 1 << column
+
+
+def popcount(mask):
+    """位掩码中为1的位数，即姓名出现在几个输入中"""
+    return bin(mask).count('1')
+
+
+def counts_mask(counts):
+    """由各列出现次数得到成员位掩码"""
+    mask = 0
+    for column, count in enumerate(counts):
+        if count:
+            mask |= 1 << column
+    return mask
+
+
+def counts_differ(counts):
+    """各列出现次数不完全相同，或某一列内有重复"""
+    return max(counts) > 1 or min(counts) != max(counts)
+
+
+class CountTable:
+    """
+    比较键 -> 各列出现次数
+
+    每个比较键只占一个槽位编号，所有次数连续保存在一个 array('I') 中
+    （每个键占 column_count 个格子），不为每个姓名单独创建计数对象
+    """
+
+    def __init__(self, column_count):
+        self.column_count = column_count
+        self.slots = {}
+        self.display = {}  # 只记录与比较键不同的原始写法
+        self.counts = array('I')
+        self._empty_row = array('I', [0]) * column_count
+
+    def __len__(self):
+        return len(self.slots)
+
+    def _slot(self, key, name):
+        slot = self.slots.get(key)
+        if slot is None:
+            slot = self.slots[key] = len(self.slots)
+            self.counts.extend(self._empty_row)
+            if key != name:
+                self.display[key] = name
+        return slot
+
+    def add_column(self, pairs, column, limit):
+        """
+        把 (比较键, 姓名) 逐个计入第 column 列；不同比较键的数量超过 limit 时提前停止并返回 False
+        """
+        counts = self.counts
+        slots = self.slots
+        stride = self.column_count
+        for key, name in pairs:
+            slot = slots.get(key)
+            if slot is None:
+                counts[self._slot(key, name) * stride + column] += 1
+                if len(slots) > limit:
+                    return False
+            else:
+                counts[slot * stride + column] += 1
+        return True
+
+    def add_records(self, records, limit):
+        """
+        合并桶文件中的 (次数文本, 比较键, 姓名)，次数文本为逗号分隔的各列次数
+        """
+        counts = self.counts
+        slots = self.slots
+        stride = self.column_count
+        for text, key, name in records:
+            new = key not in slots
+            base = self._slot(key, name) * stride
+            for column, count in enumerate(text.split(',')):
+                if count != '0':
+                    counts[base + column] += int(count)
+            if new and len(slots) > limit:
+                return False
+        return True
+
+    def row(self, slot):
+        stride = self.column_count
+        return tuple(self.counts[slot * stride:(slot + 1) * stride])
+
+    def items(self):
+        """产出 (显示姓名, 各列出现次数)"""
+        display = self.display
+        for key, slot in self.slots.items():
+            yield display.get(key, key), self.row(slot)
+
+    def records(self):
+        """产出可写入桶文件的 (次数文本, 比较键, 姓名)"""
+        display = self.display
+        for key, slot in self.slots.items():
+            yield ','.join(map(str, self.row(slot))), key, display.get(key, key)
+
+
+class StreamingComparator:
+    """
+    流式多路比较引擎
+
+    每个不同的姓名对应一个成员位掩码：第 i 个输入中出现过该姓名，则掩码的第 i 位为1。
+    所有输入先尝试在内存中汇总；一旦不同姓名的数量超过 memory_limit，
+    就把 (掩码, 比较键, 姓名) 按哈希写入 bucket_count 个桶文件，再逐桶合并掩码。
+    同一个姓名一定落在同一个桶里，所以逐桶合并的结果与整体合并相同。
+
+    指定 normalizer 时按规范化后的比较键合并，结果中仍显示每个键第一次出现时的原始写法。
+
+    should_cancel 为可选的无参回调，返回 True 时在读取或分桶过程中抛出 ComparisonCancelled；
+    消费者停止迭代结果时，临时桶文件同样会被清理。
+    """
+
+    def __init__(self, memory_limit=DEFAULT_MEMORY_LIMIT, bucket_count=DEFAULT_BUCKET_COUNT,
+                 temp_dir=None, should_cancel=None, normalizer=None):
+        self.memory_limit = max(1, int(memory_limit))
+        self.bucket_count = max(2, int(bucket_count))
+        self.temp_dir = temp_dir
+        self.should_cancel = should_cancel
+        self.normalizer = normalizer
+
+    def compare(self, names1, names2):
+        """
+        比较两个姓名可迭代对象，逐个产出 (姓名, 来源列)
+
+        来源列为 COLUMN_FIRST 表示只在第一列出现，COLUMN_SECOND 表示只在第二列出现
+        """
+        first = column_bit(COLUMN_FIRST)
+        second = column_bit(COLUMN_SECOND)
+        for name, mask in self.membership([names1, names2]):
+            if mask == first:
+                yield name, COLUMN_FIRST
+            elif mask == second:
+                yield name, COLUMN_SECOND
+
+    def compare_files(self, file_path1, file_path2, encoding=None):
+        """
+        比较两个姓名文件（文本、csv 或 xlsx）
+        """
+        return self.compare(iter_names_from_path(file_path1, encoding),
+                            iter_names_from_path(file_path2, encoding))
+
+    def membership(self, sources):
+        """
+        对任意多个姓名可迭代对象只读一遍，逐个产出 (姓名, 成员位掩码)
+        """
+        keyed_sources = [self._keyed(self._checked(names)) for names in sources]
+
+        # 先尝试在内存中完成汇总
+        masks = {}
+        display = {}
+        for column, pairs in enumerate(keyed_sources):
+            if not self._accumulate(self._records(pairs, column_bit(column)), masks, display,
+                                    self.memory_limit):
+                # 放不下，已汇总的部分、当前输入的剩余部分和后面的输入一起溢写
+                spill = [self._table_records(masks, display), self._records(pairs, column_bit(column))]
+                spill.extend(self._records(rest, column_bit(index))
+                             for index, rest in enumerate(keyed_sources) if index > column)
+                break
+        else:
+            yield from self._emit(masks, display)
+            return
+
+        masks = display = None
+        work_dir = tempfile.mkdtemp(prefix='name_compare_', dir=self.temp_dir)
+        try:
+            for path in self._partition(spill, work_dir, 'b', 0):
+                self._check_cancel()
+                yield from self._merge_bucket(path, work_dir, 1)
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    def multiset(self, sources):
+        """
+        保留重复姓名的多路比较：只读一遍输入，逐个产出 (姓名, 各列出现次数)
+
+        与 membership 相同，不同姓名过多时按哈希分桶溢写，桶文件中记录的是各列次数
+        """
+        column_count = len(sources)
+        keyed_sources = [self._keyed(self._checked(names)) for names in sources]
+
+        table = CountTable(column_count)
+        for column, pairs in enumerate(keyed_sources):
+            if not table.add_column(pairs, column, self.memory_limit):
+                spill = [table.records(), self._count_records(pairs, column, column_count)]
+                spill.extend(self._count_records(rest, index, column_count)
+                             for index, rest in enumerate(keyed_sources) if index > column)
+                break
+        else:
+            yield from table.items()
+            return
+
+        table = None
+        work_dir = tempfile.mkdtemp(prefix='name_compare_', dir=self.temp_dir)
+        try:
+            for path in self._partition(spill, work_dir, 'm', 0):
+                self._check_cancel()
+                yield from self._merge_count_bucket(path, work_dir, 1, column_count)
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    def probe_membership(self, sources, references):
+        """
+        带参考名单的多路比较，逐个产出 (姓名, 成员位掩码)
+
+        sources 中参考名单所在的列为 None，references 为 {列号: ReferenceIndex}；
+        只对其他列做流式合并，参考名单只做查询，所以只出现在参考名单中的姓名不会产出
+        """
+        columns = [column for column, names in enumerate(sources) if names is not None]
+        for name, mask in self.membership([sources[column] for column in columns]):
+            full_mask = 0
+            for index, column in enumerate(columns):
+                if mask >> index & 1:
+                    full_mask |= column_bit(column)
+            for column, reference in references.items():
+                if name in reference:
+                    full_mask |= column_bit(column)
+            yield name, full_mask
+
+    def _check_cancel(self):
+        if self.should_cancel is not None and self.should_cancel():
+            raise ComparisonCancelled()
+
+    def _checked(self, names):
+        """
+        包装输入迭代器，每读取 CANCEL_CHECK_INTERVAL 个姓名检查一次是否被取消
+        """
+        if self.should_cancel is None:
+            return iter(names)
+        return self._iter_checked(names)
+
+    def _iter_checked(self, names):
+        for i, name in enumerate(names):
+            if i % CANCEL_CHECK_INTERVAL == 0:
+                self._check_cancel()
+            yield name
+
+    def _keyed(self, names):
+        """
+        把姓名转换为 (比较键, 原始姓名)
+        """
+        if self.normalizer is None:
+            return ((name, name) for name in names)
+        return self.normalizer.iter_keyed(names)
+
+    @staticmethod
+    def _records(pairs, bit):
+        for key, name in pairs:
+            yield bit, key, name
+
+    @staticmethod
+    def _count_records(pairs, column, column_count):
+        text = ','.join('1' if index == column else '0' for index in range(column_count))
+        for key, name in pairs:
+            yield text, key, name
+
+    @staticmethod
+    def _table_records(masks, display):
+        for key, mask in masks.items():
+            yield mask, key, display.get(key, key)
+
+    @staticmethod
+    def _accumulate(records, masks, display, limit):
+        """
+        把 (掩码, 比较键, 姓名) 合并到 masks 中，display 只记录与比较键不同的原始写法；
+        不同姓名的数量超过 limit 时提前停止并返回 False
+        """
+        for bit, key, name in records:
+            mask = masks.get(key)
+            if mask is None:
+                masks[key] = bit
+                if key != name:
+                    display[key] = name
+                if len(masks) > limit:
+                    return False
+            else:
+                masks[key] = mask | bit
+        return True
+
+    @staticmethod
+    def _emit(masks, display):
+        for key, mask in masks.items():
+            yield display.get(key, key), mask
+
+    def _partition(self, sources, work_dir, prefix, depth):
+        """
+        把若干个 (掩码, 比较键, 姓名) 迭代器按比较键的哈希写入桶文件，返回桶文件路径列表
+        比较键与姓名相同时只写一次，两个字段都经过 escape_field 转义
+        """
+        # 每一层使用哈希值的不同“位”，保证下一层能把同一个桶继续拆开
+        bucket_count = self.bucket_count
+        divisor = bucket_count ** depth
+        separator = BUCKET_SEPARATOR
+        paths = [os.path.join(work_dir, f'{prefix}{depth}_{i}.txt') for i in range(bucket_count)]
+        files = [open(path, 'w', encoding='utf-8', newline='\n') for path in paths]
+        try:
+            for source in sources:
+                for mask, key, name in source:
+                    field = escape_field(key)
+                    record = (f'{mask}{separator}{field}' if key == name
+                              else f'{mask}{separator}{field}{separator}{escape_field(name)}')
+                    files[stable_hash(key) // divisor % bucket_count].write(record + '\n')
+        finally:
+            for f in files:
+                f.close()
+        return paths
+
+    def _read_bucket(self, path, parse=int):
+        """
+        逐条读取桶文件中的 (掩码, 比较键, 姓名)，parse 用于解析第一个字段
+        """
+        separator = BUCKET_SEPARATOR
+        with open(path, 'r', encoding='utf-8', newline='\n') as f:
+            for i, line in enumerate(f):
+                if self.should_cancel is not None and i % CANCEL_CHECK_INTERVAL == 0:
+                    self._check_cancel()
+                parts = line[:-1].split(separator, 2)
+                key = unescape_field(parts[1])
+                yield parse(parts[0]), key, key if len(parts) == 2 else unescape_field(parts[2])
+
+    def _merge_bucket(self, path, work_dir, depth):
+        """
+        合并一个桶文件中的掩码；如果桶仍然超过内存上限，则按哈希值的下一段继续分桶
+        """
+        masks = {}
+        display = {}
+        limit = self.memory_limit if depth < MAX_PARTITION_DEPTH else float('inf')
+        if self._accumulate(self._read_bucket(path), masks, display, limit):
+            # 已经分到最深一层时不再限制，只能直接在内存中合并
+            os.remove(path)
+            yield from self._emit(masks, display)
+            return
+
+        masks = display = None
+        prefix = os.path.splitext(os.path.basename(path))[0]
+        sub_paths = self._partition([self._read_bucket(path)], work_dir, prefix, depth)
+        os.remove(path)
+        for sub_path in sub_paths:
+            yield from self._merge_bucket(sub_path, work_dir, depth + 1)
+
+    def _merge_count_bucket(self, path, work_dir, depth, column_count):
+        """
+        合并一个桶文件中的各列次数，桶仍然过大时继续分桶（与 _merge_bucket 相同）
+        """
+        table = CountTable(column_count)
+        limit = self.memory_limit if depth < MAX_PARTITION_DEPTH else float('inf')
+        if table.add_records(self._read_bucket(path, str), limit):
+            os.remove(path)
+            yield from table.items()
+            return
+
+        table = None
+        prefix = os.path.splitext(os.path.basename(path))[0]
+        sub_paths = self._partition([self._read_bucket(path, str)], work_dir, prefix, depth)
+        os.remove(path)
+        for sub_path in sub_paths:
+            yield from self._merge_count_bucket(sub_path, work_dir, depth + 1, column_count)
+
+
+class MembershipIndex:
+    """
+    多个名单的成员关系索引
+
+    姓名保存在列表中，成员位掩码保存在紧凑的 array 中，
+    “在A和B中但不在C中”“只出现在一个名单中”等查询都直接由掩码回答，不需要两两求差
+    """
+
+    def __init__(self, column_count):
+        self.column_count = column_count
+        self.names = []
+        self.masks = array('L')
+
+    @classmethod
+    def build(cls, sources, comparator=None):
+        """
+        读取多个姓名可迭代对象并建立索引
+        """
+        comparator = comparator if comparator is not None else StreamingComparator()
+        sources = list(sources)
+        index = cls(len(sources))
+        for name, mask in comparator.membership(sources):
+            index.names.append(name)
+            index.masks.append(mask)
+        return index
+
+    def __len__(self):
+        return len(self.names)
+
+    @property
+    def full_mask(self):
+        return (1 << self.column_count) - 1
+
+    def select(self, predicate):
+        """
+        产出掩码满足 predicate 的 (姓名, 掩码)
+        """
+        matched = {}
+        for name, mask in zip(self.names, self.masks):
+            result = matched.get(mask)
+            if result is None:
+                # 不同的掩码最多 2^N 种，每种只计算一次
+                result = matched[mask] = predicate(mask)
+            if result:
+                yield name, mask
+
+    def query(self, include=(), exclude=()):
+        """
+        出现在 include 的所有列中、且不出现在 exclude 的任何一列中的姓名
+        """
+        required = sum(column_bit(column) for column in include)
+        forbidden = sum(column_bit(column) for column in exclude)
+        return self.select(lambda mask: mask & required == required and not mask & forbidden)
+
+    def only_in(self, column):
+        """只出现在第 column 列中的姓名"""
+        bit = column_bit(column)
+        return self.select(lambda mask: mask == bit)
+
+    def exactly_one(self):
+        """只出现在一个名单中的姓名"""
+        return self.select(lambda mask: popcount(mask) == 1)
+
+    def in_all(self):
+        """所有名单中都出现的姓名"""
+        full = self.full_mask
+        return self.select(lambda mask: mask == full)
+
+    def not_in_all(self):
+        """至少缺席一个名单的姓名"""
+        full = self.full_mask
+        return self.select(lambda mask: mask != full)
+
+    def mask_counts(self):
+        """
+        每种掩码对应的姓名数量，例如 {0b011: 120} 表示有120个姓名只出现在第一、二列
+        """
+        counts = {}
+        for mask in self.masks:
+            counts[mask] = counts.get(mask, 0) + 1
+        return counts
+
+
+class ReferenceIndex:
+    """
+    固定的参考名单索引（磁盘文件，只读内存映射）
+
+    文件依次保存：文件头、规则签名、按哈希值排序的64位指纹数组、每条记录在姓名数据中的偏移数组、
+    姓名数据（比较键，与原始写法不同时附带原始写法，两者都经过 escape_field 转义）。打开时只做内存映射，不读取整个文件；
+    查询时二分查找指纹，再核对比较键以排除哈希碰撞。多个进程同时打开同一索引时共享同一份页缓存。
+
+    源文件的大小或修改时间、规范化规则变化后，open() 会自动重建索引。
+    每次重建都写入带新版本号的文件，而不是覆盖旧文件（Windows 上无法替换其他进程正在映射的文件），
+    之后打开的进程使用最新版本，不再使用的旧版本在下次打开时删除
+    """
+
+    def __init__(self, path, normalizer=None):
+        self.path = path
+        self.normalizer = normalizer
+        self._file = open(path, 'rb')
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            header = REFERENCE_HEADER.unpack_from(self._map, 0)
+        except (ValueError, struct.error):
+            self._file.close()
+            raise ValueError(f'无效的参考名单索引: {path}')
+        magic, version, signature_length, count, self.source_size, self.source_mtime, blob_size = header
+        if magic != REFERENCE_MAGIC or version != REFERENCE_VERSION:
+            self.close()
+            raise ValueError(f'无效的参考名单索引: {path}')
+        start = REFERENCE_HEADER.size
+        self.signature = self._map[start:start + signature_length].decode('utf-8')
+        start += _padded(signature_length)
+        view = memoryview(self._map)
+        self.fingerprints = view[start:start + count * 8].cast('Q')
+        start += count * 8
+        self.offsets = view[start:start + (count + 1) * 8].cast('Q')
+        self._blob_start = start + (count + 1) * 8
+
+    @staticmethod
+    def signature_for(source, normalizer=None):
+        """索引内容取决于规范化规则、读取的列和编码"""
+        rules = normalizer.signature if normalizer is not None else 'raw'
+        return f'{rules}|column={source.column}|encoding={source.encoding}'
+
+    @staticmethod
+    def index_prefix(source, signature):
+        """索引文件的路径前缀，各版本的文件名为 前缀.版本号.idx"""
+        digest = hashlib.sha1(f'{os.path.abspath(source.file_path)}|{signature}'.encode('utf-8')).hexdigest()
+        return os.path.join(REFERENCE_DIR, digest[:20])
+
+    @staticmethod
+    def index_versions(prefix):
+        """
+        已有的各版本索引文件，返回 [(版本号, 路径)]，最新的在前
+        """
+        directory, base = os.path.split(prefix)
+        try:
+            entries = os.listdir(directory)
+        except OSError:
+            return []
+        pattern = re.compile(re.escape(base) + r'\.(\d+)\.idx')
+        versions = []
+        for entry in entries:
+            match = pattern.fullmatch(entry)
+            if match:
+                versions.append((int(match.group(1)), os.path.join(directory, entry)))
+        return sorted(versions, reverse=True)
+
+    @staticmethod
+    def is_fresh(path, source_path, signature):
+        """
+        只读取文件头判断索引是否与源文件和规则签名一致
+        """
+        try:
+            stat = os.stat(source_path)
+            with open(path, 'rb') as f:
+                data = f.read(REFERENCE_HEADER.size + len(signature.encode('utf-8')))
+            magic, version, signature_length, _, size, mtime, _ = REFERENCE_HEADER.unpack_from(data, 0)
+        except (OSError, struct.error):
+            return False
+        stored = data[REFERENCE_HEADER.size:REFERENCE_HEADER.size + signature_length]
+        return (magic == REFERENCE_MAGIC and version == REFERENCE_VERSION and size == stat.st_size
+                and mtime == stat.st_mtime_ns and stored == signature.encode('utf-8'))
+
+    @classmethod
+    def open(cls, source, normalizer=None, should_cancel=None):
+        """
+        打开 source（NameFileSource）对应的索引，索引不存在或已过期时先重建
+        """
+        signature = cls.signature_for(source, normalizer)
+        prefix = cls.index_prefix(source, signature)
+        versions = cls.index_versions(prefix)
+        if versions and cls.is_fresh(versions[0][1], source.file_path, signature):
+            path = versions[0][1]
+        else:
+            path = f'{prefix}.{versions[0][0] + 1 if versions else 1}.idx'
+            try:
+                cls.build(source, path, signature, normalizer, should_cancel)
+            except PermissionError:
+                # 另一个进程同时建好了同一版本时直接使用它
+                if not cls.is_fresh(path, source.file_path, signature):
+                    raise
+        for _, stale in versions:
+            if stale != path:
+                try:
+                    os.remove(stale)
+                except OSError:
+                    # 仍被其他进程映射（Windows）时留到下次打开时再删除
+                    pass
+        return cls(path, normalizer)
+
+    @classmethod
+    def build(cls, source, path, signature, normalizer=None, should_cancel=None):
+        """
+        流式读取源文件建立索引：先按哈希值最高几位分桶写入临时文件，
+        再逐桶去重排序，内存占用只与单个桶的大小有关
+        """
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        stat = os.stat(source.file_path)
+        comparator = StreamingComparator(should_cancel=should_cancel, normalizer=normalizer)
+        work_dir = tempfile.mkdtemp(prefix='name_reference_', dir=directory)
+        try:
+            bucket_count = 1 << REFERENCE_BUCKET_BITS
+            shift = 64 - REFERENCE_BUCKET_BITS
+            separator = BUCKET_SEPARATOR
+            bucket_paths = [os.path.join(work_dir, f'r{i}.txt') for i in range(bucket_count)]
+            files = [open(bucket_path, 'w', encoding='utf-8', newline='\n') for bucket_path in bucket_paths]
+            try:
+                for key, name in comparator._keyed(comparator._checked(source)):
+                    field = escape_field(key)
+                    record = field if key == name else f'{field}{separator}{escape_field(name)}'
+                    files[stable_hash(key) >> shift].write(record + '\n')
+            finally:
+                for f in files:
+                    f.close()
+
+            fingerprints = array('Q')
+            offsets = array('Q', [0])
+            blob_path = os.path.join(work_dir, 'names.bin')
+            with open(blob_path, 'wb') as blob:
+                position = 0
+                for bucket_path in bucket_paths:
+                    comparator._check_cancel()
+                    entries = {}
+                    with open(bucket_path, 'r', encoding='utf-8', newline='\n') as f:
+                        for line in f:
+                            # 记录保持转义后的形式写入姓名数据，哈希按原始比较键计算
+                            key = unescape_field(line[:-1].split(separator, 1)[0])
+                            # 同一比较键只保留第一次出现的写法
+                            entries.setdefault(key, line[:-1])
+                    os.remove(bucket_path)
+                    for fingerprint, _, record in sorted((stable_hash(key), key, record)
+                                                         for key, record in entries.items()):
+                        data = record.encode('utf-8')
+                        blob.write(data)
+                        position += len(data)
+                        fingerprints.append(fingerprint)
+                        offsets.append(position)
+
+            signature_bytes = signature.encode('utf-8')
+            fd, temp_path = tempfile.mkstemp(suffix='.idx', dir=directory)
+            try:
+                with os.fdopen(fd, 'wb') as out:
+                    out.write(REFERENCE_HEADER.pack(REFERENCE_MAGIC, REFERENCE_VERSION, len(signature_bytes),
+                                                    len(fingerprints), stat.st_size, stat.st_mtime_ns, position))
+                    out.write(signature_bytes.ljust(_padded(len(signature_bytes)), b'\0'))
+                    fingerprints.tofile(out)
+                    offsets.tofile(out)
+                    with open(blob_path, 'rb') as blob:
+                        shutil.copyfileobj(blob, out)
+                # 先写临时文件再改名，不会留下写了一半的索引
+                try:
+                    os.replace(temp_path, path)
+                except PermissionError:
+                    raise PermissionError(f'参考名单索引正在被其他程序使用，无法更新: {path}') from None
+            except BaseException:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+                raise
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    def __len__(self):
+        return len(self.fingerprints)
+
+    def _record(self, index):
+        start = self._blob_start + self.offsets[index]
+        end = self._blob_start + self.offsets[index + 1]
+        return self._map[start:end].decode('utf-8')
+
+    def contains_key(self, key):
+        fingerprints = self.fingerprints
+        fingerprint = stable_hash(key)
+        field = escape_field(key)
+        index = bisect.bisect_left(fingerprints, fingerprint)
+        while index < len(fingerprints) and fingerprints[index] == fingerprint:
+            if self._record(index).split(BUCKET_SEPARATOR, 1)[0] == field:
+                return True
+            index += 1
+        return False
+
+    def __contains__(self, name):
+        key = name if self.normalizer is None else self.normalizer.key(name)
+        return self.contains_key(key)
+
+    def names(self):
+        """按索引顺序产出参考名单中每个比较键第一次出现时的写法"""
+        for index in range(len(self)):
+            yield unescape_field(self._record(index).split(BUCKET_SEPARATOR, 1)[-1])
+
+    def close(self):
+        # 必须先释放内存视图，否则 mmap 无法关闭
+        for attribute in ('fingerprints', 'offsets'):
+            view = getattr(self, attribute, None)
+            if view is not None:
+                view.release()
+        if getattr(self, '_map', None) is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _padded(length):
+    """按8字节对齐后的长度"""
+    return (length + 7) // 8 * 8
+
+
+class IncrementalComparator:
+    """
+    可增量更新的多列比较
+
+    每列保存一个 比较键 -> 出现次数 的计数表（多重集合），编辑时只处理插入或删除的行，
+    受影响姓名的成员位掩码在常数时间内更新，不需要重新读取整列
+
+    track_counts 为 True 时，出现次数变化（即使掩码不变）的比较键也会被报告为已变化
+    """
+
+    def __init__(self, column_count, normalizer=None, track_counts=False):
+        self.column_count = column_count
+        self.normalizer = normalizer
+        self.track_counts = track_counts
+        self.counts = [{} for _ in range(column_count)]
+        self.masks = {}
+        self.display = {}
+
+    def key(self, name):
+        return name if self.normalizer is None else self.normalizer.key(name)
+
+    def load(self, column, names):
+        """
+        把一批姓名加入第 column 列，返回成员位掩码发生变化的比较键集合
+        """
+        return self.apply_edit(column, (), names)
+
+    def apply_edit(self, column, removed, added):
+        """
+        从第 column 列删除 removed 中的姓名并加入 added 中的姓名，
+        返回成员位掩码（track_counts 时还包括出现次数）发生变化的比较键集合
+        """
+        counts = self.counts[column]
+        masks = self.masks
+        bit = column_bit(column)
+        track_counts = self.track_counts
+        changed = set()
+
+        for name in removed:
+            key = self.key(name)
+            count = counts.get(key, 0)
+            if count > 1:
+                counts[key] = count - 1
+                if track_counts:
+                    changed.add(key)
+            elif count == 1:
+                del counts[key]
+                mask = masks[key] & ~bit
+                if mask:
+                    masks[key] = mask
+                else:
+                    del masks[key]
+                    self.display.pop(key, None)
+                changed.add(key)
+
+        for name in added:
+            key = self.key(name)
+            count = counts.get(key, 0)
+            counts[key] = count + 1
+            if count == 0:
+                mask = masks.get(key, 0)
+                if not mask:
+                    self.display[key] = name
+                masks[key] = mask | bit
+                changed.add(key)
+            elif track_counts:
+                changed.add(key)
+
+        return changed
+
+    def mask(self, key):
+        """比较键当前的成员位掩码，已不在任何一列中时为0"""
+        return self.masks.get(key, 0)
+
+    def counts_of(self, key):
+        """比较键在各列中的出现次数"""
+        return tuple(counts.get(key, 0) for counts in self.counts)
+
+    def name(self, key):
+        """比较键对应的显示姓名（第一次出现时的写法）"""
+        return self.display.get(key, key)
+
+    def items(self):
+        """
+        产出所有 (比较键, 显示姓名, 成员位掩码)
+        """
+        for key, mask in self.masks.items():
+            yield key, self.display.get(key, key), mask
+
+
+def fuzzy_key(name):
+    """
+    模糊匹配使用的比较键：忽略大小写和多余空格；
+    英文（拼音）姓名的各部分按字母排序，使“名 姓”与“姓 名”得到相同的键
+    """
+    tokens = name.lower().split()
+    if len(tokens) > 1 and not CJK_PATTERN.search(name):
+        return ' '.join(sorted(tokens))
+    return ''.join(tokens)
+
+
+def edit_distance(a, b, max_distance):
+    """
+    计算两个字符串的编辑距离，超过 max_distance 时提前返回 max_distance + 1
+    """
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+    if len(a) < len(b):
+        a, b = b, a
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1,
+                               previous[j - 1] + (char_a != char_b)))
+        if min(current) > max_distance:
+            return max_distance + 1
+        previous = current
+    return previous[-1]
+
+
+def similarity(distance, length_a, length_b):
+    """
+    把编辑距离换算为 0~1 的相似度
+    """
+    return 1.0 - distance / max(length_a, length_b, 1)
+
+
+def _deletes(key, max_distance):
+    """
+    生成删除最多 max_distance 个字符后得到的所有字符串（包括原字符串）
+    """
+    result = {key}
+    frontier = {key}
+    for _ in range(max_distance):
+        next_frontier = set()
+        for word in frontier:
+            if len(word) <= 1:
+                continue
+            for i in range(len(word)):
+                next_frontier.add(word[:i] + word[i + 1:])
+        next_frontier -= result
+        result |= next_frontier
+        frontier = next_frontier
+    return result
+
+
+class FuzzyIndex:
+    """
+    姓名模糊匹配索引（删除变体索引，SymSpell 思路）
+
+    每个姓名的比较键在删除最多 max_distance 个字符后得到的所有变体，按 (变体, 原键长度) 写入倒排表。
+    两个编辑距离不超过 k 的字符串，各自删除不超过 k 个字符后一定能得到同一个变体，
+    因此查询时只需按候选长度查找查询键的删除变体，再对少量候选计算精确的编辑距离，
+    不需要与索引中的每个姓名逐一比较。
+    按长度区分变体可以避免短姓名删成单个字（例如只剩姓氏）后匹配到大量无关姓名。
+    """
+
+    def __init__(self, names=(), max_distance=DEFAULT_FUZZY_MAX_DISTANCE):
+        self.max_distance = max_distance
+        self.keys = []
+        self.originals = []
+        self._key_ids = {}
+        self._variants = {}
+        self._lengths = set()
+        for name in names:
+            self.add(name)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def add(self, name, normalized=None):
+        """
+        加入一个姓名；normalized 为规范化后的比较键，省略时直接使用原始姓名
+        """
+        key = fuzzy_key(name if normalized is None else normalized)
+        if not key or key in self._key_ids:
+            return
+        key_id = len(self.keys)
+        self._key_ids[key] = key_id
+        self.keys.append(key)
+        self.originals.append(name)
+        length = len(key)
+        self._lengths.add(length)
+        for variant in _deletes(key, self.max_distance):
+            self._variants.setdefault((variant, length), []).append(key_id)
+
+    def allowed_distance(self, length_a, length_b, threshold):
+        """
+        两个长度的键在给定阈值下允许的最大编辑距离
+        """
+        return min(self.max_distance, int((1 - threshold) * max(length_a, length_b) + 1e-9))
+
+    def search(self, name, threshold=DEFAULT_FUZZY_THRESHOLD, normalized=None):
+        """
+        查找与 name 最相似的姓名，返回 (原始姓名, 相似度)，没有达到阈值的候选时返回 None
+        """
+        key = fuzzy_key(name if normalized is None else normalized)
+        if not key:
+            return None
+        key_id = self._key_ids.get(key)
+        if key_id is not None:
+            return self.originals[key_id], 1.0
+
+        length = len(key)
+        query_variants = None
+        candidates = set()
+        variants = self._variants
+        for other_length in self._lengths:
+            allowed = self.allowed_distance(length, other_length, threshold)
+            if allowed <= 0 or abs(length - other_length) > allowed:
+                continue
+            if query_variants is None:
+                query_variants = _deletes(key, self.max_distance)
+            # 双方都只能删除 allowed 个字符，所以公共变体的长度不能小于两者中较长的减去 allowed
+            shortest = max(length, other_length) - allowed
+            for variant in query_variants:
+                if len(variant) >= shortest:
+                    ids = variants.get((variant, other_length))
+                    if ids:
+                        candidates.update(ids)
+
+        best = None
+        for candidate_id in sorted(candidates):
+            other = self.keys[candidate_id]
+            allowed = self.allowed_distance(length, len(other), threshold)
+            distance = edit_distance(key, other, allowed)
+            if distance > allowed:
+                continue
+            score = similarity(distance, length, len(other))
+            if score >= threshold and (best is None or score > best[1]):
+                best = (self.originals[candidate_id], score)
+        return best
+
+
+def fuzzy_compare(names1, names2, threshold=DEFAULT_FUZZY_THRESHOLD,
+                  max_distance=DEFAULT_FUZZY_MAX_DISTANCE, should_cancel=None, normalizer=None):
+    """
+    近似比较两列姓名，逐个产出 (姓名, 来源列, 近似姓名, 相似度)
+
+    先按比较键做精确集合差；第二列的不重复姓名建立模糊索引，第一列的不重复姓名逐个查询。
+    找到近似姓名的记录相似度大于0，近似姓名为空字符串表示该姓名确实只在一侧出现。
+    """
+    def keyed(names):
+        if normalizer is None:
+            return ((name, name) for name in names)
+        return normalizer.iter_keyed(names)
+
+    keys1 = {}
+    for key, name in keyed(names1):
+        keys1.setdefault(key, name)
+    keys2 = {}
+    for key, name in keyed(names2):
+        keys2.setdefault(key, name)
+
+    index = FuzzyIndex(max_distance=max_distance)
+    for key in keys2.keys() - keys1.keys():
+        index.add(keys2[key], key)
+    unique1 = keys1.keys() - keys2.keys()
+
+    matched2 = {}
+    for i, key in enumerate(unique1):
+        if should_cancel is not None and i % CANCEL_CHECK_INTERVAL == 0 and should_cancel():
+            raise ComparisonCancelled()
+        name = keys1[key]
+        match = index.search(name, threshold, key)
+        if match is None:
+            yield name, COLUMN_FIRST, '', 0.0
+        else:
+            other, score = match
+            yield name, COLUMN_FIRST, other, score
+            if score > matched2.get(other, ('', 0.0))[1]:
+                matched2[other] = (name, score)
+
+    for name in index.originals:
+        other, score = matched2.get(name, ('', 0.0))
+        yield name, COLUMN_SECOND, other, score
+
+
+class ResultStore:
+    """
+    比较结果的列式存储
+
+    姓名和近似姓名保存在列表中，成员位掩码（来源列）和相似度保存在紧凑的 array 中；
+    按出现次数比较时，各列次数按行连续保存在 counts 中（每行 column_count 个）；
+    过滤和排序只重新生成行号数组 view，不复制任何姓名；
+    视图已排序时（view_sorted），少量增删可以用二分查找直接更新视图，不必整体重新排序
+    """
+
+    SORT_BY_NAME = 0
+    SORT_BY_SOURCE = 1
+    SORT_BY_MATCH = 2
+    SORT_BY_SCORE = 3
+    SORT_BY_COUNT = 4
+    SORT_BY_STATUS = 5
+
+    # 每行的状态，按状态排序时按此顺序
+    STATUS_UNIQUE = 0         # 只出现在一列中
+    STATUS_MISSING = 1        # 出现在多列中，但至少缺席一列
+    STATUS_COUNTS_DIFFER = 2  # 每列都出现，但次数不同
+    STATUS_DUPLICATED = 3     # 每列次数相同，但列内有重复
+    STATUS_FUZZY = 4          # 模糊匹配到近似姓名
+
+    def __init__(self):
+        self.names = []
+        self.masks = array('L')
+        self.matches = []
+        self.scores = array('f')
+        self.counts = array('I')
+        self.column_count = 0  # 没有次数信息时为0
+        self.view = array('L')
+        self.view_sorted = True  # 视图是否按当前方式排好序（渐进追加的结果在 refresh() 之前未排序）
+        self.filter_text = ''
+        self.sort_key = self.SORT_BY_SOURCE
+        self.descending = False
+        self._rows = None  # 姓名 -> 行号，只在增量更新时按需建立
+
+    def __len__(self):
+        return len(self.view)
+
+    def clear(self):
+        self.names = []
+        self.masks = array('L')
+        self.matches = []
+        self.scores = array('f')
+        self.counts = array('I')
+        self.column_count = 0
+        self.view = array('L')
+        self.view_sorted = True
+        self._rows = None
+
+    def extend(self, names, masks, matches=None, scores=None, counts=None):
+        """
+        追加一批姓名及其成员位掩码（可带近似姓名和相似度，或按行展开的各列出现次数），
+        追加后需要调用 refresh() 重新生成视图
+        """
+        count = len(names)
+        self._rows = None
+        self.view_sorted = False
+        self.names.extend(names)
+        self.masks.extend(masks)
+        self.matches.extend(matches if matches else [''] * count)
+        self.scores.extend(scores if scores else [0.0] * count)
+        if counts and count:
+            self.column_count = len(counts) // count
+            self.counts.extend(counts)
+
+    def count_visible(self, names):
+        """
+        统计一批姓名中满足当前过滤条件的数量
+        """
+        text = self.filter_text
+        if not text:
+            return len(names)
+        return sum(1 for name in names if text in name)
+
+    def append_unsorted(self, names, masks, matches=None, scores=None, counts=None):
+        """
+        追加一批姓名并直接放到视图末尾（只做过滤不排序）
+        用于比较过程中渐进显示结果，全部结果到齐后再调用 refresh() 排序
+        """
+        start = len(self.names)
+        self.extend(names, masks, matches, scores, counts)
+        text = self.filter_text
+        if text:
+            self.view.extend(i for i in range(start, len(self.names)) if text in self.names[i])
+        else:
+            self.view.extend(range(start, len(self.names)))
+
+    def _row_index(self):
+        if self._rows is None:
+            self._rows = {name: row for row, name in enumerate(self.names)}
+        return self._rows
+
+    def upsert(self, name, mask, match='', score=0.0, counts=None):
+        """
+        新增或更新一个姓名的结果，之后需要调用 refresh() 重新生成视图；
+        或者在更新前用 take_row 把该姓名移出已排序的视图，更新后再用 insert_row 放回
+        """
+        rows = self._row_index()
+        row = rows.get(name)
+        if counts is not None:
+            self.column_count = len(counts)
+        if row is None:
+            rows[name] = len(self.names)
+            self.names.append(name)
+            self.masks.append(mask)
+            self.matches.append(match)
+            self.scores.append(score)
+            if counts is not None:
+                self.counts.extend(counts)
+        else:
+            self.masks[row] = mask
+            self.matches[row] = match
+            self.scores[row] = score
+            if counts is not None:
+                stride = self.column_count
+                self.counts[row * stride:(row + 1) * stride] = array('I', counts)
+
+    def remove(self, name):
+        """
+        删除一个姓名的结果（用最后一行填补空位）
+        视图已排序时同时从视图中移除该姓名，并改写被移动的行号；否则之后需要调用 refresh() 重新生成视图
+        """
+        rows = self._row_index()
+        row = rows.pop(name, None)
+        if row is None:
+            return
+        last = len(self.names) - 1
+        moved_position = None
+        if self.view_sorted:
+            position = self._locate(row)
+            if position is not None:
+                del self.view[position]
+            if row != last:
+                moved_position = self._locate(last)
+        if row != last:
+            moved = self.names[last]
+            self.names[row] = moved
+            self.masks[row] = self.masks[last]
+            self.matches[row] = self.matches[last]
+            self.scores[row] = self.scores[last]
+            stride = self.column_count
+            if stride:
+                self.counts[row * stride:(row + 1) * stride] = self.counts[last * stride:(last + 1) * stride]
+            rows[moved] = row
+            if moved_position is not None:
+                self.view[moved_position] = row
+        self.names.pop()
+        self.masks.pop()
+        self.matches.pop()
+        self.scores.pop()
+        if self.column_count:
+            del self.counts[last * self.column_count:]
+
+    def set_filter(self, text):
+        self.filter_text = text.strip()
+        self.refresh()
+
+    def sort(self, sort_key, descending=False):
+        self.sort_key = sort_key
+        self.descending = descending
+        self.refresh()
+
+    def refresh(self):
+        """
+        按当前的排序方式和过滤条件重新生成可见行号
+        """
+        names = self.names
+        order = sorted(range(len(names)), key=self._sort_key(), reverse=self.descending)
+
+        text = self.filter_text
+        if text:
+            order = [i for i in order if text in names[i]]
+        self.view = array('L', order)
+        self.view_sorted = True
+
+    def find_row(self, name):
+        """
+        姓名在已排序视图中的位置，不存在或不满足过滤条件时返回 None
+        """
+        index = self._row_index().get(name)
+        return None if index is None else self._locate(index)
+
+    def insert_position(self, name):
+        """
+        按当前排序方式，name（已保存但不在视图中）应插入已排序视图的位置，不满足过滤条件时返回 None
+        """
+        if self.filter_text and self.filter_text not in name:
+            return None
+        return self._bisect(self._row_index()[name])
+
+    def insert_row(self, row, name):
+        """把 name 插入视图的第 row 行（row 由 insert_position 得到）"""
+        self.view.insert(row, self._row_index()[name])
+
+    def take_row(self, row):
+        """从视图中移除第 row 行（不删除数据）"""
+        del self.view[row]
+
+    def _bisect(self, index):
+        """
+        二分查找行号 index 在已排序视图中的位置（各排序键都以姓名结尾，不会相等）
+        """
+        key = self._sort_key()
+        value = key(index)
+        view = self.view
+        descending = self.descending
+        low, high = 0, len(view)
+        while low < high:
+            middle = (low + high) // 2
+            other = key(view[middle])
+            if (other > value) if descending else (other < value):
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def _locate(self, index):
+        row = self._bisect(index)
+        if row < len(self.view) and self.view[row] == index:
+            return row
+        return None
+
+    def _sort_key(self):
+        """当前排序方式下由行号计算排序键的函数"""
+        names = self.names
+        if self.sort_key == self.SORT_BY_NAME:
+            key = names.__getitem__
+        elif self.sort_key == self.SORT_BY_STATUS:
+            status_of = self._status_of
+            key = lambda i: (status_of(i), names[i])
+        elif self.sort_key == self.SORT_BY_MATCH:
+            matches = self.matches
+            key = lambda i: (matches[i], names[i])
+        elif self.sort_key == self.SORT_BY_SCORE:
+            scores = self.scores
+            key = lambda i: (scores[i], names[i])
+        elif self.sort_key == self.SORT_BY_COUNT and self.column_count:
+            # 先按各列次数的最大差值，再按最大次数排序
+            counts_at = self._counts_of
+            key = lambda i: (max(counts_at(i)) - min(counts_at(i)), max(counts_at(i)), names[i])
+        else:
+            masks = self.masks
+            key = lambda i: (masks[i], names[i])
+        return key
+
+    def name_at(self, row):
+        return self.names[self.view[row]]
+
+    def mask_at(self, row):
+        return self.masks[self.view[row]]
+
+    def match_at(self, row):
+        return self.matches[self.view[row]]
+
+    def score_at(self, row):
+        return self.scores[self.view[row]]
+
+    def status_at(self, row):
+        """第 row 个可见行的状态（STATUS_* 之一）"""
+        return self._status_of(self.view[row])
+
+    def _status_of(self, index):
+        if self.matches[index]:
+            return self.STATUS_FUZZY
+        if self.column_count:
+            counts = self._counts_of(index)
+            low = min(counts)
+            if low > 0:
+                return self.STATUS_COUNTS_DIFFER if low != max(counts) else self.STATUS_DUPLICATED
+        return self.STATUS_UNIQUE if popcount(self.masks[index]) == 1 else self.STATUS_MISSING
+
+    def _counts_of(self, index):
+        stride = self.column_count
+        return self.counts[index * stride:(index + 1) * stride]
+
+    def counts_at(self, row):
+        """各列出现次数，没有次数信息时为 None"""
+        if not self.column_count:
+            return None
+        return tuple(self._counts_of(self.view[row]))
+
+
+def column_label(column):
+    """
+    列的中文名称，例如 0 -> 第一列，11 -> 第十二列
+    """
+    digits = '零一二三四五六七八九'
+    number = column + 1
+    if number < 10:
+        text = digits[number]
+    elif number < 100:
+        tens, ones = divmod(number, 10)
+        text = ('' if tens == 1 else digits[tens]) + '十' + (digits[ones] if ones else '')
+    else:
+        text = str(number)
+    return f'第{text}列'
+
+
+def mask_label(mask):
+    """
+    成员位掩码的中文描述，例如 0b101 -> 第一列+第三列
+    """
+    labels = []
+    column = 0
+    while mask:
+        if mask & 1:
+            labels.append(column_label(column))
+        mask >>= 1
+        column += 1
+    return '+'.join(labels)
+
+
+def main():
+    """
+    命令行入口：比较多个姓名文件，把满足条件的姓名及其出现的列输出到标准输出
+
+    默认输出只出现在一个文件中的姓名；--include/--exclude 指定文件序号（从1开始）组合查询
+    """
+    parser = argparse.ArgumentParser(description='比较多个姓名列表文件（每行一个姓名，或 csv/xlsx 的一列）')
+    parser.add_argument('files', nargs='+', help='姓名文件（至少两个）')
+    parser.add_argument('--encoding', default=None, help='文件编码（默认自动识别）')
+    parser.add_argument('--column', type=int, default=1, help='csv/xlsx 文件中姓名所在的列（从1开始，默认1）')
+    parser.add_argument('--memory-limit', type=int, default=DEFAULT_MEMORY_LIMIT,
+                        help='内存中最多保留的姓名数量')
+    parser.add_argument('--buckets', type=int, default=DEFAULT_BUCKET_COUNT, help='分桶数量')
+    parser.add_argument('--temp-dir', default=None, help='溢写桶文件的临时目录')
+    parser.add_argument('--include', default='', help='姓名必须出现在这些文件中，如 1,2')
+    parser.add_argument('--exclude', default='', help='姓名不能出现在这些文件中，如 3')
+    parser.add_argument('--fuzzy', type=float, default=None, metavar='THRESHOLD',
+                        help='启用模糊匹配并指定相似度阈值（0~1），只支持两个文件，需要把两列读入内存')
+    parser.add_argument('--normalize', default='',
+                        help=f"逗号分隔的规范化步骤，可选: {','.join(NORMALIZE_STEPS)}")
+    parser.add_argument('--key-cache', default=None, help='规范化键磁盘缓存文件（SQLite）')
+    parser.add_argument('--reference', default='',
+                        help='作为固定参考名单的文件序号（如 1），为其建立磁盘索引并只做查询，'
+                             '只出现在参考名单中的姓名不会输出')
+    parser.add_argument('--counts', action='store_true',
+                        help='保留重复姓名，输出各文件中出现次数不同或有重复的姓名及次数')
+    args = parser.parse_args()
+
+    if len(args.files) < 2:
+        parser.error('至少需要两个姓名文件')
+    if args.column < 1:
+        parser.error('--column 必须从1开始')
+
+    def parse_columns(text):
+        try:
+            columns = [int(part) - 1 for part in text.split(',') if part.strip()]
+        except ValueError:
+            parser.error(f'无效的文件序号: {text}')
+        if any(not 0 <= column < len(args.files) for column in columns):
+            parser.error(f'文件序号超出范围: {text}')
+        return columns
+
+    include = parse_columns(args.include)
+    exclude = parse_columns(args.exclude)
+    reference_columns = parse_columns(args.reference)
+    if reference_columns and (args.counts or args.fuzzy is not None):
+        parser.error('--reference 不能与 --counts 或 --fuzzy 同时使用')
+    if len(reference_columns) >= len(args.files):
+        parser.error('至少需要一个非参考名单的文件')
+
+    normalizer = None
+    steps = [step.strip() for step in args.normalize.split(',') if step.strip()]
+    if steps:
+        try:
+            normalizer = NameNormalizer(steps, store=KeyStore(args.key_cache) if args.key_cache else None)
+        except ValueError as e:
+            parser.error(str(e))
+
+    out = sys.stdout
+    if args.fuzzy is not None:
+        if len(args.files) != 2:
+            parser.error('模糊匹配只支持两个文件')
+        results = fuzzy_compare(iter_names_from_path(args.files[0], args.encoding, args.column - 1),
+                                iter_names_from_path(args.files[1], args.encoding, args.column - 1), args.fuzzy,
+                                normalizer=normalizer)
+        for name, column, match, score in results:
+            label = column_label(column)
+            out.write(f'{name}\t{label}\t{match}\t{score:.2f}\n' if match else f'{name}\t{label}\n')
+        return
+
+    comparator = StreamingComparator(args.memory_limit, args.buckets, args.temp_dir, normalizer=normalizer)
+    sources = [iter_names_from_path(path, args.encoding, args.column - 1) for path in args.files]
+    if args.counts:
+        for name, counts in comparator.multiset(sources):
+            if counts_differ(counts):
+                out.write(f"{name}\t{'/'.join(map(str, counts))}\n")
+        return
+
+    required = sum(column_bit(column) for column in include)
+    forbidden = sum(column_bit(column) for column in exclude)
+    if include or exclude:
+        predicate = lambda mask: mask & required == required and not mask & forbidden
+    else:
+        predicate = lambda mask: popcount(mask) == 1
+
+    references = {}
+    try:
+        for column in reference_columns:
+            references[column] = ReferenceIndex.open(NameFileSource(args.files[column], args.encoding,
+                                                                    args.column - 1), normalizer)
+            sources[column] = None
+        results = comparator.probe_membership(sources, references) if references else comparator.membership(sources)
+        for name, mask in results:
+            if predicate(mask):
+                out.write(f'{name}\t{mask_label(mask)}\n')
+    finally:
+        for reference in references.values():
+            reference.close()
+
+
+if __name__ == '__main__':
+    main()
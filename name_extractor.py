@@ -0,0 +1,1349 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+文件名姓名提取（不依赖Qt）
+每次提取前只构建一次提取器：正则表达式全部预编译，所有过滤词合并为一个不区分大小写的正则，
+过滤词很多时改用 Aho-Corasick 自动机一次扫描完成匹配；
+文件夹用线程池并发递归扫描，按批次产出文件路径；
+大量文件名可以分块交给进程池并行提取，结果按原顺序合并；
+提取结果按 (文件名, 过滤词, 提取器版本) 缓存在内存 LRU 和可选的 SQLite 文件中，重复提取时只处理新文件名；
+监视文件夹时保存快照，每次只重新读取修改时间变化的子文件夹，找出新增、删除和重命名的文件；
+中文姓名用姓氏字典树和停用词/名字自动机识别，不再简单地取第一段2~4个汉字；
+提取结果保存在 ExtractionResults 的平行列表中，界面表格、复制和导出都直接读取，
+并随提取同步维护 姓名 -> 行号 的倒排索引，按姓名查找文件和分组统计不需要遍历全部结果；
+需要时可以传入 StageProfiler，分阶段记录耗时和每个文件名由哪条规则提取出姓名
+
+也可以在没有图形界面的服务器上作为命令行工具使用，结果以 JSON Lines 流式输出:
+    python name_extractor.py 归档文件夹 --filters report,data > names.jsonl
+    find 归档文件夹 -name '*.pdf' | python name_extractor.py - --workers 8
+    python name_extractor.py 归档文件夹 --profile profile.json > names.jsonl
+"""
+
+import os
+import re
+import csv
+import sys
+import json
+import time
+import argparse
+import fnmatch
+import multiprocessing
+from collections import deque, OrderedDict
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+from sqlite_store import SignatureStore
+
+
+# 提取规则的版本号，修改提取逻辑后递增，使旧的缓存结果失效
+EXTRACTOR_VERSION = 3
+# 命令行输出的提取状态
+STATUS_OK = 'ok'
+STATUS_NOT_FOUND = 'not_found'
+
+# 提取结果磁盘缓存所在的目录
+CACHE_DIR = os.path.join(os.path.expanduser('~'), '.filename_name_extractor')
+# 内存中缓存的提取结果数量
+DEFAULT_EXTRACTION_CACHE_SIZE = 200000
+# 磁盘缓存中最多保存的提取结果数量
+DEFAULT_EXTRACTION_STORE_LIMIT = 2000000
+
+# 过滤词数量达到该值时改用 Aho-Corasick 自动机
+AHO_CORASICK_THRESHOLD = 200
+
+# 扫描文件夹时默认排除的文件（与原来一样跳过 Python 脚本）
+DEFAULT_EXCLUDE_PATTERNS = ('*.py',)
+# 扫描文件夹时每批产出的文件数量
+SCAN_BATCH_SIZE = 1000
+# 扫描线程数（主要在等待文件系统，尤其是网络共享，所以比CPU核数多）
+DEFAULT_SCAN_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+# 文件夹的修改时间距离读取时不到该值（纳秒）时，下次检查强制重新读取，
+# 避免同一时间刻度内的后续改动因修改时间不变而被漏掉
+RACY_MTIME_NS = 2 * 10 ** 9
+
+# 并行提取时每个任务处理的文件名数量
+EXTRACT_CHUNK_SIZE = 5000
+# 文件名少于该数量时在当前进程中提取（启动进程池的开销比提取本身还大）
+PARALLEL_MIN_FILES = 50000
+
+SEPARATOR_RUN_PATTERN = re.compile(r'[_\-]+')
+CJK_CHAR_PATTERN = re.compile(r'[\u4e00-\u9fff]')
+CAMEL_PART_PATTERN = re.compile(r'[A-Z][a-z]*|[a-z]+')
+CHINESE_NAME_PATTERN = re.compile(r'[\u4e00-\u9fff]{2,4}')
+CJK_RUN_PATTERN = re.compile(r'[\u4e00-\u9fff]+')
+
+# 内置姓氏词典：最常见的单姓（按人口排序的前100个）、其他单姓、复姓
+COMMON_SURNAMES = ("王李张刘陈杨黄赵吴周徐孙马朱胡郭何高林罗郑梁谢宋唐许韩冯邓曹彭曾肖田董袁潘于蒋蔡余杜叶程苏魏吕丁"
+                   "任沈姚卢姜崔钟谭陆汪范金石廖贾夏韦付方白邹孟熊秦邱江尹薛闫段雷侯龙史陶黎贺顾毛郝龚邵万钱严覃武戴莫孔向汤")
+OTHER_SURNAMES = ("常温康施文牛樊葛邢安齐易乔伍庞颜倪庄聂章鲁岳翟殷詹申欧耿关兰焦俞左柳甘祝包宁尚符舒阮柯纪梅童凌毕"
+                  "单季裴霍涂成苗谷盛曲翁冉骆蓝路游辛靳管柴蒙鲍华喻祁蒲房滕屈饶解牟艾尤阳时穆农司卓古吉缪简车项连芦麦"
+                  "褚娄窦戚岑景党宫费卜冷晏席卫米柏宗瞿桂全佟应臧闵苟邬边卞姬师和仇栾隋商刁沙荣巫寇桑郎甄丛仲虞敖巩明"
+                  "佘池查麻苑迟邝")
+COMPOUND_SURNAMES = ("欧阳", "司马", "诸葛", "上官", "东方", "皇甫", "尉迟", "公孙", "慕容", "长孙", "宇文", "司徒",
+                     "令狐", "夏侯", "澹台", "轩辕", "端木", "南宫", "独孤", "呼延", "西门", "百里", "东郭", "申屠",
+                     "万俟", "闻人", "赫连", "钟离", "宗政", "濮阳", "太叔", "公冶", "拓跋", "左丘", "第五", "谷梁")
+# 内置停用词：文件名中常见的、不会是姓名的一部分的词
+DEFAULT_STOP_WORDS = ("年度", "年", "季度", "月份", "考核", "表格", "表", "报告", "申请", "材料", "扫描件", "扫描",
+                      "签名", "签字", "合同", "复印件", "身份证", "简历", "登记", "证明", "附件", "汇总", "统计",
+                      "信息", "资料", "档案", "照片", "证书", "成绩单", "成绩", "名单", "通知", "文件", "审批",
+                      "评估", "总结", "计划", "工作", "个人", "学生", "员工", "教师", "职工", "最终版", "最终",
+                      "修改版", "修改", "副本", "原件", "正面", "反面", "入职", "离职", "体检", "合格", "的", "第",
+                      "份", "版", "稿", "页", "号")
+ENGLISH_WORD_PATTERN = re.compile(r'[A-Za-z]+')
+
+# 性能分析的阶段（按处理顺序）
+STAGE_LABELS = OrderedDict([
+    ('scan', '扫描文件夹'),
+    ('read', '读取文件路径'),
+    ('file_list', '填充文件列表'),
+    ('cache', '查询缓存'),
+    ('filter', '删除扩展名和过滤词'),
+    ('underscore', '下划线分割'),
+    ('camel', '驼峰命名'),
+    ('chinese', '中文姓名识别'),
+    ('english', '英文姓名'),
+    ('table', '填充结果表格'),
+])
+# 文件名最终由哪条规则得出结果
+BRANCH_LABELS = OrderedDict([
+    ('cached', '缓存命中'),
+    ('empty', '删除过滤词后为空'),
+    ('underscore_chinese', '下划线分割：识别出中文姓名'),
+    ('underscore_cjk_part', '下划线分割：整段中文'),
+    ('underscore_english_pair', '下划线分割：英文名和姓'),
+    ('underscore_english', '下划线分割：单个英文部分'),
+    ('camel_case', '驼峰命名'),
+    ('chinese_recognizer', '中文姓名：姓氏词典识别'),
+    ('chinese_regex', '中文姓名：第一段2~4个汉字'),
+    ('english_pair', '英文姓名：前两个单词'),
+    ('english_word', '英文姓名：单个单词'),
+    ('not_found', '未找到姓名'),
+])
+
+
+def parse_filter_words(text):
+    """
+    把逗号分隔的过滤词文本拆分为列表（去除空白和空项）
+    """
+    return [word.strip() for word in text.split(',') if word.strip()]
+
+
+def strip_extension(filename):
+    """
+    去掉文件扩展名，与 os.path.splitext(filename)[0] 相同（开头的点不算扩展名），
+    但只处理不含目录的文件名，省去路径分隔符的查找
+    """
+    dot = filename.rfind('.')
+    if dot <= 0 or not filename[:dot].strip('.'):
+        return filename
+    return filename[:dot]
+
+
+def is_ascii_word(text):
+    """是否为非空的纯英文字母串（等价于 ^[A-Za-z]+$）"""
+    return text.isascii() and text.isalpha()
+
+
+class AhoCorasick:
+    """
+    多模式字符串匹配自动机
+    构建时间与所有模式的总长度成正比，匹配时只扫描一遍文本，与模式数量无关
+    """
+
+    def __init__(self, patterns):
+        # 每个状态：子节点字典、失败指针、以该状态结尾的所有模式长度
+        self._goto = [{}]
+        self._fail = [0]
+        self._outputs = [()]
+        for pattern in patterns:
+            if pattern:
+                self._insert(pattern)
+        self._build()
+
+    def _insert(self, pattern):
+        state = 0
+        for char in pattern:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._outputs.append(())
+            state = next_state
+        if len(pattern) not in self._outputs[state]:
+            self._outputs[state] += (len(pattern),)
+
+    def _build(self):
+        """按广度优先顺序计算失败指针"""
+        queue = list(self._goto[0].values())
+        head = 0
+        while head < len(queue):
+            state = queue[head]
+            head += 1
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[next_state] = target if target != next_state else 0
+                # 失败指针指向的后缀状态上的匹配也是当前状态的匹配
+                self._outputs[next_state] += self._outputs[self._fail[next_state]]
+
+    def _matches(self, text):
+        """
+        逐个产出所有匹配的 (开始位置, -长度)
+        """
+        goto = self._goto
+        fail = self._fail
+        outputs = self._outputs
+        state = 0
+        for position, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for length in outputs[state]:
+                yield position + 1 - length, -length
+
+    def find_all(self, text):
+        """
+        返回所有匹配区间 [(开始, 结束), ...]（可以互相重叠）
+        """
+        return [(start, start - negative_length) for start, negative_length in self._matches(text)]
+
+    def spans(self, text):
+        """
+        返回互不重叠的匹配区间 [(开始, 结束), ...]，与正则交替匹配相同：
+        优先最靠左的匹配，同一起点优先最长的模式
+        """
+        candidates = sorted(self._matches(text))
+        spans = []
+        last_end = 0
+        for start, negative_length in candidates:
+            if start >= last_end:
+                end = start - negative_length
+                spans.append((start, end))
+                last_end = end
+        return spans
+
+    def remove(self, text, search_text=None):
+        """
+        删除 text 中所有匹配；search_text 为用于匹配的文本（如小写形式），长度必须与 text 相同
+        """
+        spans = self.spans(text if search_text is None else search_text)
+        if not spans:
+            return text
+        pieces = []
+        last_end = 0
+        for start, end in spans:
+            pieces.append(text[last_end:start])
+            last_end = end
+        pieces.append(text[last_end:])
+        return ''.join(pieces)
+
+
+class ChineseNameRecognizer:
+    """
+    基于词典的中文姓名识别
+
+    停用词自动机先把每段连续的汉字切成不含停用词的片段；在片段的每个位置用姓氏字典树查找姓氏（含复姓），
+    候选为 姓氏 + 1~2个字（恰好占满整个片段时允许到4个字）。候选按姓氏的常见程度、是否为词典中的名字、
+    是否以片段边界开始和结束打分，取分数最高的候选（同分取最靠前的）。
+    片段恰好由几个 姓氏+1~2个字 的姓名首尾相连组成时（如“张三李四”），按姓名切开，只取第一个姓名；
+    以复姓开头、总长不超过4个字的片段（如“欧阳华明”）仍当作一个姓名。
+    每个位置只查固定深度的字典树，整个文件名只扫描一遍，耗时与词典大小无关
+
+    局限：相连的姓名后面还跟着其他非停用词的汉字时（如“张三李四同学”）无法切开，
+    可能得到“张三李”这样跨越两个姓名的结果；不在词典中的姓氏也无法识别
+    """
+
+    # 字典树节点中保存姓氏权重的键（不会与单个汉字冲突）
+    _END = ''
+
+    def __init__(self, surnames=None, stop_words=DEFAULT_STOP_WORDS, given_names=()):
+        """
+        surnames 为 {姓氏: 权重}，默认使用内置姓氏词典；
+        stop_words 为停用词（不会出现在姓名中），given_names 为可选的常见名字（不含姓）
+        """
+        if surnames is None:
+            surnames = default_surnames()
+        self._trie = {}
+        for surname, weight in surnames.items():
+            node = self._trie
+            for char in surname:
+                node = node.setdefault(char, {})
+            node[self._END] = weight
+        stop_words = [word for word in stop_words if word]
+        given_names = [name for name in given_names if name]
+        self._stop_automaton = AhoCorasick(stop_words) if stop_words else None
+        self._given_automaton = AhoCorasick(given_names) if given_names else None
+
+    def _segments(self, run):
+        """去掉停用词后剩下的片段 [(开始, 结束), ...]"""
+        if self._stop_automaton is None:
+            return [(0, len(run))]
+        segments = []
+        last_end = 0
+        for start, end in self._stop_automaton.spans(run):
+            if start > last_end:
+                segments.append((last_end, start))
+            last_end = end
+        if last_end < len(run):
+            segments.append((last_end, len(run)))
+        return segments
+
+    def remove_stop_words(self, text):
+        """删除 text 中的所有停用词"""
+        if self._stop_automaton is None:
+            return text
+        return self._stop_automaton.remove(text)
+
+    def _surnames_at(self, text, position, end):
+        """从 position 开始的所有姓氏，逐个产出 (姓氏结束位置, 权重)"""
+        node = self._trie
+        while position < end:
+            node = node.get(text[position])
+            if node is None:
+                return
+            position += 1
+            weight = node.get(self._END)
+            if weight is not None:
+                yield position, weight
+
+    def _split_names(self, run, start, end):
+        """
+        片段 run[start:end] 恰好由两个或更多 姓氏+1~2个字 的姓名首尾相连组成时，
+        返回各姓名的 [(开始, 名字开始, 结束, 姓氏权重)]（姓名最少、同样多时姓氏权重之和最大的切分），否则返回 None
+        """
+        if end - start <= 4 and any(surname_end - start == 2 for surname_end, _ in self._surnames_at(run, start, end)):
+            # 复姓开头的短片段是一个姓名
+            return None
+        # 位置 -> (从该位置到片段结尾的切分的排序键, 切分)，排序键为 (-姓名数, 权重之和)
+        best = {end: ((0, 0), [])}
+        for position in range(end - 2, start - 1, -1):
+            choice = None
+            for given_start, weight in self._surnames_at(run, position, end):
+                for given_length in (1, 2):
+                    rest = best.get(given_start + given_length)
+                    if rest is None:
+                        continue
+                    rank = (rest[0][0] - 1, rest[0][1] + weight)
+                    if choice is None or rank > choice[0]:
+                        choice = (rank, [(position, given_start, given_start + given_length, weight)] + rest[1])
+            if choice is not None:
+                best[position] = choice
+        result = best.get(start)
+        if result is None or len(result[1]) < 2:
+            return None
+        return result[1]
+
+    def recognize(self, text):
+        """返回 text 中最可能的中文姓名，找不到时返回空字符串"""
+        best = ''
+        best_score = 0
+        for run in CJK_RUN_PATTERN.finditer(text):
+            run = run.group()
+            given = set(self._given_automaton.find_all(run)) if self._given_automaton is not None else ()
+            for segment_start, segment_end in self._segments(run):
+                if segment_end - segment_start < 2:
+                    continue
+                names = self._split_names(run, segment_start, segment_end)
+                if names is not None:
+                    # 相连的几个姓名：第一个姓名两侧都按片段边界计分
+                    start, given_start, end, weight = names[0]
+                    score = weight + (end - given_start == 2) + 4 + 3 * ((given_start, end) in given)
+                    if score > best_score:
+                        best = run[start:end]
+                        best_score = score
+                    continue
+                for start in range(segment_start, segment_end - 1):
+                    for given_start, weight in self._surnames_at(run, start, segment_end):
+                        for given_length in (1, 2, 3):
+                            end = given_start + given_length
+                            if end > segment_end:
+                                break
+                            fills_segment = start == segment_start and end == segment_end
+                            # 名字超过两个字的只在恰好占满片段且总长不超过4个字时接受
+                            if given_length == 3 and not (fills_segment and end - start <= 4):
+                                break
+                            score = weight + (given_length == 2)
+                            if start == segment_start:
+                                score += 2
+                            if end == segment_end:
+                                score += 2
+                            if (given_start, end) in given:
+                                score += 3
+                            if score > best_score:
+                                best = run[start:end]
+                                best_score = score
+        return best
+
+
+_default_surnames = None
+_default_recognizer = None
+
+
+def default_surnames():
+    """内置姓氏词典 {姓氏: 权重}：最常见的单姓和复姓权重为3，其他单姓为2"""
+    global _default_surnames
+    if _default_surnames is None:
+        surnames = {surname: 2 for surname in OTHER_SURNAMES}
+        surnames.update((surname, 3) for surname in COMMON_SURNAMES)
+        surnames.update((surname, 3) for surname in COMPOUND_SURNAMES)
+        _default_surnames = surnames
+    return _default_surnames
+
+
+def default_recognizer():
+    """使用内置词典的中文姓名识别器（每个进程只构建一次）"""
+    global _default_recognizer
+    if _default_recognizer is None:
+        _default_recognizer = ChineseNameRecognizer()
+    return _default_recognizer
+
+
+class StageProfiler:
+    """
+    分阶段的性能分析：每个阶段的累计耗时和调用次数，以及各条提取规则得出结果的文件名数量
+    不分析时调用方传 None 而不创建该对象，提取的热路径上只多几次 is None 判断
+    """
+
+    def __init__(self):
+        self.stages = {}    # 阶段 -> [累计秒数, 调用次数]
+        self.branches = {}  # 规则 -> 文件名数量
+
+    clock = staticmethod(time.perf_counter)
+
+    def add(self, stage, seconds, calls=1):
+        entry = self.stages.get(stage)
+        if entry is None:
+            entry = self.stages[stage] = [0.0, 0]
+        entry[0] += seconds
+        entry[1] += calls
+
+    def lap(self, stage, start):
+        """把从 start 到现在的耗时计入阶段，返回现在的时间（作为下一阶段的开始）"""
+        now = time.perf_counter()
+        self.add(stage, now - start)
+        return now
+
+    def count(self, branch, files=1):
+        self.branches[branch] = self.branches.get(branch, 0) + files
+
+    def resolve(self, stage, start, branch):
+        """文件名在该阶段由 branch 规则得出结果"""
+        self.count(branch)
+        return self.lap(stage, start)
+
+    def merge(self, other):
+        """合并另一个分析结果（如后台线程中记录的提取阶段）"""
+        for stage, (seconds, calls) in other.stages.items():
+            self.add(stage, seconds, calls)
+        for branch, files in other.branches.items():
+            self.count(branch, files)
+
+    def __bool__(self):
+        return bool(self.stages or self.branches)
+
+    def to_dict(self):
+        """按处理顺序整理为可以写成 JSON 的字典"""
+        order = list(STAGE_LABELS) + sorted(set(self.stages) - set(STAGE_LABELS))
+        stages = OrderedDict()
+        for stage in order:
+            if stage in self.stages:
+                seconds, calls = self.stages[stage]
+                stages[stage] = {
+                    'label': STAGE_LABELS.get(stage, stage),
+                    'seconds': round(seconds, 6),
+                    'calls': calls,
+                    'mean_us': round(seconds / calls * 1e6, 3) if calls else 0.0,
+                }
+        order = list(BRANCH_LABELS) + sorted(set(self.branches) - set(BRANCH_LABELS))
+        branches = OrderedDict((branch, {'label': BRANCH_LABELS.get(branch, branch), 'files': self.branches[branch]})
+                               for branch in order if branch in self.branches)
+        return {
+            'total_seconds': round(sum(seconds for seconds, _ in self.stages.values()), 6),
+            'stages': stages,
+            'branches': branches,
+        }
+
+    def summary_lines(self):
+        """供界面显示的摘要，每个阶段和规则一行"""
+        report = self.to_dict()
+        total = report['total_seconds'] or 1.0
+        lines = [f"{stage['label']}: {stage['seconds']:.3f} 秒 ({stage['seconds'] / total:.0%})，"
+                 f"{stage['calls']} 次，平均 {stage['mean_us']:.1f} 微秒"
+                 for stage in report['stages'].values()]
+        files = sum(branch['files'] for branch in report['branches'].values()) or 1
+        lines += [f"{branch['label']}: {branch['files']} 个文件 ({branch['files'] / files:.0%})"
+                  for branch in report['branches'].values()]
+        return lines
+
+    def export(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
+
+
+class NameExtractor:
+    """
+    从文件名中提取姓名
+    支持多种格式，例如:
+    - Zhang_San_Report.docx -> Zhang San
+    - li_si_data.xlsx -> Li Si
+    - wangwu.txt -> Wangwu
+    - Report_Zhao_Liu.pdf -> Zhao Liu
+    - 2023年度张三考核表.pdf -> 张三
+    profiler 为 StageProfiler 时记录各步骤的耗时和得出结果的规则
+    """
+
+    def __init__(self, filter_words=(), recognizer=None, profiler=None):
+        self.filter_words = [word for word in filter_words if word]
+        self.profiler = profiler
+        # 中文姓名识别器，默认使用内置词典
+        self.recognizer = recognizer if recognizer is not None else default_recognizer()
+        self._filter_pattern = None
+        self._automaton = None
+        if len(self.filter_words) >= AHO_CORASICK_THRESHOLD:
+            self._automaton = AhoCorasick(word.lower() for word in self.filter_words)
+        if self.filter_words:
+            # 长的过滤词排在前面，使同一位置优先删除较长的词；
+            # 自动机无法处理的文本（小写后长度变化）也用这个正则
+            words = sorted(set(self.filter_words), key=len, reverse=True)
+            self._filter_pattern = re.compile('|'.join(re.escape(word) for word in words), re.IGNORECASE)
+
+    def remove_filter_words(self, text):
+        """
+        不区分大小写地删除所有过滤词
+        """
+        if self._automaton is not None:
+            lowered = text.lower()
+            if len(lowered) == len(text):
+                return self._automaton.remove(text, lowered)
+        if self._filter_pattern is not None:
+            return self._filter_pattern.sub('', text)
+        return text
+
+    def extract(self, filename):
+        """
+        从单个文件名中提取姓名，无法提取时返回空字符串
+        """
+        profiler = self.profiler
+        if profiler is not None:
+            start = profiler.clock()
+
+        # 移除文件扩展名和过滤词
+        name_part = self.remove_filter_words(strip_extension(filename))
+
+        # 清理多余的下划线和连字符（没有连字符和连续下划线时跳过正则）
+        if '-' in name_part or '__' in name_part:
+            name_part = SEPARATOR_RUN_PATTERN.sub('_', name_part)
+        name_part = name_part.strip('_')
+
+        # 如果过滤后没有内容，返回空
+        if not name_part:
+            if profiler is not None:
+                profiler.resolve('filter', start, 'empty')
+            return ""
+        if profiler is not None:
+            start = profiler.lap('filter', start)
+
+        # 1. 下划线分割
+        if '_' in name_part:
+            parts = name_part.split('_')
+            for i, part in enumerate(parts):
+                # 如果部分包含中文字符，可能是中文姓名（识别不出姓名时返回整个部分，只有停用词的部分跳过）
+                if CJK_CHAR_PATTERN.search(part):
+                    chinese_name = self.recognizer.recognize(part)
+                    if chinese_name:
+                        if profiler is not None:
+                            profiler.resolve('underscore', start, 'underscore_chinese')
+                        return chinese_name
+                    if not self.recognizer.remove_stop_words(part):
+                        continue
+                    if profiler is not None:
+                        profiler.resolve('underscore', start, 'underscore_cjk_part')
+                    return part
+                # 如果是英文，检查是否可能是英文姓名
+                if is_ascii_word(part):
+                    # 如果下一个部分也是英文，可能是名和姓
+                    if i + 1 < len(parts) and is_ascii_word(parts[i + 1]):
+                        if profiler is not None:
+                            profiler.resolve('underscore', start, 'underscore_english_pair')
+                        return f"{part} {parts[i + 1]}"
+                    # 单个英文部分
+                    if profiler is not None:
+                        profiler.resolve('underscore', start, 'underscore_english')
+                    return part.capitalize()
+            if profiler is not None:
+                start = profiler.lap('underscore', start)
+
+        # 2. 驼峰命名法 (如: zhangSanReport -> Zhang San Report)
+        camel_parts = CAMEL_PART_PATTERN.findall(name_part)
+        if len(camel_parts) >= 2:
+            if profiler is not None:
+                profiler.resolve('camel', start, 'camel_case')
+            return ' '.join(camel_parts).title()
+        if profiler is not None:
+            start = profiler.lap('camel', start)
+
+        # 3. 中文姓名：先按姓氏词典识别，识别不出时在去掉停用词后的文本中取第一段2-4个汉字
+        #    （只有停用词的文本，如“考核表”，不会被当作姓名）
+        chinese_name = self.recognizer.recognize(name_part)
+        if chinese_name:
+            if profiler is not None:
+                profiler.resolve('chinese', start, 'chinese_recognizer')
+            return chinese_name
+        chinese_name = CHINESE_NAME_PATTERN.search(self.recognizer.remove_stop_words(name_part))
+        if chinese_name:
+            if profiler is not None:
+                profiler.resolve('chinese', start, 'chinese_regex')
+            return chinese_name.group()
+        if profiler is not None:
+            start = profiler.lap('chinese', start)
+
+        # 4. 英文姓名
+        english_parts = ENGLISH_WORD_PATTERN.findall(name_part)
+        if english_parts:
+            if len(english_parts) >= 2:
+                if profiler is not None:
+                    profiler.resolve('english', start, 'english_pair')
+                return f"{english_parts[0].capitalize()} {english_parts[1].capitalize()}"
+            if profiler is not None:
+                profiler.resolve('english', start, 'english_word')
+            return english_parts[0].capitalize()
+
+        # 如果无法提取姓名，返回空字符串
+        if profiler is not None:
+            profiler.resolve('english', start, 'not_found')
+        return ""
+
+    def extract_many(self, filenames):
+        """
+        批量提取，按输入顺序逐个产出姓名（无法提取时为空字符串）
+        """
+        extract = self.extract
+        for filename in filenames:
+            yield extract(filename)
+
+
+def parse_glob_patterns(text):
+    """把逗号或分号分隔的通配符文本拆分为列表"""
+    return [pattern.strip() for pattern in re.split(r'[,;]', text) if pattern.strip()]
+
+
+def compile_globs(patterns):
+    """
+    把多个通配符合并为一个正则，返回匹配函数；没有通配符时返回 None
+    与 fnmatch.fnmatch 相同，按当前系统的规则决定是否区分大小写
+    """
+    patterns = [os.path.normcase(pattern) for pattern in patterns if pattern]
+    if not patterns:
+        return None
+    match = re.compile('|'.join(f'(?:{fnmatch.translate(pattern)})' for pattern in patterns)).match
+    if os.path.normcase('A') == 'A':
+        return match
+    return lambda name: match(os.path.normcase(name))
+
+
+def _scan_one(directory, include_match, exclude_match, recursive):
+    """
+    扫描单个文件夹，返回 (文件路径列表, 子文件夹路径列表)
+    DirEntry 自带文件类型信息，大多数文件系统上不需要再对每个文件调用 stat
+    """
+    files = []
+    subdirectories = []
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            name = entry.name
+            if exclude_match is not None and exclude_match(name):
+                continue
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    if recursive:
+                        subdirectories.append(entry.path)
+                elif entry.is_file() and (include_match is None or include_match(name)):
+                    files.append(entry.path)
+            except OSError:
+                continue
+    files.sort()
+    return files, subdirectories
+
+
+def scan_directory(root, include=(), exclude=DEFAULT_EXCLUDE_PATTERNS, recursive=True,
+                   workers=DEFAULT_SCAN_WORKERS, batch_size=SCAN_BATCH_SIZE, should_cancel=None):
+    """
+    扫描文件夹（可递归），按批次产出相对于 root 的文件路径列表
+
+    子文件夹在线程池中并发扫描，发现一个就提交一个，不等整棵目录树扫描完；
+    include/exclude 为文件名通配符，exclude 同时用于跳过同名的子文件夹；
+    无法访问的子文件夹会被跳过，root 本身无法访问时抛出 OSError。
+    should_cancel 返回 True 时停止扫描
+    """
+    include_match = compile_globs(include)
+    exclude_match = compile_globs(exclude)
+    prefix_length = len(os.path.join(root, ''))
+
+    pool = ThreadPoolExecutor(max_workers=max(1, workers))
+    root_future = pool.submit(_scan_one, root, include_match, exclude_match, recursive)
+    pending = {root_future}
+    batch = []
+    try:
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    files, subdirectories = future.result()
+                except OSError:
+                    if future is root_future:
+                        raise
+                    continue
+                pending.update(pool.submit(_scan_one, directory, include_match, exclude_match, recursive)
+                               for directory in subdirectories)
+                batch.extend(path[prefix_length:] for path in files)
+            while len(batch) >= batch_size:
+                yield batch[:batch_size]
+                del batch[:batch_size]
+            if should_cancel is not None and should_cancel():
+                return
+        if batch:
+            yield batch
+    finally:
+        for future in pending:
+            future.cancel()
+        pool.shutdown(wait=True)
+
+
+# 进程池中每个工作进程的提取器，由 _init_extract_worker 构建一次，之后所有任务共用
+_worker_extractor = None
+
+
+def _init_extract_worker(filter_words):
+    global _worker_extractor
+    _worker_extractor = NameExtractor(filter_words)
+
+
+def _extract_chunk(filenames):
+    """进程池任务：提取一块文件名，返回姓名列表"""
+    return list(_worker_extractor.extract_many(filenames))
+
+
+def extract_chunks(chunks, filter_words=(), workers=None, parallel=True, should_cancel=None, lookup=None,
+                   key=None, profiler=None):
+    """
+    对逐块给出的文件名提取姓名，按输入顺序逐块产出 (这一块, 姓名列表)
+
+    提取只是纯字符串处理，受 GIL 限制多线程无法加速，所以交给进程池；
+    同时在途的块数限制为进程数的两倍，chunks 可以是惰性的生成器（如逐行读取标准输入），内存占用不随总数增长。
+    workers 为进程数（默认CPU核数），parallel 为 False 或只有一个进程时在当前进程中提取。
+    key 为从每一项取出文件名的函数（如 os.path.basename），默认每一项本身就是文件名。
+    lookup 为 CachedLookup 时只提取缓存中没有的文件名，新结果写回缓存。
+    should_cancel 返回 True 时停止提交新任务并放弃未完成的任务。
+    profiler 为 StageProfiler 时在当前进程中提取（子进程的分析结果无法汇总），并记录查询缓存的耗时
+    """
+    filter_words = list(filter_words)
+    workers = workers or os.cpu_count() or 1
+    chunks = iter(chunks)
+
+    def prepare(chunk):
+        """查询缓存，返回 (这一块, 这一块的文件名, 已知结果, 需要提取的文件名)"""
+        filenames = chunk if key is None else [key(item) for item in chunk]
+        if lookup is None:
+            return chunk, filenames, None, filenames
+        if profiler is not None:
+            start = profiler.clock()
+        found, missing = lookup.lookup(filenames)
+        if profiler is not None:
+            profiler.lap('cache', start)
+            if len(missing) < len(filenames):
+                profiler.count('cached', len(filenames) - len(missing))
+        return chunk, filenames, found, missing
+
+    def merge(filenames, found, missing, names):
+        if found is None:
+            return names
+        if profiler is not None:
+            start = profiler.clock()
+        lookup.record(zip(missing, names))
+        found.update(zip(missing, names))
+        names = [found[filename] for filename in filenames]
+        if profiler is not None:
+            profiler.lap('cache', start)
+        return names
+
+    if workers <= 1 or not parallel or profiler is not None:
+        extractor = NameExtractor(filter_words, profiler=profiler)
+        for chunk in chunks:
+            if should_cancel is not None and should_cancel():
+                return
+            chunk, filenames, found, missing = prepare(chunk)
+            yield chunk, merge(filenames, found, missing, list(extractor.extract_many(missing)))
+        return
+
+    pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_extract_worker, initargs=(filter_words,))
+    in_flight = deque()
+
+    def submit(chunk):
+        chunk, filenames, found, missing = prepare(chunk)
+        # 整块都命中缓存时不需要提交任务
+        future = pool.submit(_extract_chunk, missing) if missing else None
+        in_flight.append((chunk, filenames, found, missing, future))
+
+    try:
+        for chunk in chunks:
+            submit(chunk)
+            if len(in_flight) >= workers * 2:
+                break
+        while in_flight:
+            if should_cancel is not None and should_cancel():
+                return
+            chunk, filenames, found, missing, future = in_flight.popleft()
+            # 先把这一块的结果写入缓存再查询下一块，相邻块中重复的文件名可以命中
+            names = merge(filenames, found, missing, future.result() if future is not None else [])
+            next_chunk = next(chunks, None)
+            if next_chunk is not None:
+                submit(next_chunk)
+            yield chunk, names
+    finally:
+        for item in in_flight:
+            if item[-1] is not None:
+                item[-1].cancel()
+        pool.shutdown(wait=True)
+
+
+def extract_parallel(filenames, filter_words=(), workers=None, chunk_size=EXTRACT_CHUNK_SIZE,
+                     min_parallel=PARALLEL_MIN_FILES, should_cancel=None, lookup=None):
+    """
+    分块提取一个文件名列表，按输入顺序逐块产出 (起始位置, 姓名列表)
+    文件名少于 min_parallel 时在当前进程中提取（见 extract_chunks）
+    """
+    chunks = (filenames[offset:offset + chunk_size] for offset in range(0, len(filenames), chunk_size))
+    offset = 0
+    for _, names in extract_chunks(chunks, filter_words, workers, len(filenames) >= min_parallel,
+                                   should_cancel, lookup):
+        yield offset, names
+        offset += len(names)
+
+
+def filter_signature(filter_words):
+    """
+    过滤词集合与提取器版本的签名，作为缓存键的一部分
+    过滤词不区分大小写且与顺序无关，所以先转为小写、去重并排序
+    """
+    words = sorted({word.lower() for word in filter_words if word})
+    return f"v{EXTRACTOR_VERSION}:" + '\x1f'.join(words)
+
+
+class ExtractionCache:
+    """
+    提取结果的内存 LRU 缓存（文件名 -> 姓名），每个过滤词签名使用一个
+    """
+
+    def __init__(self, capacity=DEFAULT_EXTRACTION_CACHE_SIZE):
+        self.capacity = capacity
+        self._data = OrderedDict()
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, filename):
+        name = self._data.get(filename)
+        if name is not None:
+            self._data.move_to_end(filename)
+        return name
+
+    def put(self, filename, name):
+        self._data[filename] = name
+        self._data.move_to_end(filename)
+        if len(self._data) > self.capacity:
+            self._data.popitem(last=False)
+
+
+class ExtractionStore(SignatureStore):
+    """
+    提取结果的磁盘缓存（SQLite），按过滤词签名区分
+    每天重复提取同一批归档文件夹时，绝大多数文件名都可以直接取出结果；
+    保存的结果超过 max_entries 条时自动清理（过滤词改变后先删除旧过滤词的结果），也可以调用 clear() 手动清空
+    """
+
+    TABLE = 'extracted_names'
+    KEY_COLUMN = 'filename'
+    VALUE_COLUMN = 'name'
+
+    def __init__(self, path=None, max_entries=DEFAULT_EXTRACTION_STORE_LIMIT):
+        if path is None:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            path = self.default_path()
+        super().__init__(path, max_entries)
+
+    @staticmethod
+    def default_path():
+        return os.path.join(CACHE_DIR, 'extracted_names.sqlite3')
+
+
+class CachedLookup:
+    """
+    按过滤词签名查询和记录提取结果：先查内存缓存 cache，再查磁盘缓存 store，并统计命中次数
+    """
+
+    def __init__(self, filter_words, cache=None, store=None):
+        self.signature = filter_signature(filter_words)
+        self.cache = cache if cache is not None else ExtractionCache()
+        self.store = store
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, filenames):
+        """
+        查询一批文件名，返回 ({文件名: 姓名}, 未命中的文件名列表（已去重）)
+        """
+        cache = self.cache
+        found = {}
+        missing = []
+        for filename in filenames:
+            if filename in found:
+                continue
+            name = cache.get(filename)
+            if name is None:
+                found[filename] = None
+                missing.append(filename)
+            else:
+                found[filename] = name
+
+        if missing and self.store is not None:
+            stored = self.store.get_many(self.signature, missing)
+            for filename, name in stored.items():
+                found[filename] = name
+                cache.put(filename, name)
+            missing = [filename for filename in missing if filename not in stored]
+
+        missing_set = set(missing)
+        misses = sum(1 for filename in filenames if filename in missing_set)
+        self.misses += misses
+        self.hits += len(filenames) - misses
+        return found, missing
+
+    def record(self, items):
+        """记录新提取的 (文件名, 姓名)"""
+        items = list(items)
+        for filename, name in items:
+            self.cache.put(filename, name)
+        if self.store is not None and items:
+            self.store.put_many(self.signature, items)
+
+
+def _file_identity(stat_result):
+    """文件标识：重命名或移动（同一文件系统内）后 inode、大小和修改时间都不变"""
+    return stat_result.st_ino, stat_result.st_size, stat_result.st_mtime_ns
+
+
+def _rename_key(identity):
+    """匹配重命名用的键：有些文件系统（如 Windows 上的 FAT、网络驱动器）取不到 inode，st_ino 为 0，只比较大小和修改时间"""
+    return identity[1:] if identity[0] == 0 else identity
+
+
+def _mtime_or_none(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+class FolderSnapshot:
+    """
+    文件夹快照，用于监视文件夹中的变化
+
+    保存每个子文件夹的修改时间和其中的文件（文件名及标识）。在子文件夹中新建、删除或重命名文件都会改变
+    该文件夹的修改时间，所以每次检查只需要对每个子文件夹调用一次 stat，只重新读取修改时间变化的子文件夹。
+    删除和新增的文件标识相同时认为是重命名（或移动），取不到 inode 时按大小和修改时间匹配
+    """
+
+    def __init__(self, root, include=(), exclude=DEFAULT_EXCLUDE_PATTERNS, recursive=True,
+                 workers=DEFAULT_SCAN_WORKERS):
+        self.root = root
+        self.recursive = recursive
+        self.workers = workers
+        self._include_match = compile_globs(include)
+        self._exclude_match = compile_globs(exclude)
+        # 子文件夹相对路径（根文件夹为 ''）-> (修改时间, {文件名: 文件标识}, 子文件夹名元组)
+        self._directories = {}
+        self.file_count = 0
+
+    def __len__(self):
+        return self.file_count
+
+    def _path(self, relative):
+        return os.path.join(self.root, relative) if relative else self.root
+
+    def _read_directory(self, relative):
+        """读取一个子文件夹，返回 (修改时间, {文件名: 文件标识}, 子文件夹名元组)"""
+        path = self._path(relative)
+        # 先取修改时间再读取，读取过程中的改动会在下次检查时发现
+        mtime = os.stat(path).st_mtime_ns
+        files = {}
+        subdirectories = []
+        include_match = self._include_match
+        exclude_match = self._exclude_match
+        with os.scandir(path) as entries:
+            for entry in entries:
+                name = entry.name
+                if exclude_match is not None and exclude_match(name):
+                    continue
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if self.recursive:
+                            subdirectories.append(name)
+                    elif entry.is_file() and (include_match is None or include_match(name)):
+                        files[name] = _file_identity(entry.stat())
+                except OSError:
+                    continue
+        if time.time_ns() - mtime < RACY_MTIME_NS:
+            mtime = None
+        return mtime, files, tuple(subdirectories)
+
+    def _drop(self, relative, removed):
+        """从快照中删除一个子文件夹及其下所有内容，删除的文件记入 removed"""
+        prefix = os.path.join(relative, '')
+        for directory in [directory for directory in self._directories
+                          if directory == relative or directory.startswith(prefix)]:
+            _, files, _ = self._directories.pop(directory)
+            for name, identity in files.items():
+                removed[os.path.join(directory, name) if directory else name] = identity
+
+    def refresh(self, should_cancel=None):
+        """
+        检查文件夹的变化并更新快照，返回 (新增的文件, 删除的文件, 重命名的 [(原路径, 新路径)])，
+        路径均相对于 root；第一次调用时所有文件都算新增。root 无法访问时抛出 OSError
+        """
+        added = {}
+        removed = {}
+        pending = {}
+        pool = ThreadPoolExecutor(max_workers=max(1, self.workers))
+        try:
+            if self._directories:
+                # 检查所有已知子文件夹的修改时间，不存在的子文件夹直接删除
+                known = list(self._directories)
+                changed = []
+                for relative, mtime in zip(known, pool.map(_mtime_or_none, map(self._path, known))):
+                    if relative not in self._directories:
+                        continue
+                    if mtime is None:
+                        if not relative:
+                            raise FileNotFoundError(f"文件夹不存在: {self.root}")
+                        self._drop(relative, removed)
+                    elif mtime != self._directories[relative][0]:
+                        changed.append(relative)
+            else:
+                changed = ['']
+
+            for relative in changed:
+                pending[pool.submit(self._read_directory, relative)] = relative
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    relative = pending.pop(future)
+                    try:
+                        mtime, files, subdirectories = future.result()
+                    except OSError:
+                        if not relative:
+                            raise
+                        self._drop(relative, removed)
+                        continue
+
+                    old_mtime, old_files, old_subdirectories = self._directories.get(relative, (None, {}, ()))
+                    for name, identity in files.items():
+                        if name not in old_files:
+                            added[os.path.join(relative, name) if relative else name] = identity
+                    for name, identity in old_files.items():
+                        if name not in files:
+                            removed[os.path.join(relative, name) if relative else name] = identity
+                    self._directories[relative] = (mtime, files, subdirectories)
+
+                    # 新出现的子文件夹整个读取，消失的子文件夹整个删除
+                    current = set(subdirectories)
+                    for name in old_subdirectories:
+                        if name not in current:
+                            self._drop(os.path.join(relative, name) if relative else name, removed)
+                    previous = set(old_subdirectories)
+                    for name in subdirectories:
+                        if name not in previous:
+                            child = os.path.join(relative, name) if relative else name
+                            pending[pool.submit(self._read_directory, child)] = child
+                if should_cancel is not None and should_cancel():
+                    break
+        finally:
+            for future in pending:
+                future.cancel()
+            pool.shutdown(wait=True)
+
+        # 标识唯一对应的删除和新增文件认为是重命名
+        renamed = []
+        if added and removed:
+            by_identity = {}
+            for path, identity in removed.items():
+                key = _rename_key(identity)
+                by_identity[key] = None if key in by_identity else path
+            for path, identity in list(added.items()):
+                old_path = by_identity.pop(_rename_key(identity), None)
+                if old_path is not None:
+                    renamed.append((old_path, path))
+                    del added[path]
+                    del removed[old_path]
+
+        self.file_count += len(added) - len(removed)
+        return sorted(added), sorted(removed), renamed
+
+
+def iter_paths_from_lines(lines):
+    """逐行读取文件路径（如 find 的输出），跳过空行"""
+    for line in lines:
+        path = line.rstrip('\r\n')
+        if path:
+            yield path
+
+
+def iter_batches(items, batch_size=EXTRACT_CHUNK_SIZE):
+    """把逐个给出的项分成列表，每批 batch_size 个"""
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def iter_timed(items, profiler, stage):
+    """逐个产出 items 中的元素，把取出每个元素的耗时（如惰性扫描文件夹）计入 profiler 的阶段"""
+    items = iter(items)
+    while True:
+        start = profiler.clock()
+        item = next(items, None)
+        if item is None:
+            return
+        profiler.lap(stage, start)
+        yield item
+
+
+def iter_extractions(path_batches, filter_words=(), workers=None, lookup=None, profiler=None):
+    """
+    对逐批给出的文件路径提取姓名（只看文件名本身），按输入顺序逐个产出 (路径, 姓名)
+    """
+    for paths, names in extract_chunks(path_batches, filter_words, workers, lookup=lookup, key=os.path.basename,
+                                       profiler=profiler):
+        yield from zip(paths, names)
+
+
+def extraction_record(path, name):
+    """命令行输出的一条结果"""
+    return {'path': path, 'name': name, 'status': STATUS_OK if name else STATUS_NOT_FOUND}
+
+
+class ExtractionResults:
+    """
+    提取结果的紧凑存储
+
+    文件路径和姓名保存在两个平行列表中（未找到姓名时为空字符串），状态由姓名是否为空得出，
+    不为每行创建额外的对象；界面的表格模型、复制和导出都直接读取这里。
+    追加、重命名和删除时同步维护倒排索引 姓名 -> 行号列表（未找到姓名的文件在空字符串下），
+    按姓名查找为一次字典查询
+    """
+
+    # 导出为 CSV 时的表头
+    CSV_HEADERS = ("文件名", "提取的姓名", "状态")
+
+    def __init__(self):
+        self.paths = []
+        self.names = []
+        self._rows = None  # 文件路径 -> 行号，只在按路径更新时按需建立
+        self._by_name = {}  # 姓名 -> 行号列表
+
+    def __len__(self):
+        return len(self.paths)
+
+    def clear(self):
+        self.paths = []
+        self.names = []
+        self._rows = None
+        self._by_name = {}
+
+    def extend(self, paths, names):
+        """追加一批结果，paths 与 names 一一对应"""
+        first = len(self.paths)
+        if self._rows is not None:
+            self._rows.update((path, first + offset) for offset, path in enumerate(paths))
+        by_name = self._by_name
+        for row, name in enumerate(names, first):
+            rows = by_name.get(name)
+            if rows is None:
+                by_name[name] = [row]
+            else:
+                rows.append(row)
+        self.paths.extend(paths)
+        self.names.extend(names)
+
+    def path_at(self, row):
+        return self.paths[row]
+
+    def name_at(self, row):
+        return self.names[row]
+
+    def row_of(self, path):
+        """文件所在的行，不存在时返回 None"""
+        if self._rows is None:
+            self._rows = {path: row for row, path in enumerate(self.paths)}
+        return self._rows.get(path)
+
+    def rename(self, old_path, new_path, name):
+        """文件重命名后原地更新它所在的行，返回行号"""
+        row = self.row_of(old_path)
+        del self._rows[old_path]
+        self._rows[new_path] = row
+        self.paths[row] = new_path
+        old_name = self.names[row]
+        if name != old_name:
+            self._unindex(old_name, row)
+            self._by_name.setdefault(name, []).append(row)
+            self.names[row] = name
+        return row
+
+    def remove(self, path):
+        """
+        删除一个文件的结果：用最后一行填补空位，不移动中间的行
+        返回 (被删除的行, 移入该行的原行号)，删除的就是最后一行时原行号为 None
+        """
+        row = self.row_of(path)
+        del self._rows[path]
+        self._unindex(self.names[row], row)
+        last = len(self.paths) - 1
+        moved_from = None
+        if row != last:
+            moved = self.paths[last]
+            moved_name = self.names[last]
+            self.paths[row] = moved
+            self.names[row] = moved_name
+            self._rows[moved] = row
+            rows = self._by_name[moved_name]
+            rows[rows.index(last)] = row
+            moved_from = last
+        self.paths.pop()
+        self.names.pop()
+        return row, moved_from
+
+    def _unindex(self, name, row):
+        rows = self._by_name[name]
+        rows.remove(row)
+        if not rows:
+            del self._by_name[name]
+
+    def rows_for(self, name):
+        """提取出该姓名的所有文件所在的行（name 为空字符串时为未找到姓名的文件）"""
+        return list(self._by_name.get(name, ()))
+
+    def paths_for(self, name):
+        """提取出该姓名的所有文件"""
+        paths = self.paths
+        return [paths[row] for row in self._by_name.get(name, ())]
+
+    def count_of(self, name):
+        return len(self._by_name.get(name, ()))
+
+    def name_counts(self, min_count=1):
+        """
+        每个姓名对应的文件数量 [(姓名, 文件数), ...]，按文件数从多到少、再按姓名排序；
+        min_count 为2时只列出出现在多个文件中的姓名
+        """
+        counts = [(name, len(rows)) for name, rows in self._by_name.items() if name and len(rows) >= min_count]
+        counts.sort(key=lambda item: (-item[1], item[0]))
+        return counts
+
+    def distinct_name_count(self):
+        """不同姓名的数量（不含未找到姓名的文件）"""
+        return len(self._by_name) - ('' in self._by_name)
+
+    def found_names(self):
+        """所有成功提取的姓名（按行顺序，不去重）"""
+        return [name for name in self.names if name]
+
+    def found_count(self):
+        return len(self.names) - self.count_of('')
+
+    def export(self, path):
+        """
+        导出全部结果：.jsonl 文件每行一个 JSON（与命令行输出相同），其他按 CSV（UTF-8 带 BOM，Excel 可直接打开）
+        """
+        if path.lower().endswith('.jsonl'):
+            with open(path, 'w', encoding='utf-8') as f:
+                for file_path, name in zip(self.paths, self.names):
+                    f.write(json.dumps(extraction_record(file_path, name), ensure_ascii=False))
+                    f.write('\n')
+            return
+        with open(path, 'w', encoding='utf-8-sig', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(self.CSV_HEADERS)
+            writer.writerows((file_path, name, "成功" if name else "失败")
+                             for file_path, name in zip(self.paths, self.names))
+
+
+def main(argv=None):
+    """
+    命令行入口：扫描文件夹（或从标准输入逐行读取路径），每个文件输出一行 JSON（path, name, status）
+
+    路径和结果都是逐批处理的，输出可以直接接到其他命令的管道中，内存占用不随文件数量增长
+    """
+    # 打包为 exe 后，进程池的子进程需要在这里接管，而不是重新运行命令行
+    multiprocessing.freeze_support()
+    parser = argparse.ArgumentParser(description='从文件名中提取姓名，以 JSON Lines 输出')
+    parser.add_argument('source', nargs='?', default='-',
+                        help='要扫描的文件夹；省略或为 - 时从标准输入逐行读取文件路径')
+    parser.add_argument('--filters', default='', help='逗号分隔的过滤词，如 report,data')
+    parser.add_argument('--include', default='', help='文件夹扫描时包含的文件名通配符，逗号分隔（默认全部）')
+    parser.add_argument('--exclude', default=','.join(DEFAULT_EXCLUDE_PATTERNS),
+                        help='文件夹扫描时排除的文件或文件夹通配符，逗号分隔')
+    parser.add_argument('--no-recursive', action='store_true', help='不扫描子文件夹')
+    parser.add_argument('--workers', type=int, default=None, help='提取进程数（默认CPU核数，1表示不使用进程池）')
+    parser.add_argument('--batch-size', type=int, default=EXTRACT_CHUNK_SIZE, help='每批处理的文件数量')
+    parser.add_argument('--cache', default=None, help='提取结果磁盘缓存文件（SQLite），重复运行时跳过已处理的文件名')
+    parser.add_argument('--profile', default=None,
+                        help='把各阶段耗时和各条提取规则的文件数写入该 JSON 文件（分析时不使用进程池）')
+    args = parser.parse_args(argv)
+
+    if args.batch_size < 1:
+        parser.error('--batch-size 必须大于0')
+    filter_words = parse_filter_words(args.filters)
+
+    if args.source == '-':
+        path_batches = iter_batches(iter_paths_from_lines(sys.stdin), args.batch_size)
+    else:
+        if not os.path.isdir(args.source):
+            parser.error(f'文件夹不存在: {args.source}')
+        root = args.source
+        scanned = scan_directory(root, parse_glob_patterns(args.include), parse_glob_patterns(args.exclude),
+                                 not args.no_recursive, batch_size=args.batch_size)
+        path_batches = ([os.path.join(root, path) for path in batch] for batch in scanned)
+
+    profiler = StageProfiler() if args.profile else None
+    if profiler is not None:
+        path_batches = iter_timed(path_batches, profiler, 'scan' if args.source != '-' else 'read')
+    store = ExtractionStore(args.cache) if args.cache else None
+    lookup = CachedLookup(filter_words, store=store) if store is not None else None
+    out = sys.stdout
+    try:
+        for path, name in iter_extractions(path_batches, filter_words, args.workers, lookup, profiler):
+            out.write(json.dumps(extraction_record(path, name), ensure_ascii=False))
+            out.write('\n')
+        out.flush()
+    except BrokenPipeError:
+        # 下游命令（如 head）提前退出时不再输出，也不打印错误
+        os.dup2(os.open(os.devnull, os.O_WRONLY), out.fileno())
+        sys.exit(1)
+    finally:
+        if store is not None:
+            store.close()
+    if profiler is not None:
+        profiler.export(args.profile)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+表格视图的公用函数（姓名比较工具和文件名姓名提取工具共用）
+"""
+
+
+def resize_columns_to_visible_rows(view):
+    """
+    只根据 view（QTableView）当前可见的行调整列宽，避免遍历全部结果
+    """
+    model = view.model()
+    row_count = model.rowCount()
+    if row_count == 0:
+        return
+
+    first = max(view.rowAt(0), 0)
+    last = view.rowAt(view.viewport().height() - 1)
+    if last < 0:
+        # 视口尚未布局或行数不足一屏时，按一屏的行数估算
+        rows_per_page = max(view.viewport().height() // max(view.rowHeight(first), 1), 1)
+        last = min(row_count, first + rows_per_page) - 1
+
+    metrics = view.fontMetrics()
+    header = view.horizontalHeader()
+    padding = 2 * view.style().pixelMetric(view.style().PM_FocusFrameHMargin) + 12
+    for column in range(model.columnCount()):
+        width = header.sectionSizeHint(column)
+        for row in range(first, last + 1):
+            text = model.data(model.index(row, column))
+            width = max(width, metrics.horizontalAdvance(text) + padding)
+        view.setColumnWidth(column, width)
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+按签名区分的键值磁盘缓存（SQLite），供姓名比较的规范化键缓存和文件名提取结果缓存共用
+签名代表生成结果的规则（规范化步骤、过滤词等），规则变化后旧签名下的结果不再命中；
+保存的条数超过上限时先删除其他签名的结果，仍然超过时清空
+"""
+
+import sqlite3
+
+
+class SignatureStore:
+    """
+    表中每行为 (签名, 键, 值)，子类通过 TABLE、KEY_COLUMN、VALUE_COLUMN 指定表名和列名
+    """
+
+    TABLE = None
+    KEY_COLUMN = None
+    VALUE_COLUMN = None
+    # 单条 SQL 中最多查询的键数量
+    BATCH_SIZE = 500
+
+    def __init__(self, path, max_entries):
+        self.path = path
+        self.max_entries = max_entries
+        self._conn = sqlite3.connect(path)
+        self._conn.execute(f'CREATE TABLE IF NOT EXISTS {self.TABLE} ('
+                           f'signature TEXT NOT NULL, {self.KEY_COLUMN} TEXT NOT NULL, '
+                           f'{self.VALUE_COLUMN} TEXT NOT NULL, '
+                           f'PRIMARY KEY (signature, {self.KEY_COLUMN})) WITHOUT ROWID')
+        # 写入的条数只在超过上限时才重新统计，INSERT OR REPLACE 覆盖已有的键时会多计
+        self._count = self._count_entries()
+
+    def get_many(self, signature, keys):
+        """
+        批量查询，返回 {键: 值}
+        """
+        result = {}
+        keys = list(keys)
+        for start in range(0, len(keys), self.BATCH_SIZE):
+            batch = keys[start:start + self.BATCH_SIZE]
+            placeholders = ','.join('?' * len(batch))
+            rows = self._conn.execute(
+                f'SELECT {self.KEY_COLUMN}, {self.VALUE_COLUMN} FROM {self.TABLE} '
+                f'WHERE signature = ? AND {self.KEY_COLUMN} IN ({placeholders})',
+                [signature] + batch)
+            result.update(rows)
+        return result
+
+    def put_many(self, signature, items):
+        """
+        批量写入 (键, 值)
+        """
+        items = list(items)
+        with self._conn:
+            self._conn.executemany(
+                f'INSERT OR REPLACE INTO {self.TABLE} (signature, {self.KEY_COLUMN}, {self.VALUE_COLUMN}) '
+                f'VALUES (?, ?, ?)',
+                ((signature, key, value) for key, value in items))
+        self._count += len(items)
+        if self._count > self.max_entries:
+            self._trim(signature)
+
+    def _count_entries(self):
+        return self._conn.execute(f'SELECT COUNT(*) FROM {self.TABLE}').fetchone()[0]
+
+    def _trim(self, signature):
+        """
+        超过上限时先删除其他签名的结果，仍然超过时清空
+        """
+        self._count = self._count_entries()
+        if self._count <= self.max_entries:
+            return
+        with self._conn:
+            self._conn.execute(f'DELETE FROM {self.TABLE} WHERE signature != ?', (signature,))
+        self._count = self._count_entries()
+        if self._count > self.max_entries:
+            self.clear()
+        else:
+            self._conn.execute('VACUUM')
+
+    def clear(self):
+        """清空缓存并释放磁盘空间"""
+        with self._conn:
+            self._conn.execute(f'DELETE FROM {self.TABLE}')
+        self._conn.execute('VACUUM')
+        self._count = 0
+
+    def close(self):
+        self._conn.close()
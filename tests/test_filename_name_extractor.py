@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+
+"""
+filename_name_extractor 结果表格模型的测试（需要 PyQt5）
+"""
+
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+try:
+    from PyQt5.QtWidgets import QApplication
+    from PyQt5.QtTest import QAbstractItemModelTester
+except ImportError:
+    QApplication = None
+
+if QApplication is not None:
+    from filename_name_extractor import ExtractionResultModel, FolderWatcher
+
+
+@unittest.skipIf(QApplication is None, '需要安装 PyQt5')
+class ExtractionResultModelRemoveTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication([])
+
+    def setUp(self):
+        self.model = ExtractionResultModel()
+        self.tester = QAbstractItemModelTester(self.model, QAbstractItemModelTester.FailureReportingMode.Fatal)
+        self.model.append_results(['a/张三.pdf', 'b/李四.pdf', 'c/王五.pdf', 'd/报告.pdf'],
+                                  ['张三', '李四', '王五', ''])
+        self.events = []
+        self.model.rowsAboutToBeRemoved.connect(
+            lambda parent, first, last: self.events.append(('about', first, self.model.rowCount())))
+        self.model.rowsRemoved.connect(
+            lambda parent, first, last: self.events.append(('removed', first, self.model.rowCount())))
+        self.model.dataChanged.connect(
+            lambda top_left, bottom_right: self.events.append(('changed', top_left.row(), self.model.rowCount())))
+
+    def paths(self):
+        return [self.model.data(self.model.index(row, 0)) for row in range(self.model.rowCount())]
+
+    def test_remove_middle_row(self):
+        self.model.remove('b/李四.pdf')
+        # 通知删除时行数还没有变化，删除后最后一行移入空位
+        self.assertEqual(self.events, [('about', 3, 4), ('removed', 3, 3), ('changed', 1, 3)])
+        self.assertEqual(self.paths(), ['a/张三.pdf', 'd/报告.pdf', 'c/王五.pdf'])
+
+    def test_remove_last_row(self):
+        self.model.remove('d/报告.pdf')
+        self.assertEqual(self.events, [('about', 3, 4), ('removed', 3, 3)])
+        self.assertEqual(self.paths(), ['a/张三.pdf', 'b/李四.pdf', 'c/王五.pdf'])
+
+    def test_remove_while_filtered(self):
+        self.model.set_filter_name('张三')
+        self.model.remove('a/张三.pdf')
+        self.assertEqual(self.model.rowCount(), 0)
+        self.model.set_filter_name(None)
+        self.assertEqual(sorted(self.paths()), ['b/李四.pdf', 'c/王五.pdf', 'd/报告.pdf'])
+
+    def test_remove_unknown_path(self):
+        self.model.remove('x/不存在.pdf')
+        self.assertEqual(self.events, [])
+        self.assertEqual(self.model.rowCount(), 4)
+
+
+class ScriptedWake:
+    """代替 FolderWatcher 的等待事件：每次等待时执行下一步文件操作，步骤用完后停止监视"""
+
+    def __init__(self, watcher, steps):
+        self.watcher = watcher
+        self.steps = list(steps)
+
+    def clear(self):
+        pass
+
+    def set(self):
+        pass
+
+    def wait(self, timeout=None):
+        if self.steps:
+            self.steps.pop(0)()
+        else:
+            self.watcher.cancel()
+
+
+@unittest.skipIf(QApplication is None, '需要安装 PyQt5')
+class FolderWatcherTest(unittest.TestCase):
+    """监视线程按检查发出删除、重命名（附新姓名）和新增（附姓名）的文件"""
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp(prefix='test_folder_watcher_')
+        with open(os.path.join(self.root, '张三.pdf'), 'w') as f:
+            f.write('a')
+
+    def tearDown(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def path(self, name):
+        return os.path.join(self.root, name)
+
+    def write(self, name, content):
+        with open(self.path(name), 'w') as f:
+            f.write(content)
+
+    def test_changes(self):
+        watcher = FolderWatcher(self.root, (), ('*.py',), True, 0, ['报告'])
+        watcher._wake = ScriptedWake(watcher, [
+            lambda: self.write('李四报告.pdf', 'bb'),
+            lambda: self.write('李四报告.pdf', 'changed'),
+            lambda: os.rename(self.path('张三.pdf'), self.path('王五.pdf')),
+            lambda: os.remove(self.path('李四报告.pdf')),
+        ])
+        changes = []
+        errors = []
+        watcher.changes_ready.connect(lambda removed, renamed, added: changes.append((removed, renamed, added)))
+        watcher.error_occurred.connect(errors.append)
+        # 在当前线程中运行，信号直接调用上面的函数
+        watcher.run()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(changes, [
+            ([], [], [('张三.pdf', '张三')]),
+            ([], [], [('李四报告.pdf', '李四')]),
+            ([], [('张三.pdf', '王五.pdf', '王五')], []),
+            (['李四报告.pdf'], [], []),
+        ])
+
+    def test_missing_folder_reports_error(self):
+        watcher = FolderWatcher(self.root, (), (), True, 0, [])
+        watcher._wake = ScriptedWake(watcher, [lambda: shutil.rmtree(self.root)])
+        errors = []
+        watcher.error_occurred.connect(errors.append)
+        watcher.run()
+        self.assertEqual(len(errors), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,192 @@
+# -*- coding: utf-8 -*-
+
+"""
+image_resize_engine 的测试（需要 Pillow）
+"""
+
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+if Image is not None:
+    import image_resize_engine
+    from image_resize_engine import (ResizeManifest, MANIFEST_NAME, REDUCE_MODES, decode_scaled, process_image,
+                                     process_images, resize_params)
+
+
+@unittest.skipIf(Image is None, '需要安装 Pillow')
+class ResizeManifestTest(unittest.TestCase):
+    """增量处理清单：未变化的文件跳过，参数或内容变化时重新处理，清单损坏或写入中断时不影响结果"""
+
+    def setUp(self):
+        self.work_dir = tempfile.mkdtemp(prefix='test_resize_manifest_')
+        self.source_dir = os.path.join(self.work_dir, 'source')
+        self.output_dir = os.path.join(self.work_dir, 'output')
+        os.makedirs(self.source_dir)
+        os.makedirs(self.output_dir)
+        self.images = []
+        for index, color in enumerate(['red', 'green']):
+            path = os.path.join(self.source_dir, f'image{index}.png')
+            # 不压缩，同样尺寸的图片文件大小相同
+            Image.new('RGB', (64, 48), color).save(path, compress_level=0)
+            self.images.append(path)
+
+    def tearDown(self):
+        shutil.rmtree(self.work_dir, ignore_errors=True)
+
+    def run_batch(self, quality=90):
+        """按清单处理一次，返回 (处理的文件, 跳过的文件)"""
+        manifest = ResizeManifest.load(self.output_dir)
+        params = resize_params(32, 32, quality, 'jpg', False)
+        pending, skipped = manifest.plan(self.images, params)
+        results = list(process_images(pending, self.output_dir, 32, 32, quality, 'jpg', False, workers=1,
+                                      manifest=manifest))
+        self.assertEqual([error for _, _, error in results], [None] * len(pending))
+        manifest.save()
+        return pending, skipped
+
+    def read_manifest(self):
+        with open(os.path.join(self.output_dir, MANIFEST_NAME), 'rb') as f:
+            return f.read()
+
+    def test_unchanged_rerun_skips(self):
+        self.assertEqual(self.run_batch(), (self.images, []))
+        self.assertEqual(self.run_batch(), ([], self.images))
+
+    def test_changed_params_reprocess(self):
+        self.run_batch(quality=90)
+        self.assertEqual(self.run_batch(quality=80), (self.images, []))
+        self.assertEqual(self.run_batch(quality=80), ([], self.images))
+
+    def test_touched_file_with_same_content_skips(self):
+        self.run_batch()
+        stat = os.stat(self.images[0])
+        touched = stat.st_mtime_ns + 5 * 10 ** 9
+        os.utime(self.images[0], ns=(stat.st_atime_ns, touched))
+        self.assertEqual(self.run_batch(), ([], self.images))
+        # 新的修改时间记入清单，下次不必再计算哈希
+        entry = ResizeManifest.load(self.output_dir).entries[ResizeManifest.key(self.images[0])]
+        self.assertEqual(entry['mtime_ns'], touched)
+
+    def test_changed_content_reprocess(self):
+        self.run_batch()
+        # 大小不变、内容不同
+        Image.new('RGB', (64, 48), 'blue').save(self.images[0], compress_level=0)
+        self.assertEqual(os.path.getsize(self.images[0]), os.path.getsize(self.images[1]))
+        self.assertEqual(self.run_batch(), ([self.images[0]], [self.images[1]]))
+
+    def test_missing_output_reprocess(self):
+        self.run_batch()
+        os.remove(os.path.join(self.output_dir, 'image1.jpg'))
+        self.assertEqual(self.run_batch(), ([self.images[1]], [self.images[0]]))
+
+    def test_corrupt_manifest_rebuilds(self):
+        self.run_batch()
+        with open(os.path.join(self.output_dir, MANIFEST_NAME), 'w', encoding='utf-8') as f:
+            f.write('{"version": 1, "files": {')
+        self.assertEqual(ResizeManifest.load(self.output_dir).entries, {})
+        self.assertEqual(self.run_batch(), (self.images, []))
+        self.assertEqual(self.run_batch(), ([], self.images))
+
+    def test_crash_while_saving_keeps_old_manifest(self):
+        self.run_batch()
+        old = self.read_manifest()
+
+        def interrupted_dump(data, f, **kwargs):
+            f.write('{"version": 1, "files": {')
+            raise KeyboardInterrupt
+
+        manifest = ResizeManifest.load(self.output_dir)
+        manifest.entries.clear()
+        with mock.patch.object(image_resize_engine.json, 'dump', interrupted_dump):
+            with self.assertRaises(KeyboardInterrupt):
+                manifest.save()
+        self.assertEqual(self.read_manifest(), old)
+        self.assertEqual(sorted(os.listdir(self.output_dir)), [MANIFEST_NAME, 'image0.jpg', 'image1.jpg'])
+        self.assertEqual(self.run_batch(), ([], self.images))
+
+
+@unittest.skipIf(Image is None, '需要安装 Pillow')
+class DecodeScaledTest(unittest.TestCase):
+    """快速解码缩小到不小于目标尺寸，不能缩小的模式保持完整解码，快速解码出错时按普通方式处理"""
+
+    TARGET = (200, 150)
+
+    def setUp(self):
+        self.work_dir = tempfile.mkdtemp(prefix='test_decode_scaled_')
+
+    def tearDown(self):
+        shutil.rmtree(self.work_dir, ignore_errors=True)
+
+    def save(self, img, name, **kwargs):
+        path = os.path.join(self.work_dir, name)
+        img.save(path, **kwargs)
+        return path
+
+    def decoded_size(self, path):
+        with Image.open(path) as img:
+            scaled = decode_scaled(img, self.TARGET)
+            scaled.load()
+            return scaled.mode, scaled.size
+
+    def assert_reduced(self, size, original):
+        """缩小后不小于目标尺寸，且没有多余的 2 倍以上"""
+        self.assertLess(size[0], original[0])
+        self.assertGreaterEqual(size[0], self.TARGET[0])
+        self.assertGreaterEqual(size[1], self.TARGET[1])
+        self.assertLess(min(size[0] // self.TARGET[0], size[1] // self.TARGET[1]), 2)
+
+    def test_large_jpeg(self):
+        original = (4000, 3000)
+        path = self.save(Image.linear_gradient('L').convert('RGB').resize(original), 'large.jpg', quality=90)
+        mode, size = self.decoded_size(path)
+        self.assertEqual(mode, 'RGB')
+        self.assert_reduced(size, original)
+
+    def test_la_png(self):
+        original = (1700, 1300)
+        path = self.save(Image.new('LA', original, (128, 200)), 'gray_alpha.png')
+        mode, size = self.decoded_size(path)
+        self.assertIn(mode, REDUCE_MODES)
+        self.assertEqual(mode, 'LA')
+        self.assert_reduced(size, original)
+
+    def test_palette_png_keeps_full_decode(self):
+        original = (1700, 1300)
+        path = self.save(Image.new('RGB', original, 'red').convert('P'), 'palette.png')
+        self.assertEqual(self.decoded_size(path), ('P', original))
+
+    def test_process_image_output_size(self):
+        paths = [self.save(Image.new('RGB', (4000, 3000), 'red'), 'large.jpg'),
+                 self.save(Image.new('LA', (1700, 1300), (128, 200)), 'gray_alpha.png'),
+                 self.save(Image.new('RGB', (1700, 1300), 'red').convert('P'), 'palette.png')]
+        for path in paths:
+            for force_stretch in (False, True):
+                with self.subTest(path=os.path.basename(path), force_stretch=force_stretch):
+                    output = process_image(path, self.work_dir, *self.TARGET, 85, 'jpg', force_stretch,
+                                           fast_decode=True)
+                    with Image.open(output) as img:
+                        self.assertEqual(img.size, self.TARGET)
+
+    def test_fast_decode_failure_falls_back(self):
+        path = self.save(Image.new('RGB', (1600, 1200), 'red'), 'large.png')
+        with mock.patch.object(image_resize_engine, 'decode_scaled', side_effect=OSError('broken')) as decode:
+            output = process_image(path, self.work_dir, *self.TARGET, 85, 'png', False, fast_decode=True)
+        decode.assert_called_once()
+        with Image.open(output) as img:
+            self.assertEqual(img.size, self.TARGET)
+            self.assertEqual(img.getpixel((100, 75)), (255, 0, 0))
+
+
+if __name__ == '__main__':
+    unittest.main()
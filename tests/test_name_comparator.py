@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+
+"""
+name_comparator 结果表格模型的测试（需要 PyQt5）
+"""
+
+import os
+import sys
+import random
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+try:
+    from PyQt5.QtCore import Qt
+    from PyQt5.QtWidgets import QApplication
+except ImportError:
+    QApplication = None
+
+if QApplication is not None:
+    from name_comparator import NameResultModel, CompareWorker
+
+
+@unittest.skipIf(QApplication is None, '需要安装 PyQt5')
+class NameResultModelSortTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication([])
+
+    def setUp(self):
+        self.model = NameResultModel()
+        # 两列：两个唯一、次数不同、列内重复、近似
+        self.model.append_results(['王五', '张三', '李四', '赵六', '钱七'],
+                                  [0b01, 0b10, 0b11, 0b11, 0b01],
+                                  ['', '', '', '', '张山'],
+                                  [0.0, 0.0, 0.0, 0.0, 0.8],
+                                  [1, 0, 0, 2, 1, 3, 2, 2, 1, 0])
+        self.model.finish_results()
+
+    def column_values(self, column):
+        store = self.model.store
+        accessors = [store.name_at, store.mask_at, store.status_at, store.match_at, store.score_at,
+                     lambda row: max(store.counts_at(row)) - min(store.counts_at(row))]
+        return [accessors[column](row) for row in range(self.model.rowCount())]
+
+    def test_sort_by_every_column(self):
+        for column in range(self.model.columnCount()):
+            for order in (Qt.AscendingOrder, Qt.DescendingOrder):
+                with self.subTest(column=self.model.HEADERS[column], order=order):
+                    self.model.sort(column, order)
+                    values = self.column_values(column)
+                    expected = sorted(values, reverse=(order == Qt.DescendingOrder))
+                    self.assertEqual(values, expected)
+
+    def test_status_sort_matches_labels(self):
+        self.model.sort(2)
+        labels = [self.model.data(self.model.index(row, 2)) for row in range(self.model.rowCount())]
+        self.assertEqual(labels, ['唯一', '唯一', '次数不同', '列内重复', '近似'])
+
+
+@unittest.skipIf(QApplication is None, '需要安装 PyQt5')
+class NameResultModelLiveTest(unittest.TestCase):
+    """逐行增量更新的视图与整体重新排序的结果一致"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication([])
+
+    def check_random_changes(self, column, order, filter_text=''):
+        rng = random.Random(column * 10 + order)
+        model = NameResultModel()
+        model.sort(column, order)
+        model.set_filter(filter_text)
+        model.apply_changes([], [(f'姓名{i}', rng.randint(1, 7), None) for i in range(200)])
+        inserted = []
+        model.rowsInserted.connect(lambda parent, first, last: inserted.append(first))
+        for _ in range(20):
+            removed = [f'姓名{rng.randrange(250)}' for _ in range(5)]
+            updated = [(f'姓名{rng.randrange(250)}', rng.randint(1, 7), None) for _ in range(5)]
+            model.apply_changes(removed, updated)
+        self.assertTrue(inserted)
+        store = model.store
+        rows = [store.name_at(row) for row in range(model.rowCount())]
+        store.refresh()
+        self.assertEqual(rows, [store.name_at(row) for row in range(model.rowCount())])
+
+    def test_incremental_changes_keep_sort_order(self):
+        for column in (0, 1, 2):
+            for order in (Qt.AscendingOrder, Qt.DescendingOrder):
+                with self.subTest(column=column, order=order):
+                    self.check_random_changes(column, order)
+
+    def test_incremental_changes_with_filter(self):
+        self.check_random_changes(1, Qt.AscendingOrder, '1')
+
+
+@unittest.skipIf(QApplication is None, '需要安装 PyQt5')
+class CompareWorkerTest(unittest.TestCase):
+    """读完输入后按批次发送结果，取消时不发送剩余结果"""
+
+    def run_worker(self, worker):
+        batches = []
+        finished = []
+        worker.results_ready.connect(lambda names, masks, matches, scores, counts: batches.append((names, masks)))
+        worker.comparison_finished.connect(finished.append)
+        # 在当前线程中运行，信号直接调用上面的函数
+        worker.run()
+        return batches, finished
+
+    def test_results_sent_in_batches(self):
+        first = '\n'.join(f'甲{index}' for index in range(50))
+        second = '\n'.join(f'甲{index}' for index in range(0, 50, 2)) + '\n乙'
+        worker = CompareWorker([first, second])
+        worker.CHUNK_SIZE = 10
+        worker.CHUNK_INTERVAL = float('inf')
+        batches, finished = self.run_worker(worker)
+        self.assertEqual(finished, [False])
+        self.assertEqual([len(names) for names, _ in batches], [10, 10, 6])
+        results = {name: mask for names, masks in batches for name, mask in zip(names, masks)}
+        expected = {f'甲{index}': 0b01 for index in range(1, 50, 2)}
+        expected['乙'] = 0b10
+        self.assertEqual(results, expected)
+
+    def test_cancel(self):
+        worker = CompareWorker(['张三\n李四', '李四'])
+        worker.cancel()
+        batches, finished = self.run_worker(worker)
+        self.assertEqual(batches, [])
+        self.assertEqual(finished, [True])
+
+
+if __name__ == '__main__':
+    unittest.main()
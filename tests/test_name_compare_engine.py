@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+
+"""
+name_compare_engine 的测试
+"""
+
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import name_compare_engine
+from name_compare_engine import (StreamingComparator, NameFileSource, ReferenceIndex, NameNormalizer, KeyStore,
+                                 column_bit, escape_field, unescape_field)
+
+
+class MultilineCellTest(unittest.TestCase):
+    """CSV 单元格中带换行、分隔符和反斜杠时，溢写到桶文件和建立参考索引都不出错"""
+
+    NAMES = ['张三', '李\n四', '王\r\n五', 'a\\nb', 'c\x1fd', '赵六\\']
+
+    def setUp(self):
+        self.work_dir = tempfile.mkdtemp(prefix='test_name_compare_')
+        self.csv_path = os.path.join(self.work_dir, 'names.csv')
+        with open(self.csv_path, 'w', encoding='utf-8', newline='') as f:
+            f.write('姓名\r\n')
+            for name in self.NAMES:
+                f.write('"' + name.replace('"', '""') + '"\r\n')
+
+    def tearDown(self):
+        shutil.rmtree(self.work_dir, ignore_errors=True)
+
+    def test_escape_round_trip(self):
+        for name in self.NAMES:
+            escaped = escape_field(name)
+            self.assertNotIn('\n', escaped)
+            self.assertNotIn('\r', escaped)
+            self.assertNotIn('\x1f', escaped)
+            self.assertEqual(unescape_field(escaped), name)
+
+    def test_spilled_membership(self):
+        source = NameFileSource(self.csv_path, encoding='utf-8')
+        expected = set(self.NAMES) | {'姓名'}
+        self.assertEqual(set(source), expected)
+        # memory_limit 很小，强制溢写到桶文件并多层分桶
+        comparator = StreamingComparator(memory_limit=1, bucket_count=2, temp_dir=self.work_dir)
+        result = dict(comparator.membership([source, ['张三', '李\n四']]))
+        self.assertEqual(set(result), expected)
+        self.assertEqual(result['李\n四'], column_bit(0) | column_bit(1))
+        self.assertEqual(result['c\x1fd'], column_bit(0))
+
+    def test_spilled_multiset(self):
+        source = NameFileSource(self.csv_path, encoding='utf-8')
+        comparator = StreamingComparator(memory_limit=1, bucket_count=2, temp_dir=self.work_dir)
+        result = {name: tuple(counts) for name, counts in comparator.multiset([source, ['王\r\n五', '王\r\n五']])}
+        self.assertEqual(result['王\r\n五'], (1, 2))
+        self.assertEqual(result['a\\nb'], (1, 0))
+
+    def test_reference_index(self):
+        source = NameFileSource(self.csv_path, encoding='utf-8')
+        path = os.path.join(self.work_dir, 'reference.idx')
+        signature = ReferenceIndex.signature_for(source)
+        ReferenceIndex.build(source, path, signature)
+        index = ReferenceIndex(path)
+        try:
+            self.assertEqual(len(index), len(self.NAMES) + 1)
+            for name in self.NAMES:
+                self.assertIn(name, index)
+            self.assertNotIn('李四', index)
+            self.assertEqual(set(index.names()), set(self.NAMES) | {'姓名'})
+        finally:
+            index.close()
+
+
+class ReferenceIndexVersionTest(unittest.TestCase):
+    """源文件变化后重建的索引写入新版本的文件，旧索引仍在使用时不受影响"""
+
+    def setUp(self):
+        self.work_dir = tempfile.mkdtemp(prefix='test_reference_')
+        self.source_path = os.path.join(self.work_dir, 'reference.txt')
+        patcher = mock.patch.object(name_compare_engine, 'REFERENCE_DIR', os.path.join(self.work_dir, 'index'))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        shutil.rmtree(self.work_dir, ignore_errors=True)
+
+    def write_source(self, names, mtime):
+        with open(self.source_path, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(names))
+        os.utime(self.source_path, ns=(mtime, mtime))
+
+    def test_rebuild_uses_new_version(self):
+        self.write_source(['张三', '李四'], 10 ** 18)
+        source = NameFileSource(self.source_path, encoding='utf-8')
+        old = ReferenceIndex.open(source)
+        try:
+            self.assertTrue(old.path.endswith('.1.idx'))
+            same = ReferenceIndex.open(source)
+            self.assertEqual(same.path, old.path)
+            same.close()
+
+            self.write_source(['王五'], 2 * 10 ** 18)
+            new = ReferenceIndex.open(source)
+            try:
+                self.assertTrue(new.path.endswith('.2.idx'))
+                self.assertIn('王五', new)
+                self.assertNotIn('张三', new)
+                # 旧索引仍然可以查询
+                self.assertIn('张三', old)
+            finally:
+                new.close()
+            prefix = ReferenceIndex.index_prefix(source, ReferenceIndex.signature_for(source))
+            self.assertEqual([path for _, path in ReferenceIndex.index_versions(prefix)], [new.path])
+        finally:
+            old.close()
+
+
+class KeyStoreTest(unittest.TestCase):
+
+    def setUp(self):
+        self.work_dir = tempfile.mkdtemp(prefix='test_key_store_')
+        self.store = KeyStore(os.path.join(self.work_dir, 'keys.sqlite3'), max_entries=10)
+
+    def tearDown(self):
+        self.store.close()
+        shutil.rmtree(self.work_dir, ignore_errors=True)
+
+    def test_cheap_steps_skip_store(self):
+        self.assertIsNone(NameNormalizer(('width', 'space', 'case'), store=self.store).store)
+        self.assertIs(NameNormalizer(('space', 'script'), store=self.store).store, self.store)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,307 @@
+# -*- coding: utf-8 -*-
+
+"""
+name_extractor 的测试
+"""
+
+import os
+import sys
+import random
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import name_extractor
+from name_extractor import (NameExtractor, ChineseNameRecognizer, AhoCorasick, CachedLookup, ExtractionResults,
+                            FolderSnapshot, default_recognizer, extract_chunks)
+
+
+class ChineseNameRecognizerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.recognizer = default_recognizer()
+
+    def test_surname_trie_matches_single_and_compound_surnames(self):
+        recognizer = ChineseNameRecognizer({'欧': 2, '欧阳': 3, '张': 3}, stop_words=())
+        self.assertEqual(list(recognizer._surnames_at('欧阳娜娜', 0, 4)), [(1, 2), (2, 3)])
+        self.assertEqual(list(recognizer._surnames_at('张三', 0, 2)), [(1, 3)])
+        self.assertEqual(list(recognizer._surnames_at('娜娜', 0, 2)), [])
+        # 不越过片段结尾
+        self.assertEqual(list(recognizer._surnames_at('欧阳娜娜', 0, 1)), [(1, 2)])
+
+    def test_compound_surnames(self):
+        for text, expected in (('欧阳娜娜', '欧阳娜娜'), ('司马相如', '司马相如'), ('欧阳华明', '欧阳华明'),
+                               ('2023年度诸葛亮考核表', '诸葛亮')):
+            with self.subTest(text=text):
+                self.assertEqual(self.recognizer.recognize(text), expected)
+
+    def test_stop_words_are_rejected(self):
+        self.assertEqual(self.recognizer.recognize('2023年度张三考核表'), '张三')
+        self.assertEqual(self.recognizer.recognize('王五签字复印件'), '王五')
+        self.assertEqual(self.recognizer.recognize('报告总结'), '')
+        self.assertEqual(self.recognizer.remove_stop_words('考核表'), '')
+
+    def test_adjacent_names_are_split(self):
+        for text, expected in (('张三李四', '张三'), ('李四张三王五', '李四'), ('诸葛亮张飞', '诸葛亮'),
+                               ('张三丰李四', '张三丰'), ('王小明李华', '王小明'), ('张三李四报告', '张三')):
+            with self.subTest(text=text):
+                self.assertEqual(self.recognizer.recognize(text), expected)
+
+    def test_single_names_are_not_split(self):
+        for text in ('王华明', '张三', '欧阳娜娜'):
+            with self.subTest(text=text):
+                self.assertEqual(self.recognizer.recognize(text), text)
+
+    def test_regex_fallback(self):
+        extractor = NameExtractor()
+        # 姓氏不在词典中时取去掉停用词后的第一段2~4个汉字
+        self.assertEqual(self.recognizer.recognize('阿凡提'), '')
+        self.assertEqual(extractor.extract('阿凡提.pdf'), '阿凡提')
+        self.assertEqual(extractor.extract('2023年度阿凡提考核表.pdf'), '阿凡提')
+        # 只有停用词时不返回姓名
+        self.assertEqual(extractor.extract('考核表.pdf'), '')
+        self.assertEqual(extractor.extract('报告总结.docx'), '')
+
+
+class FilterWordPathsTest(unittest.TestCase):
+    """过滤词很多时使用的 Aho-Corasick 自动机与合并正则的结果必须完全相同"""
+
+    # 互相重叠、互为前后缀的过滤词，以及大小写不同的写法
+    OVERLAPPING_WORDS = ['rep', 'report', 'port', 'or', 'Report_Final', 'final', 'al', 'a', '考核', '考核表', '核表',
+                         '表', 'DATA', 'at', 'tat']
+
+    def build(self, words, automaton):
+        threshold = 1 if automaton else len(words) + 1
+        with mock.patch.object(name_extractor, 'AHO_CORASICK_THRESHOLD', threshold):
+            extractor = NameExtractor(words)
+        self.assertEqual(extractor._automaton is not None, automaton)
+        return extractor
+
+    def random_filenames(self, rng, words, count):
+        pieces = words + ['张三', '李四', 'Zhang', 'san', '_', '-', '2023', 'x', 'İ', ' ']
+        return [''.join(rng.choice(pieces) for _ in range(rng.randint(1, 8))) + rng.choice(['.pdf', '.docx', ''])
+                for _ in range(count)]
+
+    def assert_same(self, words, filenames):
+        regex = self.build(words, automaton=False)
+        automaton = self.build(words, automaton=True)
+        for filename in filenames:
+            with self.subTest(filename=filename):
+                self.assertEqual(automaton.remove_filter_words(filename), regex.remove_filter_words(filename))
+                self.assertEqual(automaton.extract(filename), regex.extract(filename))
+
+    def test_overlapping_words(self):
+        filenames = ['report_张三.pdf', 'Report_Final_李四.docx', 'reportport.txt', 'ataTAT_data.xlsx',
+                     '考核表张三考核.pdf', 'a_b_c.pdf', 'İstanbul_report.pdf']
+        rng = random.Random(1)
+        self.assert_same(self.OVERLAPPING_WORDS, filenames + self.random_filenames(rng, self.OVERLAPPING_WORDS, 300))
+
+    def test_many_random_words(self):
+        rng = random.Random(2)
+        alphabet = 'abcdeABCDE考核表报告'
+        words = sorted({''.join(rng.choice(alphabet) for _ in range(rng.randint(1, 5))) for _ in range(400)})
+        self.assertGreaterEqual(len(words), name_extractor.AHO_CORASICK_THRESHOLD)
+        filenames = [''.join(rng.choice(alphabet + '_张三李四') for _ in range(rng.randint(1, 30))) + '.pdf'
+                     for _ in range(300)]
+        self.assert_same(words, filenames)
+
+    def test_default_threshold_selects_automaton(self):
+        words = [f'word{i}' for i in range(name_extractor.AHO_CORASICK_THRESHOLD)]
+        self.assertIsNotNone(NameExtractor(words)._automaton)
+        self.assertIsNone(NameExtractor(words[:-1])._automaton)
+
+    def test_spans_are_leftmost_longest(self):
+        automaton = AhoCorasick(['he', 'she', 'hers', 'his'])
+        self.assertEqual(automaton.spans('ushers'), [(1, 4)])
+        self.assertEqual(sorted(automaton.find_all('ushers')), [(1, 4), (2, 4), (2, 6)])
+
+
+class ExtractChunksTest(unittest.TestCase):
+    """进程池提取的结果与当前进程逐个提取相同，并保持输入顺序"""
+
+    FILTER_WORDS = ['报告', 'final']
+
+    def make_chunks(self, count=8, size=25):
+        names = ['张三', '李四', '王小明', '欧阳华明', 'Zhang_San', 'LiSi']
+        return [[f'{names[(index + offset) % len(names)]}_{index}_{offset}报告_final.pdf' for offset in range(size)]
+                for index in range(count)]
+
+    def serial(self, chunks):
+        extractor = NameExtractor(self.FILTER_WORDS)
+        return [[extractor.extract(filename) for filename in chunk] for chunk in chunks]
+
+    def test_pool_matches_serial_in_order(self):
+        chunks = self.make_chunks()
+        results = list(extract_chunks(iter(chunks), self.FILTER_WORDS, workers=2))
+        self.assertEqual([chunk for chunk, _ in results], chunks)
+        self.assertEqual([names for _, names in results], self.serial(chunks))
+
+    def test_pool_with_lookup_and_key(self):
+        chunks = [[os.path.join('dir', filename) for filename in chunk] for chunk in self.make_chunks(4)]
+        expected = self.serial([[os.path.basename(path) for path in chunk] for chunk in chunks])
+        lookup = CachedLookup(self.FILTER_WORDS)
+        for _ in range(2):
+            results = list(extract_chunks(chunks, self.FILTER_WORDS, workers=2, lookup=lookup, key=os.path.basename))
+            self.assertEqual([chunk for chunk, _ in results], chunks)
+            self.assertEqual([names for _, names in results], expected)
+        # 第二次全部命中缓存
+        total = sum(len(chunk) for chunk in chunks)
+        self.assertEqual((lookup.misses, lookup.hits), (total, total))
+
+    def test_cancel_stops_early(self):
+        chunks = self.make_chunks(20)
+        received = []
+
+        def should_cancel():
+            return len(received) >= 3
+
+        for chunk, names in extract_chunks(chunks, self.FILTER_WORDS, workers=2, should_cancel=should_cancel):
+            received.append((chunk, names))
+        self.assertEqual(len(received), 3)
+        self.assertEqual([chunk for chunk, _ in received], chunks[:3])
+        self.assertEqual([names for _, names in received], self.serial(chunks[:3]))
+
+
+def write_file(path, content='x'):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(content)
+
+
+class FolderSnapshotTest(unittest.TestCase):
+    """快照比较新增、删除、修改和重命名的文件"""
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp(prefix='test_folder_snapshot_')
+        write_file(os.path.join(self.root, '张三.pdf'), 'a')
+        write_file(os.path.join(self.root, 'sub', '李四.pdf'), 'bb')
+        write_file(os.path.join(self.root, 'skip.py'))
+        self.snapshot = FolderSnapshot(self.root, workers=2)
+
+    def tearDown(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def path(self, *parts):
+        return os.path.join(self.root, *parts)
+
+    def test_first_refresh_adds_everything(self):
+        self.assertEqual(self.snapshot.refresh(), ([os.path.join('sub', '李四.pdf'), '张三.pdf'], [], []))
+        self.assertEqual(len(self.snapshot), 2)
+        self.assertEqual(self.snapshot.refresh(), ([], [], []))
+
+    def test_create_modify_rename_delete(self):
+        self.snapshot.refresh()
+
+        write_file(self.path('sub', 'deep', '王五.pdf'), 'ccc')
+        self.assertEqual(self.snapshot.refresh(), ([os.path.join('sub', 'deep', '王五.pdf')], [], []))
+
+        # 修改内容不改变文件名，不需要重新提取
+        write_file(self.path('张三.pdf'), 'changed')
+        self.assertEqual(self.snapshot.refresh(), ([], [], []))
+
+        os.rename(self.path('张三.pdf'), self.path('张三_final.pdf'))
+        self.assertEqual(self.snapshot.refresh(), ([], [], [('张三.pdf', '张三_final.pdf')]))
+
+        os.rename(self.path('sub', '李四.pdf'), self.path('sub', 'deep', '李四.pdf'))
+        self.assertEqual(self.snapshot.refresh(),
+                         ([], [], [(os.path.join('sub', '李四.pdf'), os.path.join('sub', 'deep', '李四.pdf'))]))
+
+        os.remove(self.path('张三_final.pdf'))
+        self.assertEqual(self.snapshot.refresh(), ([], ['张三_final.pdf'], []))
+
+        shutil.rmtree(self.path('sub', 'deep'))
+        self.assertEqual(self.snapshot.refresh(),
+                         ([], sorted([os.path.join('sub', 'deep', '王五.pdf'), os.path.join('sub', 'deep', '李四.pdf')]),
+                          []))
+        self.assertEqual(len(self.snapshot), 0)
+
+    def test_missing_root_raises(self):
+        self.snapshot.refresh()
+        shutil.rmtree(self.root)
+        with self.assertRaises(OSError):
+            self.snapshot.refresh()
+
+    def test_rename_without_inode(self):
+        """st_ino 为 0 时按大小和修改时间匹配重命名，多个文件无法区分时按删除和新增处理"""
+        with mock.patch.object(name_extractor, '_file_identity',
+                               lambda stat: (0, stat.st_size, stat.st_mtime_ns)):
+            self.snapshot.refresh()
+            os.rename(self.path('张三.pdf'), self.path('张三_final.pdf'))
+            self.assertEqual(self.snapshot.refresh(), ([], [], [('张三.pdf', '张三_final.pdf')]))
+
+            write_file(self.path('王五.pdf'), 'c')
+            stat = os.stat(self.path('张三_final.pdf'))
+            os.utime(self.path('王五.pdf'), ns=(stat.st_atime_ns, stat.st_mtime_ns))
+            self.snapshot.refresh()
+            os.rename(self.path('张三_final.pdf'), self.path('张三_v2.pdf'))
+            os.rename(self.path('王五.pdf'), self.path('王五_v2.pdf'))
+            self.assertEqual(self.snapshot.refresh(),
+                             (['张三_v2.pdf', '王五_v2.pdf'], ['张三_final.pdf', '王五.pdf'], []))
+
+
+class ExtractionResultsIndexTest(unittest.TestCase):
+    """随机追加、删除（用最后一行填补）、重新追加和重命名后，倒排索引与重新建立的索引相同"""
+
+    NAMES = ['张三', '李四', '王五', '']
+
+    def assert_consistent(self, results, expected):
+        self.assertEqual(list(zip(results.paths, results.names)), expected)
+        rebuilt = {}
+        for row, (_, name) in enumerate(expected):
+            rebuilt.setdefault(name, []).append(row)
+        self.assertEqual({name: sorted(rows) for name, rows in results._by_name.items()}, rebuilt)
+        for name in self.NAMES:
+            self.assertEqual(sorted(results.rows_for(name)), rebuilt.get(name, []))
+            self.assertEqual(results.count_of(name), len(rebuilt.get(name, [])))
+        for row, (path, _) in enumerate(expected):
+            self.assertEqual(results.row_of(path), row)
+        self.assertEqual(results.found_count(), sum(1 for _, name in expected if name))
+        self.assertEqual(results.distinct_name_count(), len(set(rebuilt) - {''}))
+
+    def test_random_operations(self):
+        rng = random.Random(3)
+        results = ExtractionResults()
+        expected = []
+        counter = 0
+        for step in range(500):
+            action = rng.random()
+            with self.subTest(step=step):
+                if action < 0.35 or not expected:
+                    paths = [f'file{counter + offset}.pdf' for offset in range(rng.randint(1, 4))]
+                    counter += len(paths)
+                    names = [rng.choice(self.NAMES) for _ in paths]
+                    results.extend(paths, names)
+                    expected.extend(zip(paths, names))
+                elif action < 0.7:
+                    row = rng.randrange(len(expected))
+                    path, name = expected[row]
+                    last = len(expected) - 1
+                    self.assertEqual(results.remove(path), (row, None if row == last else last))
+                    expected[row] = expected[last]
+                    expected.pop()
+                    if rng.random() < 0.5:
+                        # 删除后再追加同一个文件
+                        results.extend([path], [name])
+                        expected.append((path, name))
+                else:
+                    row = rng.randrange(len(expected))
+                    new_path = f'file{counter}.pdf'
+                    counter += 1
+                    name = rng.choice(self.NAMES)
+                    self.assertEqual(results.rename(expected[row][0], new_path, name), row)
+                    expected[row] = (new_path, name)
+                self.assert_consistent(results, expected)
+
+        while expected:
+            results.remove(expected[0][0])
+            expected[0] = expected[-1]
+            expected.pop()
+        self.assert_consistent(results, expected)
+        self.assertEqual(results._by_name, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+
+"""
+sqlite_store 的测试（规范化键缓存和提取结果缓存共用同一套上限和清空逻辑）
+"""
+
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from name_compare_engine import KeyStore
+from name_extractor import ExtractionStore
+
+
+class SignatureStoreTest(unittest.TestCase):
+
+    STORE_CLASSES = (KeyStore, ExtractionStore)
+
+    def setUp(self):
+        self.work_dir = tempfile.mkdtemp(prefix='test_sqlite_store_')
+
+    def tearDown(self):
+        shutil.rmtree(self.work_dir, ignore_errors=True)
+
+    def open_store(self, store_class, max_entries=10):
+        store = store_class(os.path.join(self.work_dir, f'{store_class.__name__}.sqlite3'), max_entries=max_entries)
+        self.addCleanup(store.close)
+        return store
+
+    def test_round_trip(self):
+        for store_class in self.STORE_CLASSES:
+            with self.subTest(store=store_class.__name__):
+                store = self.open_store(store_class)
+                store.put_many('sig', [('a', '1'), ('b', '')])
+                self.assertEqual(store.get_many('sig', ['a', 'b', 'c']), {'a': '1', 'b': ''})
+                self.assertEqual(store.get_many('other', ['a']), {})
+
+    def test_limit_drops_other_signatures_first(self):
+        for store_class in self.STORE_CLASSES:
+            with self.subTest(store=store_class.__name__):
+                store = self.open_store(store_class)
+                store.put_many('old', [(str(i), str(i)) for i in range(6)])
+                store.put_many('new', [(str(i), str(i)) for i in range(6)])
+                self.assertEqual(store.get_many('old', ['0']), {})
+                self.assertEqual(len(store.get_many('new', [str(i) for i in range(6)])), 6)
+
+    def test_limit_and_clear(self):
+        for store_class in self.STORE_CLASSES:
+            with self.subTest(store=store_class.__name__):
+                store = self.open_store(store_class)
+                store.put_many('new', [(str(i), str(i)) for i in range(11)])
+                self.assertEqual(store.get_many('new', ['0']), {})
+                store.put_many('new', [('a', 'a')])
+                store.clear()
+                self.assertEqual(store.get_many('new', ['a']), {})
+
+    def test_count_survives_reopen(self):
+        for store_class in self.STORE_CLASSES:
+            with self.subTest(store=store_class.__name__):
+                store = self.open_store(store_class)
+                store.put_many('old', [(str(i), str(i)) for i in range(8)])
+                store.close()
+                store = self.open_store(store_class)
+                store.put_many('new', [('x', 'x'), ('y', 'y'), ('z', 'z')])
+                self.assertEqual(store.get_many('old', ['0']), {})
+                self.assertEqual(len(store.get_many('new', ['x', 'y', 'z'])), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()